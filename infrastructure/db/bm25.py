@@ -0,0 +1,157 @@
+import json
+import math
+import re
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+from settings import settings
+from infrastructure.db.snapshots import current_version, new_version, publish, snapshot_size
+
+# Words, tickers, quarters (q3, fy23), short years ('24) and figures ($4.2b, 12%, 1,200,000)
+_TOKEN = re.compile(r"\$?\d+(?:[.,]\d+)*[a-z%]*|[a-z]+\d*|'\d{2}\b")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "will with we our you your i they their what which who how do does did can".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+class BM25IndexBuilder:
+    """Accumulates chunk texts and writes a BM25 inverted index keyed by Qdrant point IDs."""
+
+    def __init__(self) -> None:
+        self._ids: List[bytes] = []
+        self._lengths: List[int] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, point_id: str, text: str) -> None:
+        if point_id in self._positions:
+            # Re-added point (same chunk seen twice); keep the first copy
+            return
+        tokens = tokenize(text)
+        doc = len(self._ids)
+        self._positions[point_id] = doc
+        self._ids.append(uuid.UUID(point_id).bytes)
+        self._lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            self._postings.setdefault(term, []).append((doc, tf))
+
+    def write(self, path: Path) -> Path:
+        """Write a new index version under path and point CURRENT at it; older versions are removed."""
+        version = new_version(path)
+
+        terms = sorted(self._postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(self._postings[term]) for term in terms], out=offsets[1:])
+        docs = np.empty(offsets[-1], dtype=np.uint32)
+        freqs = np.empty(offsets[-1], dtype=np.uint16)
+        for i, term in enumerate(terms):
+            postings = np.asarray(self._postings[term], dtype=np.uint32).reshape(-1, 2)
+            docs[offsets[i]:offsets[i + 1]] = postings[:, 0]
+            freqs[offsets[i]:offsets[i + 1]] = np.minimum(postings[:, 1], np.iinfo(np.uint16).max)
+
+        np.save(version / "offsets.npy", offsets)
+        np.save(version / "docs.npy", docs)
+        np.save(version / "freqs.npy", freqs)
+        np.save(version / "lengths.npy", np.asarray(self._lengths, dtype=np.uint32))
+        np.save(version / "ids.npy", np.frombuffer(b"".join(self._ids), dtype=np.uint8).reshape(-1, 16))
+        (version / "terms.json").write_text(json.dumps(terms))
+        lengths = self._lengths or [0]
+        (version / "meta.json").write_text(json.dumps({
+            "documents": len(self._ids),
+            "terms": len(terms),
+            "average_length": sum(lengths) / len(lengths),
+        }))
+
+        publish(path, version)
+        logger.info(f"Wrote BM25 index {version} with {len(self._ids)} chunks, {len(terms)} terms "
+                    f"({snapshot_size(version) / 1e6:.1f} MB)")
+        return version
+
+
+class BM25Index:
+    """Read side of a BM25 index; postings are memory-mapped, only the vocabulary is held in memory."""
+    _instances: Dict[str, "BM25Index"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, version: Path, k1: float = 1.2, b: float = 0.75) -> None:
+        self.version = version
+        self.k1 = k1
+        self.b = b
+        meta = json.loads((version / "meta.json").read_text())
+        self.documents = meta["documents"]
+        self.average_length = meta["average_length"] or 1.0
+        self._terms = {term: i for i, term in enumerate(json.loads((version / "terms.json").read_text()))}
+        self._offsets = np.load(version / "offsets.npy", mmap_mode="r")
+        self._docs = np.load(version / "docs.npy", mmap_mode="r")
+        self._freqs = np.load(version / "freqs.npy", mmap_mode="r")
+        self._lengths = np.load(version / "lengths.npy", mmap_mode="r")
+        self._ids = np.load(version / "ids.npy", mmap_mode="r")
+
+    @classmethod
+    def for_collection(cls, collection_name: str = settings.VECTOR_COLLECTION_NAME) -> Optional["BM25Index"]:
+        """The latest index built for a collection, or None when there is none (or it is disabled)."""
+        if not settings.BM25_INDEX_DIR:
+            return None
+        path = index_path(collection_name)
+        version = current_version(path)
+        if version is None:
+            return None
+
+        key = str(path)
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            # Re-open when ingestion has written a newer version
+            if instance is None or instance.version != version:
+                try:
+                    instance = cls(version)
+                except FileNotFoundError:
+                    logger.warning(f"BM25 index version {version} disappeared while opening it")
+                    return instance
+                cls._instances[key] = instance
+                logger.info(f"Opened BM25 index {version} with {instance.documents} chunks")
+        return instance
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """(point ID, BM25 score) of the best matching chunks, best first."""
+        scores = np.zeros(self.documents, dtype=np.float32)
+        for term in set(tokenize(query)):
+            index = self._terms.get(term)
+            if index is None:
+                continue
+            start, end = self._offsets[index], self._offsets[index + 1]
+            docs = self._docs[start:end]
+            freqs = self._freqs[start:end].astype(np.float32)
+            idf = math.log(1 + (self.documents - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[docs] / self.average_length)
+            scores[docs] += idf * freqs * (self.k1 + 1) / (freqs + norm)
+        limit = min(limit, int(np.count_nonzero(scores)))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit] if limit < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")][:limit]
+        return [(str(uuid.UUID(bytes=self._ids[i].tobytes())), float(scores[i])) for i in top]
+
+
+def index_path(collection_name: str = settings.VECTOR_COLLECTION_NAME) -> Path:
+    return Path(settings.BM25_INDEX_DIR) / (collection_name or "default")
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    """Merge ranked lists of IDs by summing 1 / (k + rank); ties keep first-seen order."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
@@ -0,0 +1,86 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Optional
+from loguru import logger
+from settings import settings
+
+
+class LLMResponseCache:
+    """SQLite-backed cache of deterministic LLM responses.
+
+    Keys are (namespace, model name, rendered prompt hash); the least recently
+    used rows are evicted once the cache grows past ``max_entries``.
+    """
+    _instance: Optional['LLMResponseCache'] = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls, path: Optional[str] = None, max_entries: Optional[int] = None) -> 'LLMResponseCache':
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance._setup(path or settings.LLM_CACHE_PATH, max_entries or settings.LLM_CACHE_MAX_ENTRIES)
+                cls._instance = instance
+        return cls._instance
+
+    def _setup(self, path: str, max_entries: int) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, namespace TEXT, response TEXT, created_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._misses: Dict[str, int] = defaultdict(int)
+        logger.info(f"Opened LLM response cache at {path}")
+
+    @staticmethod
+    def key(namespace: str, model_name: str, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+        return f"{namespace}:{model_name}:{prompt_hash}"
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._misses[namespace] += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._hits[namespace] += 1
+            return row[0]
+
+    def put(self, namespace: str, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, namespace, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, response, now, now)
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def stats(self, namespace: Optional[str] = None) -> Dict:
+        """Hit/miss counters for one namespace (step), or for every namespace."""
+        if namespace is not None:
+            return {"hits": self._hits[namespace], "misses": self._misses[namespace]}
+        return {
+            name: {"hits": self._hits[name], "misses": self._misses[name]}
+            for name in sorted(set(self._hits) | set(self._misses))
+        }
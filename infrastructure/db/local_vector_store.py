@@ -0,0 +1,322 @@
+import json
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from loguru import logger
+from settings import settings
+from infrastructure.db.snapshots import current_version, new_version, publish, snapshot_size
+from infrastructure.db.vector_store import VectorStore, point_id
+from infrastructure.embeddings.engine import EmbeddingEngine
+
+
+def _matches(value, accepted: List) -> bool:
+    if isinstance(value, list):
+        return any(item in accepted for item in value)
+    return value in accepted
+
+
+class _Snapshot:
+    """One published version of a collection: unit-length vectors, IDs and payloads, all memory-mapped.
+
+    Payloads are JSON documents concatenated into one byte array and decoded only
+    for the points a search returns. Tags have an inverted index for filtering.
+    """
+
+    def __init__(self, version: Path) -> None:
+        self.version = version
+        self.vectors = np.load(version / "vectors.npy", mmap_mode="r")
+        self.ids = np.load(version / "ids.npy", mmap_mode="r")
+        self._payloads = np.load(version / "payloads.npy", mmap_mode="r")
+        self._payload_offsets = np.load(version / "payload_offsets.npy", mmap_mode="r")
+        self._tags = {tag: i for i, tag in enumerate(json.loads((version / "tags.json").read_text()))}
+        self._tag_offsets = np.load(version / "tag_offsets.npy", mmap_mode="r")
+        self._tag_docs = np.load(version / "tag_docs.npy", mmap_mode="r")
+        self.positions = {str(uuid.UUID(bytes=row.tobytes())): i for i, row in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def point_id(self, row: int) -> str:
+        return str(uuid.UUID(bytes=self.ids[row].tobytes()))
+
+    def raw_payload(self, row: int) -> bytes:
+        start, end = self._payload_offsets[row], self._payload_offsets[row + 1]
+        return self._payloads[start:end].tobytes()
+
+    def payload(self, row: int) -> Dict:
+        return json.loads(self.raw_payload(row))
+
+    def result(self, row: int, score: Optional[float] = None, with_vectors: bool = False) -> Dict:
+        """Same shape as QdrantClient search results."""
+        payload = self.payload(row)
+        result = {
+            "id": self.point_id(row),
+            "content": payload.get("text", ""),
+            "metadata": {k: v for k, v in payload.items() if k != "text"},
+            "score": score
+        }
+        if with_vectors:
+            result["vector"] = self.vectors[row].tolist()
+        return result
+
+    def mask(self, filter_condition: Optional[dict]) -> Optional[np.ndarray]:
+        """Rows matching a Qdrant-style filter; supports "must" conditions with match "value" or "any"."""
+        if not filter_condition:
+            return None
+        unsupported = set(filter_condition) - {"must"}
+        if unsupported:
+            raise ValueError(f"Local vector store does not support filter clauses {sorted(unsupported)}")
+
+        mask = np.ones(len(self), dtype=bool)
+        for condition in filter_condition.get("must", []):
+            match = condition.get("match", {})
+            accepted = list(match["any"]) if "any" in match else [match["value"]]
+            if condition["key"] == "tags":
+                matched = np.zeros(len(self), dtype=bool)
+                for tag in accepted:
+                    index = self._tags.get(tag)
+                    if index is not None:
+                        matched[self._tag_docs[self._tag_offsets[index]:self._tag_offsets[index + 1]]] = True
+            else:
+                # Other payload keys are not indexed; scan them
+                matched = np.fromiter(
+                    (_matches(self.payload(row).get(condition["key"]), accepted) for row in range(len(self))),
+                    dtype=bool,
+                    count=len(self)
+                )
+            mask &= matched
+        return mask
+
+    @staticmethod
+    def write(path: Path, ids: List[str], vectors: np.ndarray, payloads: List[bytes]) -> Path:
+        version = new_version(path)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.save(version / "vectors.npy", (vectors / np.where(norms > 0, norms, 1.0)).astype(np.float32))
+        np.save(version / "ids.npy", np.frombuffer(b"".join(uuid.UUID(i).bytes for i in ids), dtype=np.uint8).reshape(-1, 16))
+        offsets = np.zeros(len(payloads) + 1, dtype=np.int64)
+        np.cumsum([len(payload) for payload in payloads], out=offsets[1:])
+        np.save(version / "payloads.npy", np.frombuffer(b"".join(payloads), dtype=np.uint8))
+        np.save(version / "payload_offsets.npy", offsets)
+
+        postings: Dict[str, List[int]] = {}
+        for row, payload in enumerate(payloads):
+            for tag in json.loads(payload).get("tags") or []:
+                postings.setdefault(tag, []).append(row)
+        tags = sorted(postings)
+        tag_offsets = np.zeros(len(tags) + 1, dtype=np.int64)
+        np.cumsum([len(postings[tag]) for tag in tags], out=tag_offsets[1:])
+        np.save(version / "tag_offsets.npy", tag_offsets)
+        np.save(version / "tag_docs.npy", np.asarray([row for tag in tags for row in postings[tag]], dtype=np.uint32))
+        (version / "tags.json").write_text(json.dumps(tags))
+
+        publish(path, version)
+        logger.info(f"Wrote vector store snapshot {version} with {len(ids)} points "
+                    f"({snapshot_size(version) / 1e6:.1f} MB)")
+        return version
+
+
+class LocalVectorStore(VectorStore):
+    """In-process vector store over memory-mapped snapshots, one per collection.
+
+    Search is exact: one matrix product over unit-length vectors, which for tens
+    of thousands of chunks takes well under a millisecond per query. Added
+    documents are buffered until flush() writes a new snapshot.
+    """
+    _instances: Dict[str, "LocalVectorStore"] = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, path: Optional[str] = None) -> "LocalVectorStore":
+        path = path or settings.VECTOR_STORE_DIR
+        with cls._instances_lock:
+            instance = cls._instances.get(path)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance.path = Path(path)
+                instance._snapshots = {}
+                instance._pending = {}
+                instance._deleted = {}
+                instance._lock = threading.Lock()
+                cls._instances[path] = instance
+        return instance
+
+    def _collection_path(self, collection_name: str) -> Path:
+        return self.path / (collection_name or "default")
+
+    def _snapshot(self, collection_name: str) -> Optional[_Snapshot]:
+        """The latest published snapshot, re-opened when another process has written a newer one."""
+        version = current_version(self._collection_path(collection_name))
+        if version is None:
+            return None
+        with self._lock:
+            snapshot = self._snapshots.get(collection_name)
+            if snapshot is None or snapshot.version != version:
+                snapshot = _Snapshot(version)
+                self._snapshots[collection_name] = snapshot
+                logger.info(f"Loaded vector store snapshot {version} with {len(snapshot)} points")
+        return snapshot
+
+    def load(self, collection_name: str = settings.VECTOR_COLLECTION_NAME) -> int:
+        """Open a collection's snapshot ahead of the first search; returns its point count."""
+        snapshot = self._snapshot(collection_name)
+        if snapshot is None:
+            logger.warning(f"No vector store snapshot for {collection_name!r} under {self.path}")
+            return 0
+        return len(snapshot)
+
+    def version(self, collection_name: str = settings.VECTOR_COLLECTION_NAME) -> Hashable:
+        """Name of the published snapshot; every flush() publishes a new one."""
+        version = current_version(self._collection_path(collection_name))
+        return version.name if version is not None else None
+
+    def count(self, collection_name: str = settings.VECTOR_COLLECTION_NAME) -> int:
+        snapshot = self._snapshot(collection_name)
+        return len(snapshot) if snapshot is not None else 0
+
+    def add_documents(self, documents: List[Dict], collection_name: str = settings.VECTOR_COLLECTION_NAME) -> None:
+        """Buffer chunk records ({'text', 'metadata', 'embedding'}, optional 'id') until flush()."""
+        added = 0
+        with self._lock:
+            pending = self._pending.setdefault(collection_name, {})
+            for idx, doc in enumerate(documents):
+                if not doc.get('embedding'):
+                    logger.warning(f"Skipping document {idx} due to missing embedding.")
+                    continue
+                key = doc.get('id') or point_id(doc['metadata'], doc['text'])
+                payload = json.dumps({**doc['metadata'], 'text': doc['text']}, default=str).encode("utf-8")
+                pending[key] = (np.asarray(doc['embedding'], dtype=np.float32), payload, doc['metadata'].get('original_id'))
+                added += 1
+        logger.info(f"Buffered {added} documents for {collection_name}")
+
+    def delete_documents(self, original_ids: Iterable[str], collection_name: str = settings.VECTOR_COLLECTION_NAME) -> None:
+        """Drop buffered points of the documents now and their snapshot points at the next flush()."""
+        original_ids = set(original_ids)
+        with self._lock:
+            self._deleted.setdefault(collection_name, set()).update(original_ids)
+            pending = self._pending.get(collection_name, {})
+            for key in [key for key, (_, _, original_id) in pending.items() if original_id in original_ids]:
+                del pending[key]
+
+    def set_payload(self, payloads: Dict[str, Dict], collection_name: str = settings.VECTOR_COLLECTION_NAME) -> None:
+        """Merge fields into buffered points, or into copies of snapshot points written at the next flush()."""
+        snapshot = self._snapshot(collection_name)
+        with self._lock:
+            pending = self._pending.setdefault(collection_name, {})
+            for key, fields in payloads.items():
+                if key in pending:
+                    vector, payload, original_id = pending[key]
+                elif snapshot is not None and key in snapshot.positions:
+                    row = snapshot.positions[key]
+                    vector, payload = np.asarray(snapshot.vectors[row]), snapshot.raw_payload(row)
+                    # Not a re-added document, so flush() keeps the document's other points
+                    original_id = None
+                else:
+                    logger.warning(f"Cannot set the payload of unknown point {key}")
+                    continue
+                merged = {**json.loads(payload), **fields}
+                pending[key] = (vector, json.dumps(merged, default=str).encode("utf-8"), original_id)
+
+    def flush(self, collection_name: str = settings.VECTOR_COLLECTION_NAME) -> None:
+        """Write buffered documents into a new snapshot.
+
+        Snapshot points with the same ID are replaced, and so is every older point of
+        a document that has buffered points or was passed to delete_documents().
+        """
+        with self._lock:
+            pending = self._pending.pop(collection_name, {})
+            deleted: Set[str] = self._deleted.pop(collection_name, set())
+        deleted |= {original_id for _, _, original_id in pending.values() if original_id is not None}
+        if not pending and not deleted:
+            return
+
+        ids: List[str] = []
+        vectors: List[np.ndarray] = []
+        payloads: List[bytes] = []
+        snapshot = self._snapshot(collection_name)
+        if snapshot is None and not pending:
+            return
+        if snapshot is not None:
+            for row in range(len(snapshot)):
+                key = snapshot.point_id(row)
+                payload = snapshot.raw_payload(row)
+                if key in pending or (deleted and json.loads(payload).get('original_id') in deleted):
+                    continue
+                ids.append(key)
+                vectors.append(snapshot.vectors[row])
+                payloads.append(payload)
+        for key, (vector, payload, _) in pending.items():
+            ids.append(key)
+            vectors.append(vector)
+            payloads.append(payload)
+
+        dimension = snapshot.vectors.shape[1] if snapshot is not None else len(vectors[0])
+        matrix = np.vstack(vectors) if vectors else np.empty((0, dimension), dtype=np.float32)
+        _Snapshot.write(self._collection_path(collection_name), ids, matrix, payloads)
+        self._snapshot(collection_name)
+
+    def search_batch(
+        self,
+        query_texts: List[str],
+        limit: int = 3,
+        filter_condition: Optional[dict] = None,
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        query_vectors: Optional[np.ndarray] = None,
+        with_vectors: bool = False
+    ) -> List[List[Dict]]:
+        """Search for several queries with one matrix product, grouped per query.
+
+        As with Qdrant, a filter that matches nothing for a query falls back to
+        unfiltered results.
+        """
+        if not query_texts:
+            return []
+        snapshot = self._snapshot(collection_name)
+        if snapshot is None or len(snapshot) == 0:
+            logger.warning(f"Vector store collection {collection_name!r} is empty")
+            return [[] for _ in query_texts]
+
+        if query_vectors is None:
+            query_vectors = EmbeddingEngine().encode_queries(query_texts)
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        scores = snapshot.vectors @ queries.T
+        mask = snapshot.mask(filter_condition)
+        grouped = []
+        for idx in range(len(query_texts)):
+            rows = self._top(scores[:, idx], limit, mask) if mask is not None else []
+            if not rows:
+                if mask is not None:
+                    logger.warning(f"Filter condition returned no results for query {idx + 1}. Using unfiltered results.")
+                rows = self._top(scores[:, idx], limit)
+            grouped.append([snapshot.result(row, score, with_vectors) for row, score in rows])
+
+        logger.info(f"Batch search for {len(query_texts)} queries returned "
+                    f"{sum(len(results) for results in grouped)} results")
+        return grouped
+
+    @staticmethod
+    def _top(scores: np.ndarray, limit: int, mask: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(scores))
+        if len(candidates) == 0 or limit <= 0:
+            return []
+        candidate_scores = scores[candidates]
+        if limit < len(candidates):
+            best = np.argpartition(-candidate_scores, limit - 1)[:limit]
+        else:
+            best = np.arange(len(candidates))
+        best = best[np.argsort(-candidate_scores[best], kind="stable")]
+        return [(int(candidates[i]), float(candidate_scores[i])) for i in best]
+
+    def retrieve(
+        self,
+        ids: List[str],
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        with_vectors: bool = False
+    ) -> List[Dict]:
+        snapshot = self._snapshot(collection_name)
+        if snapshot is None:
+            return []
+        return [snapshot.result(snapshot.positions[key], with_vectors=with_vectors) for key in ids if key in snapshot.positions]
@@ -1,6 +1,8 @@
+import asyncio
+import weakref
 from typing import Optional
 from loguru import logger
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
 from settings import settings
 
 
@@ -31,6 +33,47 @@ class MongoDBClient:
         return self._client
 
 
+class AsyncMongoDBClient:
+    """Pooled asyncio MongoDB client for the API, one per event loop.
+
+    Async connections belong to the loop that opened them, so each loop (the API
+    server's, or one per asyncio.run from the CLI) gets its own client.
+    """
+    _instances: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncMongoDBClient]" = weakref.WeakKeyDictionary()
+
+    def __new__(cls, connection_string: Optional[str] = None) -> 'AsyncMongoDBClient':
+        loop = asyncio.get_running_loop()
+        instance = cls._instances.get(loop)
+        if instance is None:
+            instance = super().__new__(cls)
+            uri = connection_string or settings.MONGODB_CONNECTION_STRING
+            instance._client = AsyncMongoClient(
+                uri,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                timeoutMS=settings.MONGODB_TIMEOUT_MS
+            )
+            instance._db = instance._client[settings.MONGODB_DATABASE_NAME]
+            cls._instances[loop] = instance
+            logger.info(f"Opened async MongoDB client for {settings.MONGODB_DATABASE_NAME} "
+                        f"(pool size {settings.MONGODB_MAX_POOL_SIZE}, timeout {settings.MONGODB_TIMEOUT_MS}ms)")
+        return instance
+
+    @property
+    def db(self):
+        return self._db
+
+    @property
+    def client(self):
+        return self._client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the running loop's client."""
+        instance = cls._instances.pop(asyncio.get_running_loop(), None)
+        if instance is not None:
+            await instance._client.close()
+
+
 # Initialize without connection string - will use settings
 mongodb = MongoDBClient()
 database = mongodb.db
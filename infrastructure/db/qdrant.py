@@ -1,12 +1,24 @@
-from qdrant_client import QdrantClient as QClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter
+import asyncio
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from qdrant_client import AsyncQdrantClient as AsyncQClient, QdrantClient as QClient
+from qdrant_client.models import (
+    Distance, FieldCondition, FilterSelector, MatchAny, VectorParams, PointStruct, Filter, SearchRequest,
+    SetPayload, SetPayloadOperation
+)
 from loguru import logger
 from settings import settings
-from typing import List, Dict, Optional
-from sentence_transformers import SentenceTransformer
+from pathlib import Path
+from typing import Hashable, Iterable, Iterator, List, Dict, Optional
+import numpy as np
+from infrastructure.embeddings.engine import EmbeddingEngine
+from infrastructure.db.snapshots import read_stamp, touch_stamp
+from infrastructure.db.vector_store import POINT_ID_NAMESPACE, VectorStore, point_id
 
 
-class QdrantClient:
+class QdrantClient(VectorStore):
     _instance = None
     
     def __new__(cls):
@@ -18,6 +30,7 @@ class QdrantClient:
                     url=settings.QDRANT_CLUSTER_URL,
                     api_key=settings.QDRANT_APIKEY,
                 )
+                cls._instance._async_clients = weakref.WeakKeyDictionary()
                 logger.info(f"Connected to Qdrant cloud at: {settings.QDRANT_CLUSTER_URL}")
                 
                 # Initialize collection if it doesn't exist
@@ -58,8 +71,16 @@ class QdrantClient:
             logger.error(f"Failed to initialize collection: {e}")
             raise
 
-    def add_documents(self, documents: List[Dict], collection_name: str = settings.VECTOR_COLLECTION_NAME):
-        """Add documents to Qdrant collection."""
+    def add_documents(
+        self,
+        documents: List[Dict],
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        batch_size: Optional[int] = None,
+        parallelism: Optional[int] = None
+    ):
+        """Upsert documents in batches with bounded parallelism, each waited on until applied."""
+        batch_size = batch_size or settings.QDRANT_UPSERT_BATCH_SIZE
+        parallelism = parallelism or settings.QDRANT_UPSERT_PARALLELISM
         try:
             points = []
             for idx, doc in enumerate(documents):
@@ -78,7 +99,7 @@ class QdrantClient:
                 
                 # Create Qdrant PointStruct for each document
                 points.append(PointStruct(
-                    id=idx,
+                    id=point_id(doc['metadata'], doc['text']),
                     payload=metadata,
                     vector=vector
                 ))
@@ -86,18 +107,73 @@ class QdrantClient:
             if not points:
                 logger.warning("No valid documents to add.")
                 return
-                
-            # Upsert points into Qdrant collection
-            self.client.upsert(
-                collection_name=collection_name,
-                points=points
-            )
-            logger.info(f"Successfully added {len(points)} documents to {collection_name}")
+            
+            start = time.perf_counter()
+            batches = [points[i:i + batch_size] for i in range(0, len(points), batch_size)]
+            
+            # At most `parallelism` batches in flight; on a sharded collection no batch's
+            # completion implies another's, so every one is waited on
+            with ThreadPoolExecutor(max_workers=parallelism) as executor:
+                list(executor.map(
+                    lambda batch: self.client.upsert(collection_name=collection_name, points=batch, wait=True),
+                    batches
+                ))
+            
+            elapsed = time.perf_counter() - start
+            logger.info(f"Successfully added {len(points)} documents to {collection_name} "
+                        f"in {len(batches)} batches ({len(points) / elapsed:.0f} points/sec)")
             
         except Exception as e:
             logger.error(f"Failed to add documents: {e}")
             raise
 
+    def delete_documents(
+        self,
+        original_ids: Iterable[str],
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        batch_size: Optional[int] = None
+    ) -> None:
+        """Delete the points of source documents by their 'original_id' payload field."""
+        original_ids = sorted(set(original_ids))
+        batch_size = batch_size or settings.QDRANT_UPSERT_BATCH_SIZE
+        try:
+            for i in range(0, len(original_ids), batch_size):
+                self.client.delete(
+                    collection_name=collection_name,
+                    points_selector=FilterSelector(filter=Filter(must=[
+                        FieldCondition(key="original_id", match=MatchAny(any=original_ids[i:i + batch_size]))
+                    ])),
+                    wait=True
+                )
+            if original_ids:
+                logger.info(f"Deleted points of {len(original_ids)} documents from {collection_name}")
+        except Exception as e:
+            logger.error(f"Failed to delete documents: {e}")
+            raise
+
+    def set_payload(
+        self,
+        payloads: Dict[str, Dict],
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        batch_size: Optional[int] = None
+    ) -> None:
+        """Merge payload fields into existing points, many points per request."""
+        batch_size = batch_size or settings.QDRANT_UPSERT_BATCH_SIZE
+        operations = [
+            SetPayloadOperation(set_payload=SetPayload(payload=payload, points=[key]))
+            for key, payload in payloads.items()
+        ]
+        try:
+            for i in range(0, len(operations), batch_size):
+                self.client.batch_update_points(
+                    collection_name=collection_name, update_operations=operations[i:i + batch_size], wait=True
+                )
+            if operations:
+                logger.info(f"Updated the payload of {len(operations)} points in {collection_name}")
+        except Exception as e:
+            logger.error(f"Failed to set payloads: {e}")
+            raise
+
     def search(
         self, 
         query_text: Optional[str] = None, 
@@ -109,9 +185,8 @@ class QdrantClient:
         """Search for similar documents with optional filtering."""
         try:
             if query_vector is None and query_text is not None:
-                # Generate embedding for the query text using SentenceTransformer
-                model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
-                query_vector = model.encode(query_text).tolist()
+                # Generate embedding for the query text with the shared engine
+                query_vector = EmbeddingEngine().encode_queries([query_text])[0].tolist()
             
             if query_vector is None and not query_text is None:
                 raise ValueError("Either query_vector or query_text must be provided")
@@ -126,21 +201,7 @@ class QdrantClient:
             logger.info(f"Found {len(search_results)} results for query")
 
             # Transform ScoredPoint objects to dictionaries
-            results = []
-            for point in search_results:
-                # Ensure that each part of the payload and score is accessed safely
-                payload = getattr(point, 'payload', {})
-                score = getattr(point, 'score', None)
-                text_content = payload.get("text", "")
-
-                # Append transformed result if payload has text content
-                results.append({
-                    "content": text_content,
-                    "metadata": {
-                        k: v for k, v in payload.items() if k != "text"
-                    },
-                    "score": score
-                })
+            results = [self._to_result(point) for point in search_results]
             
             logger.info(f"Transformed {len(results)} results for query")
             return results
@@ -149,5 +210,218 @@ class QdrantClient:
             logger.error(f"Search failed: {e}")
             raise
 
+    def search_batch(
+        self,
+        query_texts: List[str],
+        limit: int = 3,
+        filter_condition: Optional[dict] = None,
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        query_vectors: Optional[np.ndarray] = None,
+        with_vectors: bool = False
+    ) -> List[List[Dict]]:
+        """Search for several queries in one round trip, grouped per query.
+
+        With a filter, each query is sent both filtered and unfiltered; the
+        unfiltered hits are used only when the filtered search comes back empty.
+        Pass query_vectors to reuse embeddings the caller already has, and
+        with_vectors to get each hit's stored vector under "vector".
+        """
+        if not query_texts:
+            return []
+
+        try:
+            # One encode call for every query
+            if query_vectors is None:
+                query_vectors = EmbeddingEngine().encode_queries(query_texts)
+
+            requests = self._search_requests(query_vectors, limit, filter_condition, with_vectors)
+            batch_results = self.client.search_batch(collection_name=collection_name, requests=requests)
+            return self._group_results(batch_results, len(query_texts), filter_condition is not None)
+
+        except Exception as e:
+            logger.error(f"Batch search failed: {e}")
+            raise
+
+    async def asearch_batch(
+        self,
+        query_texts: List[str],
+        limit: int = 3,
+        filter_condition: Optional[dict] = None,
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        query_vectors: Optional[np.ndarray] = None,
+        with_vectors: bool = False
+    ) -> List[List[Dict]]:
+        """search_batch over the pooled async client, without blocking the event loop."""
+        if not query_texts:
+            return []
+
+        try:
+            if query_vectors is None:
+                query_vectors = await asyncio.to_thread(EmbeddingEngine().encode_queries, query_texts)
+
+            requests = self._search_requests(query_vectors, limit, filter_condition, with_vectors)
+            batch_results = await self.async_client.search_batch(collection_name=collection_name, requests=requests)
+            return self._group_results(batch_results, len(query_texts), filter_condition is not None)
+
+        except Exception as e:
+            logger.error(f"Batch search failed: {e}")
+            raise
+
+    @staticmethod
+    def _search_requests(
+        query_vectors: np.ndarray,
+        limit: int,
+        filter_condition: Optional[dict],
+        with_vectors: bool
+    ) -> List[SearchRequest]:
+        requests = []
+        for query_vector in np.asarray(query_vectors).tolist():
+            if filter_condition is not None:
+                requests.append(SearchRequest(
+                    vector=query_vector,
+                    filter=Filter(**filter_condition),
+                    limit=limit,
+                    with_payload=True,
+                    with_vector=with_vectors
+                ))
+            requests.append(SearchRequest(vector=query_vector, limit=limit, with_payload=True, with_vector=with_vectors))
+        return requests
+
+    def _group_results(self, batch_results, queries: int, filtered: bool) -> List[List[Dict]]:
+        """Results per query, using the unfiltered variant only where the filtered one is empty."""
+        variants = 2 if filtered else 1
+        grouped = []
+        for idx in range(queries):
+            filtered_hits, unfiltered_hits = batch_results[idx * variants], batch_results[idx * variants + variants - 1]
+            if not filtered_hits and variants == 2:
+                logger.warning(f"Filter condition returned no results for query {idx + 1}. Using unfiltered results.")
+            grouped.append([self._to_result(point) for point in (filtered_hits or unfiltered_hits)])
+
+        logger.info(f"Batch search for {queries} queries returned "
+                    f"{sum(len(results) for results in grouped)} results")
+        return grouped
+
+    def scroll_documents(
+        self,
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        batch_size: int = settings.QDRANT_UPSERT_BATCH_SIZE
+    ) -> Iterator[List[Dict]]:
+        """Every point as chunk records ({'id', 'text', 'metadata', 'embedding'}), a page at a time."""
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            yield [
+                {
+                    'id': str(point.id),
+                    'text': (point.payload or {}).get('text', ''),
+                    'metadata': {k: v for k, v in (point.payload or {}).items() if k != 'text'},
+                    'embedding': point.vector
+                }
+                for point in points
+            ]
+            if offset is None:
+                return
+
+    def count(self, collection_name: str = settings.VECTOR_COLLECTION_NAME) -> int:
+        return self.client.get_collection(collection_name).points_count
+
+    @staticmethod
+    def _stamp_path(collection_name: str) -> Path:
+        # Next to the local snapshots, which the API host reads as well
+        return Path(settings.VECTOR_STORE_DIR) / f"{collection_name or 'default'}.qdrant-version"
+
+    def flush(self, collection_name: str = settings.VECTOR_COLLECTION_NAME) -> None:
+        """Upserts are already applied; stamp the collection so readers see it changed."""
+        touch_stamp(self._stamp_path(collection_name))
+
+    def version(self, collection_name: str = settings.VECTOR_COLLECTION_NAME) -> Hashable:
+        """Point count plus the stamp written by the last ingestion's flush()."""
+        return self.count(collection_name), read_stamp(self._stamp_path(collection_name))
+
+    def retrieve(
+        self,
+        ids: List[str],
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        with_vectors: bool = False
+    ) -> List[Dict]:
+        """Fetch points by ID in the order given; IDs that no longer exist are left out."""
+        if not ids:
+            return []
+        points = self.client.retrieve(collection_name=collection_name, ids=ids, with_payload=True, with_vectors=with_vectors)
+        by_id = {str(point.id): self._to_result(point) for point in points}
+        return [by_id[key] for key in ids if key in by_id]
+
+    async def aretrieve(
+        self,
+        ids: List[str],
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        with_vectors: bool = False
+    ) -> List[Dict]:
+        if not ids:
+            return []
+        points = await self.async_client.retrieve(
+            collection_name=collection_name, ids=ids, with_payload=True, with_vectors=with_vectors
+        )
+        by_id = {str(point.id): self._to_result(point) for point in points}
+        return [by_id[key] for key in ids if key in by_id]
+
+    @property
+    def async_client(self) -> AsyncQClient:
+        """Pooled async client for the running event loop, created on first use.
+
+        Async connections belong to the loop that opened them, so each loop
+        (the API server's, or one per asyncio.run from the CLI) gets its own.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncQClient(
+                url=settings.QDRANT_CLUSTER_URL,
+                api_key=settings.QDRANT_APIKEY,
+                prefer_grpc=settings.QDRANT_PREFER_GRPC,
+                timeout=settings.QDRANT_TIMEOUT,
+                # REST connection pool; gRPC multiplexes requests over one channel
+                limits=httpx.Limits(
+                    max_connections=settings.QDRANT_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.QDRANT_MAX_CONNECTIONS
+                )
+            )
+            self._async_clients[loop] = client
+            logger.info(f"Opened async Qdrant client ({'gRPC' if settings.QDRANT_PREFER_GRPC else 'REST'}, "
+                        f"timeout {settings.QDRANT_TIMEOUT}s)")
+        return client
+
+    async def aclose(self) -> None:
+        """Close the running loop's async client."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    @staticmethod
+    def _to_result(point) -> Dict:
+        """Transform a ScoredPoint into the result dictionary used by the pipelines."""
+        # Ensure that each part of the payload and score is accessed safely
+        payload = getattr(point, 'payload', None) or {}
+        score = getattr(point, 'score', None)
+        vector = getattr(point, 'vector', None)
+
+        result = {
+            "id": str(point.id) if getattr(point, 'id', None) is not None else None,
+            "content": payload.get("text", ""),
+            "metadata": {
+                k: v for k, v in payload.items() if k != "text"
+            },
+            "score": score
+        }
+        if vector is not None:
+            result["vector"] = vector
+        return result
+
 
 connection = QdrantClient()
\ No newline at end of file
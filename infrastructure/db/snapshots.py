@@ -0,0 +1,53 @@
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+
+
+def new_version(path: Path) -> Path:
+    """Empty directory for the next snapshot of path, invisible to readers until published."""
+    path.mkdir(parents=True, exist_ok=True)
+    version = path / f"v{time.time_ns()}"
+    version.mkdir()
+    return version
+
+
+def publish(path: Path, version: Path) -> None:
+    """Point CURRENT at version and remove older versions."""
+    # Readers follow CURRENT, so they never see a half-written version
+    tmp = path / f"CURRENT.{os.getpid()}"
+    tmp.write_text(version.name)
+    os.replace(tmp, path / "CURRENT")
+    for old in path.glob("v*"):
+        if old != version and old.is_dir():
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def current_version(path: Path) -> Optional[Path]:
+    """The published snapshot of path, or None when nothing has been published."""
+    try:
+        return path / (path / "CURRENT").read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def touch_stamp(path: Path) -> str:
+    """Record that the data behind path changed, for readers in other processes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    stamp = str(time.time_ns())
+    tmp = path.with_name(f"{path.name}.{os.getpid()}")
+    tmp.write_text(stamp)
+    os.replace(tmp, path)
+    return stamp
+
+
+def read_stamp(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def snapshot_size(version: Path) -> int:
+    return sum(f.stat().st_size for f in version.iterdir())
@@ -0,0 +1,114 @@
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, Hashable, Iterable, List, Optional
+import numpy as np
+from loguru import logger
+from settings import settings
+
+# Namespace for deterministic chunk point IDs
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "altimetrik-rag/qdrant/chunks")
+
+
+def point_id(metadata: Dict, text: str = "", model_name: str = settings.EMBEDDING_MODEL_NAME) -> str:
+    """Stable point ID for a chunk, so re-ingesting it overwrites instead of duplicating."""
+    if metadata.get('original_id') is not None and metadata.get('chunk_index') is not None:
+        key = f"{metadata['original_id']}:{metadata.get('section', '')}:{metadata['chunk_index']}:{model_name}"
+    else:
+        key = f"text:{text}:{model_name}"
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, key))
+
+
+class VectorStore(ABC):
+    """Storage and search of embedded chunks.
+
+    Results are dictionaries with "id", "content", "metadata" and "score", plus
+    "vector" when requested. Filters use Qdrant's filter dictionary format.
+    """
+
+    @abstractmethod
+    def add_documents(self, documents: List[Dict], collection_name: str = settings.VECTOR_COLLECTION_NAME) -> None:
+        """Upsert chunk records ({'text', 'metadata', 'embedding'}) under their point IDs."""
+
+    @abstractmethod
+    def delete_documents(self, original_ids: Iterable[str], collection_name: str = settings.VECTOR_COLLECTION_NAME) -> None:
+        """Remove every point chunked from the given source documents (metadata 'original_id').
+
+        Call before re-adding a document's chunks, so chunks it no longer produces
+        (fewer chunks after an edit, a new chunker, collapsed duplicates) do not linger.
+        """
+
+    @abstractmethod
+    def set_payload(self, payloads: Dict[str, Dict], collection_name: str = settings.VECTOR_COLLECTION_NAME) -> None:
+        """Merge fields into the payloads of existing points, keyed by point ID."""
+
+    @abstractmethod
+    def search_batch(
+        self,
+        query_texts: List[str],
+        limit: int = 3,
+        filter_condition: Optional[dict] = None,
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        query_vectors: Optional[np.ndarray] = None,
+        with_vectors: bool = False
+    ) -> List[List[Dict]]:
+        """Results per query; a filter that matches nothing falls back to unfiltered results."""
+
+    @abstractmethod
+    def retrieve(
+        self,
+        ids: List[str],
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        with_vectors: bool = False
+    ) -> List[Dict]:
+        """Points by ID in the order given; IDs that no longer exist are left out."""
+
+    @abstractmethod
+    def count(self, collection_name: str = settings.VECTOR_COLLECTION_NAME) -> int:
+        """Number of points in a collection."""
+
+    def flush(self, collection_name: str = settings.VECTOR_COLLECTION_NAME) -> None:
+        """Make added documents durable; a no-op for stores that write through."""
+
+    def version(self, collection_name: str = settings.VECTOR_COLLECTION_NAME) -> Hashable:
+        """Value that changes whenever a collection is written, for caches of search results.
+
+        The point count is only a fallback: re-ingestion overwrites points in place.
+        """
+        return self.count(collection_name)
+
+    async def asearch_batch(
+        self,
+        query_texts: List[str],
+        limit: int = 3,
+        filter_condition: Optional[dict] = None,
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        query_vectors: Optional[np.ndarray] = None,
+        with_vectors: bool = False
+    ) -> List[List[Dict]]:
+        """Async search_batch; stores without a native async client run it on a worker thread."""
+        return await asyncio.to_thread(
+            self.search_batch, query_texts, limit, filter_condition, collection_name, query_vectors, with_vectors
+        )
+
+    async def aretrieve(
+        self,
+        ids: List[str],
+        collection_name: str = settings.VECTOR_COLLECTION_NAME,
+        with_vectors: bool = False
+    ) -> List[Dict]:
+        return await asyncio.to_thread(self.retrieve, ids, collection_name, with_vectors)
+
+    async def aclose(self) -> None:
+        """Release async connections held for the running event loop."""
+
+
+def get_vector_store(backend: str = settings.VECTOR_STORE_BACKEND) -> VectorStore:
+    """The vector store selected by name: "qdrant" (remote cluster) or "local" (in-process snapshot)."""
+    if backend == "local":
+        from infrastructure.db.local_vector_store import LocalVectorStore
+        return LocalVectorStore()
+    if backend != "qdrant":
+        logger.warning(f"Unknown vector store backend {backend!r}, using qdrant")
+    from infrastructure.db.qdrant import QdrantClient
+    return QdrantClient()
@@ -0,0 +1,52 @@
+from pathlib import Path
+from typing import Optional
+from loguru import logger
+from sentence_transformers import SentenceTransformer
+from settings import settings
+
+SUPPORTED_BACKENDS = ("torch", "onnx")
+
+
+def load_model(model_name: str, backend: Optional[str] = None, device: Optional[str] = None) -> SentenceTransformer:
+    """Load an embedding model on the requested backend, falling back to torch."""
+    backend = backend or settings.EMBEDDING_BACKEND
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Unsupported embedding backend: {backend}")
+
+    if backend == "onnx":
+        try:
+            return load_quantized_onnx_model(model_name)
+        except Exception as e:
+            logger.warning(f"ONNX backend unavailable for {model_name}, falling back to torch: {e}")
+
+    return SentenceTransformer(model_name, device=device)
+
+
+def loaded_backend(model: SentenceTransformer) -> str:
+    """Backend a loaded model actually runs on, which differs from the requested one after a fallback."""
+    return getattr(model, "backend", "torch")
+
+
+def load_quantized_onnx_model(model_name: str) -> SentenceTransformer:
+    """Load a dynamically int8-quantized ONNX export, exporting it on first use."""
+    # Imported lazily - requires the optional optimum[onnxruntime] dependency
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    quantization = settings.ONNX_QUANTIZATION_CONFIG
+    local_dir = Path(settings.ONNX_MODEL_DIR) / model_name.replace("/", "__")
+    file_name = f"onnx/model_qint8_{quantization}.onnx"
+
+    if not (local_dir / file_name).exists():
+        logger.info(f"Exporting {model_name} to int8 ONNX ({quantization}) in {local_dir}")
+        # Exports the fp32 ONNX graph, which the quantizer then reads
+        model = SentenceTransformer(model_name, backend="onnx")
+        model.save(str(local_dir))
+        export_dynamic_quantized_onnx_model(
+            model,
+            quantization_config=quantization,
+            model_name_or_path=str(local_dir),
+            file_suffix=f"qint8_{quantization}"
+        )
+
+    logger.info(f"Loading int8 ONNX embedding model from {local_dir / file_name}")
+    return SentenceTransformer(str(local_dir), backend="onnx", model_kwargs={"file_name": file_name})
@@ -0,0 +1,124 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from loguru import logger
+from settings import settings
+from infrastructure.embeddings.engine import EmbeddingEngine
+from shared.utils.metrics import Histogram
+
+
+@dataclass
+class _EncodeRequest:
+    texts: List[str]
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class QueryEmbeddingBatcher:
+    """Coalesces query encodes from concurrent callers into single model calls.
+
+    The first request opens a window of ``window_ms``; everything queued before it
+    closes (or until ``max_batch_size`` texts are collected) is encoded together and
+    each caller's future is resolved with its own rows.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[EmbeddingEngine] = None,
+        window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None
+    ) -> None:
+        self.engine = engine or EmbeddingEngine()
+        self.window = (window_ms if window_ms is not None else settings.QUERY_BATCH_WINDOW_MS) / 1000
+        self.max_batch_size = max_batch_size or settings.QUERY_BATCH_MAX_SIZE
+        self.queue_wait_ms = Histogram([0.5, 1, 2, 5, 10, 20, 50, 100, 250])
+        self.batch_size = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self._queue: "queue.Queue[Optional[_EncodeRequest]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "QueryEmbeddingBatcher":
+        if not self.running:
+            self._thread = threading.Thread(target=self._run, name="query-embedding-batcher", daemon=True)
+            self._thread.start()
+            logger.info(f"Query embedding batcher started (window {self.window * 1000:.1f}ms, "
+                        f"max batch {self.max_batch_size})")
+        return self
+
+    def stop(self) -> None:
+        if self.running:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            logger.info("Query embedding batcher stopped")
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        request = _EncodeRequest(texts=list(texts))
+        self._queue.put(request)
+        return request.future
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Blocking encode, batched with whatever else arrives in the same window."""
+        return self.submit(texts).result()
+
+    async def aencode(self, texts: Sequence[str]) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def metrics(self) -> Dict:
+        return {
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+            "batch_size": self.batch_size.snapshot()
+        }
+
+    def _collect(self, first: _EncodeRequest) -> List[_EncodeRequest]:
+        batch, size = [first], len(first.texts)
+        deadline = time.perf_counter() + self.window
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                # Put the stop sentinel back so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._collect(first)
+            started = time.perf_counter()
+            texts = [text for request in batch for text in request.texts]
+            for request in batch:
+                self.queue_wait_ms.observe((started - request.enqueued_at) * 1000)
+            self.batch_size.observe(len(texts))
+
+            try:
+                vectors = self.engine.encode(texts, batch_size=max(len(texts), 1))
+            except Exception as e:
+                logger.error(f"Batched query embedding failed: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request in batch:
+                request.future.set_result(vectors[offset:offset + len(request.texts)])
+                offset += len(request.texts)
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from loguru import logger
+from settings import settings
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only changes still hit the cache."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """Content-addressed, on-disk embedding store for a single model.
+
+    Each model gets its own directory holding an append-only matrix of vectors
+    (``vectors.bin``), one hex key per row (``keys.txt``) and a small ``meta.json``.
+    The matrix is memory-mapped for reads, so the cache costs almost no RSS.
+    """
+    _instances: Dict[Tuple[str, str], "EmbeddingCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str, model_name: str, dtype: str = "float16") -> None:
+        self.model_name = model_name
+        self.path = Path(cache_dir) / model_name.replace("/", "__")
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.path / "vectors.bin"
+        self._keys_path = self.path / "keys.txt"
+        self._meta_path = self.path / "meta.json"
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+
+        meta = json.loads(self._meta_path.read_text()) if self._meta_path.exists() else {}
+        self.dtype = np.dtype(meta.get("dtype", dtype))
+        self.dimension: Optional[int] = meta.get("dimension")
+
+        self._index: Dict[str, int] = {}
+        if self._keys_path.exists() and self.dimension:
+            # A crashed run can leave rows without keys or a half-written key line
+            text = self._keys_path.read_text()
+            keys = [key for key in text.split("\n") if len(key) == 64]
+            row_size = self.dimension * self.dtype.itemsize
+            size = os.path.getsize(self._vectors_path) if self._vectors_path.exists() else 0
+            keys = keys[:size // row_size]
+            # Cut both files back to the rows that have keys, so later appends stay aligned
+            keys_text = "".join(f"{key}\n" for key in keys)
+            if size != len(keys) * row_size or text != keys_text:
+                logger.warning(f"Truncating torn tail of embedding cache {self.path} to {len(keys)} vectors")
+                os.truncate(self._vectors_path, len(keys) * row_size)
+                self._keys_path.write_text(keys_text)
+            self._index = {key: row for row, key in enumerate(keys)}
+            logger.info(f"Loaded embedding cache {self.path} with {len(self._index)} vectors")
+
+    @classmethod
+    def for_model(cls, model_name: Optional[str] = None, backend: Optional[str] = None) -> Optional["EmbeddingCache"]:
+        """Shared cache for a model on the backend it was loaded with, or None when caching is disabled.
+
+        Pass the loaded model's backend: after an ONNX fallback the vectors come from torch.
+        """
+        if not settings.EMBEDDING_CACHE_DIR:
+            return None
+        model_name = model_name or settings.EMBEDDING_MODEL_NAME
+        backend = backend or settings.EMBEDDING_BACKEND
+        if backend != "torch":
+            # Quantized backends produce slightly different vectors; keep them apart
+            model_name = f"{model_name}-{backend}"
+        key = (settings.EMBEDDING_CACHE_DIR, model_name)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(settings.EMBEDDING_CACHE_DIR, model_name, settings.EMBEDDING_CACHE_DTYPE)
+            return cls._instances[key]
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{normalize_text(text)}".encode()).hexdigest()
+
+    def _matrix(self) -> np.memmap:
+        if self._vectors is None or len(self._vectors) < len(self._index):
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=self.dtype, mode="r", shape=(len(self._index), self.dimension)
+            )
+        return self._vectors
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[List[Optional[np.ndarray]], List[int]]:
+        """Look up texts, returning one vector (or None) per text and the indices that missed."""
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing = []
+        with self._lock:
+            matrix = self._matrix() if self._index else None
+            for i, text in enumerate(texts):
+                row = self._index.get(self.key(text))
+                if row is None:
+                    missing.append(i)
+                else:
+                    vectors[i] = np.asarray(matrix[row], dtype=np.float32)
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return vectors, missing
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """Append vectors for texts that are not cached yet."""
+        vectors = np.asarray(vectors)
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = int(vectors.shape[1])
+                self._meta_path.write_text(json.dumps({
+                    "model_name": self.model_name,
+                    "dimension": self.dimension,
+                    "dtype": self.dtype.name
+                }))
+
+            new_keys, new_rows, seen = [], [], set()
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                if key in self._index or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+            if not new_keys:
+                return
+
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.asarray(new_rows, dtype=self.dtype).tobytes())
+            with open(self._keys_path, "a") as f:
+                f.write("".join(f"{key}\n" for key in new_keys))
+
+            start = len(self._index)
+            self._index.update({key: start + i for i, key in enumerate(new_keys)})
+
+    def encode(self, texts: Sequence[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Return embeddings for texts, calling encode_fn only for cache misses."""
+        vectors, missing = self.get_many(texts)
+        if missing:
+            # Encode each distinct missing text once, then fan the vector out
+            positions: Dict[str, List[int]] = {}
+            for i in missing:
+                positions.setdefault(self.key(texts[i]), []).append(i)
+            unique_texts = [texts[indices[0]] for indices in positions.values()]
+            encoded = np.asarray(encode_fn(unique_texts), dtype=np.float32)
+            self.put_many(unique_texts, encoded)
+            for indices, vector in zip(positions.values(), encoded):
+                for i in indices:
+                    vectors[i] = vector
+        if not vectors:
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "size": len(self._index)
+        }
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,110 @@
+import copy
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence
+import numpy as np
+from loguru import logger
+from sentence_transformers import SentenceTransformer
+from settings import settings
+from infrastructure.embeddings.backends import load_model, loaded_backend
+
+
+class EmbeddingEngine:
+    """Process-wide embedding model, shared by every caller of the same model name."""
+    _instances: Dict[str, "EmbeddingEngine"] = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, model_name: Optional[str] = None) -> "EmbeddingEngine":
+        model_name = model_name or settings.EMBEDDING_MODEL_NAME
+        with cls._instances_lock:
+            instance = cls._instances.get(model_name)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance.model_name = model_name
+                instance._model = None
+                instance._load_lock = threading.Lock()
+                instance._encode_lock = threading.Lock()
+                instance.query_batcher = None
+                cls._instances[model_name] = instance
+        return instance
+
+    @property
+    def model(self) -> SentenceTransformer:
+        """Load the model on first use; concurrent callers wait for the same load."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    logger.info(f"Loading embedding model: {self.model_name} ({settings.EMBEDDING_BACKEND} backend)")
+                    self._model = load_model(self.model_name)
+        return self._model
+
+    @property
+    def backend(self) -> str:
+        """Backend the loaded model runs on ("torch" after an ONNX fallback)."""
+        return loaded_backend(self.model)
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    @property
+    def max_seq_length(self) -> int:
+        """Tokens the model reads per input, including special tokens; the rest is truncated."""
+        return self.model.max_seq_length
+
+    def new_tokenizer(self):
+        """Private copy of the model's tokenizer, safe to use while encode() runs on another thread."""
+        return copy.deepcopy(self.model.tokenizer)
+
+    def warmup(self) -> "EmbeddingEngine":
+        """Load the model and run one encode so the first request does not pay for it."""
+        self.encode(["warmup"])
+        logger.info(f"Embedding model {self.model_name} warmed up")
+        return self
+
+    def encode(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Encode texts in batches, returning a (len(texts), dimension) float32 matrix."""
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        model = self.model
+        # Fast tokenizers are not safe to share between threads
+        with self._encode_lock:
+            return model.encode(
+                list(texts),
+                batch_size=batch_size or settings.EMBEDDING_BATCH_SIZE,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+
+    def encode_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """Encode a handful of search queries in a single forward pass.
+
+        When a query batcher is running, the queries are coalesced with those of
+        concurrent callers instead.
+        """
+        if self.query_batcher is not None and self.query_batcher.running:
+            return self.query_batcher.encode(queries)
+        return self.encode(queries, batch_size=max(len(queries), 1))
+
+    def start_query_batching(self, window_ms: Optional[float] = None, max_batch_size: Optional[int] = None):
+        """Route encode_queries through a cross-request micro-batcher."""
+        from infrastructure.embeddings.batcher import QueryEmbeddingBatcher
+
+        if self.query_batcher is None:
+            self.query_batcher = QueryEmbeddingBatcher(self, window_ms=window_ms, max_batch_size=max_batch_size)
+        return self.query_batcher.start()
+
+    def stop_query_batching(self) -> None:
+        if self.query_batcher is not None:
+            self.query_batcher.stop()
+
+
+def length_sorted_batches(texts: Sequence[str], batch_size: int) -> Iterator[List[int]]:
+    """Yield index batches of similar-length texts to keep padding per batch small."""
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    for start in range(0, len(order), batch_size):
+        yield order[start:start + batch_size]
+
+
+# Lazily loaded - the model is only read from disk on first encode
+embedding_engine = EmbeddingEngine()
@@ -0,0 +1,116 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterable, Iterator, List, Optional, Sequence
+import numpy as np
+from loguru import logger
+from settings import settings
+
+# Per-process model, created by the pool initializer
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int) -> None:
+    # Thread counts must be pinned before torch is imported in the worker
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+    import torch
+    from infrastructure.embeddings.backends import load_model
+
+    torch.set_num_threads(threads)
+    global _worker_model
+    _worker_model = load_model(model_name, device="cpu")
+
+
+def _encode_batch(texts: List[str], batch_size: int) -> np.ndarray:
+    return _worker_model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+
+
+def _worker_backend() -> str:
+    from infrastructure.embeddings.backends import loaded_backend
+
+    return loaded_backend(_worker_model)
+
+
+class EmbeddingProcessPool:
+    """Pool of CPU worker processes, each holding one copy of the embedding model.
+
+    Use as a context manager so workers are torn down (and queued work cancelled)
+    even when the calling step fails.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        model_name: Optional[str] = None
+    ) -> None:
+        cpu_count = os.cpu_count() or 1
+        self.workers = workers or settings.EMBEDDING_WORKERS or cpu_count
+        self.threads_per_worker = (
+            threads_per_worker or settings.EMBEDDING_THREADS_PER_WORKER or max(cpu_count // self.workers, 1)
+        )
+        self.model_name = model_name or settings.EMBEDDING_MODEL_NAME
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._backend: Optional[str] = None
+
+    def __enter__(self) -> "EmbeddingProcessPool":
+        logger.info(f"Starting {self.workers} embedding workers with {self.threads_per_worker} threads each")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            # spawn avoids forking a parent that may already hold torch thread pools
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.threads_per_worker)
+        )
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(cancel=exc_type is not None)
+
+    @property
+    def backend(self) -> str:
+        """Backend the workers' model runs on, asked of a worker so the parent never loads the model."""
+        if self._executor is None:
+            raise RuntimeError("EmbeddingProcessPool must be entered before use")
+        if self._backend is None:
+            self._backend = self._executor.submit(_worker_backend).result()
+        return self._backend
+
+    def close(self, cancel: bool = False) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=cancel)
+            self._executor = None
+            logger.info("Embedding workers shut down")
+
+    def imap(self, batches: Iterable[List[str]], batch_size: int = settings.EMBEDDING_BATCH_SIZE) -> Iterator[np.ndarray]:
+        """Encode batches across the workers, yielding results in submission order."""
+        if self._executor is None:
+            raise RuntimeError("EmbeddingProcessPool must be entered before use")
+
+        # Keep every worker busy without queueing the whole corpus up front
+        max_in_flight = self.workers * 2
+        pending: Deque[Future] = deque()
+        try:
+            for batch in batches:
+                pending.append(self._executor.submit(_encode_batch, batch, batch_size))
+                if len(pending) >= max_in_flight:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def encode(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Drop-in for EmbeddingEngine.encode that shards texts across the workers."""
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        texts = list(texts)
+        batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+        results = list(self.imap(batches, batch_size))
+        if not results:
+            return np.empty((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+        return np.vstack(results)
@@ -10,12 +10,18 @@ from steps.etl.load import load_data
 def data_etl_pipeline(
     zip_url: str,
     collection_name: str,
-    mongodb_connection_string: str
+    mongodb_connection_string: str,
+    incremental: bool = True
 ) -> None:
     """Pipeline to download zip file, extract contents, transform, and store in a NoSQL DB."""
     
-    # Extract data from zip file
-    raw_documents = extract_data(zip_url=zip_url)
+    # Extract new or changed documents from zip file
+    raw_documents, archive_manifest = extract_data(
+        zip_url=zip_url,
+        collection_name=collection_name,
+        mongodb_connection_string=mongodb_connection_string,
+        incremental=incremental
+    )
     
     # Clean the documents
     cleaned_documents = clean_transcript(raw_data=raw_documents)
@@ -26,9 +32,11 @@ def data_etl_pipeline(
     # Transform the documents
     transformed_documents = transform_transcript(raw_data=normalized_documents)
     
-    # Store in MongoDB
+    # Upsert into MongoDB, removing documents no longer in the archive
     load_data(
         documents=transformed_documents,
         collection_name=collection_name,
-        mongodb_connection_string=mongodb_connection_string
-    )
\ No newline at end of file
+        mongodb_connection_string=mongodb_connection_string,
+        manifest=archive_manifest,
+        incremental=incremental
+    )
@@ -1,8 +1,19 @@
+import itertools
+from typing import Dict, Iterator, List, Optional
 from zenml import pipeline
-from steps.ingestion.query_data_warehouse import query_data_warehouse
-from steps.ingestion.clean import clean_documents
-from steps.ingestion.chunk_embed import chunk_and_embed
-from steps.ingestion.load_to_vector_db import load_to_vector_db
+from loguru import logger
+from steps.ingestion.query_data_warehouse import query_data_warehouse, stream_documents
+from steps.ingestion.clean import clean_documents, iter_clean_documents
+from steps.ingestion.chunk_embed import chunk_and_embed, chunk_document, embed_texts, embedding_cache
+from steps.ingestion.load_to_vector_db import index_chunks, load_to_vector_db, source_ids
+from infrastructure.db.bm25 import BM25IndexBuilder, index_path
+from infrastructure.db.mongo import MongoDBClient
+from infrastructure.db.vector_store import get_vector_store, point_id
+from infrastructure.embeddings.cache import EmbeddingCache
+from infrastructure.embeddings.engine import EmbeddingEngine
+from infrastructure.embeddings.pool import EmbeddingProcessPool
+from shared.preprocessing.operations.dedup import ChunkDeduplicator, NearDuplicateDetector
+from shared.utils.streaming import Stage, StreamingPipeline
 from settings import settings
 
 @pipeline(enable_cache=False)
@@ -18,4 +29,137 @@ def data_ingestion_pipeline():
     embedded_chunks = chunk_and_embed(documents=cleaned_documents)
     
     # Save embedded chunks
-    load_to_vector_db(documents=embedded_chunks)
\ No newline at end of file
+    load_to_vector_db(documents=embedded_chunks)
+
+
+def streaming_ingestion(
+    collections: Optional[List[str]] = None,
+    collection_name: str = settings.VECTOR_COLLECTION_NAME,
+    embed_batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+    workers: int = settings.EMBEDDING_WORKERS,
+    queue_size: int = settings.INGESTION_QUEUE_SIZE,
+    dedup_threshold: float = settings.DEDUP_THRESHOLD
+) -> Dict[str, Dict]:
+    """Same stages as data_ingestion_pipeline, run concurrently over bounded queues outside ZenML.
+
+    Mongo reads, chunking and tagging, embedding and Qdrant upserts each run in their
+    own thread, so network and CPU work overlap while memory stays bounded by the queues.
+    Returns per-stage metrics.
+    """
+    collections = collections or [settings.MONGODB_COLLECTION_NAME]
+    mongo_client = MongoDBClient(settings.MONGODB_CONNECTION_STRING)
+    vector_store = get_vector_store()
+    model = EmbeddingEngine()
+    # Set once the pool is up: with workers the backend comes from them, without loading the model here
+    cache: Optional[EmbeddingCache] = None
+    upsert_size = settings.QDRANT_UPSERT_BATCH_SIZE * settings.QDRANT_UPSERT_PARALLELISM
+    pool: Optional[EmbeddingProcessPool] = None
+    lexical_index = BM25IndexBuilder() if settings.BM25_INDEX_DIR else None
+    # Kept chunks are already on their way downstream, so references are applied after the run
+    deduplicator = ChunkDeduplicator(
+        NearDuplicateDetector(dedup_threshold, settings.DEDUP_NUM_PERM, settings.DEDUP_SHINGLE_SIZE),
+        annotate=False
+    ) if dedup_threshold > 0 else None
+    # Documents whose old points were deleted this run; later batches only add to them
+    replaced = set()
+
+    def read() -> Iterator[Dict]:
+        for name in collections:
+            yield from stream_documents(mongo_client.db.get_collection(name))
+
+    def chunk(documents: Iterator[Dict]) -> Iterator[List[Dict]]:
+        for position, doc in enumerate(documents, 1):
+            try:
+                yield chunk_document(doc, position)
+            except Exception as e:
+                logger.error(f"Failed to process document {position}: {e}")
+
+    def dedup(chunk_lists: Iterator[List[Dict]]) -> Iterator[List[Dict]]:
+        for chunks in chunk_lists:
+            kept = deduplicator.collapse(chunks)
+            if kept:
+                yield kept
+
+    def embed(chunk_lists: Iterator[List[Dict]]) -> Iterator[List[Dict]]:
+        # Several model batches per call so length sorting has something to work with
+        target = embed_batch_size * 4
+        pending: List[Dict] = []
+        for chunks in itertools.chain(chunk_lists, [None]):
+            if chunks is not None:
+                pending.extend(chunks)
+                if len(pending) < target:
+                    continue
+            if not pending:
+                continue
+            embeddings = embed_texts([c['text'] for c in pending], model, cache, embed_batch_size, pool=pool)
+            for chunk_doc, embedding in zip(pending, embeddings):
+                chunk_doc['embedding'] = embedding.tolist()
+            yield pending
+            pending = []
+
+    def upsert(chunk_lists: Iterator[List[Dict]]) -> Iterator[int]:
+        pending: List[Dict] = []
+        for chunks in itertools.chain(chunk_lists, [None]):
+            if chunks is not None:
+                pending.extend(chunks)
+                if len(pending) < upsert_size:
+                    continue
+            if not pending:
+                continue
+            stale = source_ids(pending) - replaced
+            vector_store.delete_documents(stale, collection_name=collection_name)
+            replaced.update(stale)
+            vector_store.add_documents(documents=pending, collection_name=collection_name)
+            if lexical_index is not None:
+                index_chunks(lexical_index, pending)
+            yield len(pending)
+            pending = []
+
+    stages = [
+        Stage("clean", iter_clean_documents, queue_size=queue_size),
+        Stage("chunk", chunk, queue_size=queue_size),
+        Stage("embed", embed, queue_size=queue_size),
+        Stage("upsert", upsert, queue_size=queue_size),
+    ]
+    if deduplicator is not None:
+        stages.insert(2, Stage("dedup", dedup, queue_size=queue_size))
+    stream = StreamingPipeline(read(), stages, source_name="read")
+
+    if workers > 0:
+        with EmbeddingProcessPool(workers=workers) as pool:
+            cache = embedding_cache(model, pool)
+            metrics = stream.run()
+    else:
+        cache = embedding_cache(model)
+        metrics = stream.run()
+
+    for name, stage in metrics.items():
+        logger.info(f"{name}: {stage['items_in']} in, {stage['items_out']} out, "
+                    f"{stage['throughput_per_sec']:.1f}/sec, busy {stage['busy_seconds']:.1f}s, "
+                    f"waiting {stage['wait_seconds']:.1f}s, queue depth mean {stage['mean_queue_depth']:.1f} "
+                    f"max {stage['max_queue_depth']}")
+    if deduplicator is not None:
+        duplicates = deduplicator.duplicate_sources()
+        # Documents whose every chunk was collapsed into another document's
+        vector_store.delete_documents(
+            source_ids({'metadata': {'duplicate_sources': sources}} for _, sources in duplicates) - replaced,
+            collection_name=collection_name
+        )
+        vector_store.set_payload({
+            point_id(representative['metadata'], representative['text']): {
+                'duplicate_sources': sources,
+                'duplicate_count': len(sources)
+            }
+            for representative, sources in duplicates
+        }, collection_name=collection_name)
+    vector_store.flush(collection_name)
+    # Written only after every upsert succeeded, so the index never names missing points
+    if lexical_index is not None:
+        lexical_index.write(index_path(collection_name))
+    if deduplicator is not None:
+        deduplicator.log_stats()
+    if cache is not None:
+        stats = cache.stats()
+        logger.info(f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+                    f"({stats['hit_ratio']:.1%} hit ratio)")
+    return metrics
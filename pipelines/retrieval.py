@@ -1,22 +1,56 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 from zenml import pipeline
-from typing import List
+from typing import Any, Awaitable, Dict, List, TypeVar
 
+from settings import settings
 from shared.domain.queries import LLMQuery
 from shared.domain.types import QueryIntent
 from steps.retrieval.intent_detection import IntentDetector
 from shared.preprocessing.operations.tagging import tag_chunk
-from steps.ingestion.query_data_warehouse import execute_mongo_query
+from steps.ingestion.query_data_warehouse import aexecute_mongo_query
 from steps.retrieval.query_expansion import QueryExpansion
 from steps.retrieval.self_query import SelfQuery
-from steps.retrieval.reranking import Reranker
-from infrastructure.db.qdrant import connection
+from steps.retrieval.reranking import get_reranker
+from steps.retrieval.semantic_cache import semantic_cache
+from infrastructure.db.vector_store import get_vector_store
+from infrastructure.db.mongo import AsyncMongoDBClient
+from infrastructure.db.bm25 import BM25Index, reciprocal_rank_fusion
+from infrastructure.embeddings.engine import EmbeddingEngine
 from shared.domain.documents import VectorSearchResult
 
+T = TypeVar("T")
+
+
 def retrieval_pipeline(query: str, top_k: int = 3) -> List[VectorSearchResult]:
     """
     Execute the RAG retrieval pipeline
     """
+    coroutine = _closing_clients(aretrieval_pipeline(query, top_k=top_k))
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    # Called from inside an event loop (e.g. the API): run on a fresh loop in a worker thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+async def _closing_clients(awaitable: Awaitable[T]) -> T:
+    """Await on a private loop, then close the async clients opened on it."""
+    try:
+        return await awaitable
+    finally:
+        await get_vector_store().aclose()
+        await AsyncMongoDBClient.aclose()
+
+
+async def aretrieval_pipeline(query: str, top_k: int = 3) -> List[VectorSearchResult]:
+    """
+    Execute the RAG retrieval pipeline, running the independent LLM calls concurrently
+    """
     logger.info(f"Retrieving context for query: {query}")
     
     try:
@@ -24,99 +58,181 @@ def retrieval_pipeline(query: str, top_k: int = 3) -> List[VectorSearchResult]:
         if isinstance(query, str):
             query = LLMQuery.from_str(query)
 
-        # Intent detection
-        intent_detector = IntentDetector()
-        intent, action = intent_detector.detect(query)
+        # Intent detection, query expansion and self query all start at once
+        intent_task = asyncio.create_task(_with_timeout(
+            IntentDetector().adetect(query),
+            settings.INTENT_DETECTION_TIMEOUT,
+            (QueryIntent.GENERAL, None),
+            "Intent detection"
+        ))
+        expansion_task = asyncio.create_task(_with_timeout(
+            QueryExpansion().agenerate(query, expand_to_n=settings.QUERY_EXPANSIONS),
+            settings.QUERY_EXPANSION_TIMEOUT,
+            [query],
+            "Query expansion"
+        ))
+        self_query_task = asyncio.create_task(_with_timeout(
+            SelfQuery().agenerate(query),
+            settings.SELF_QUERY_TIMEOUT,
+            "none",
+            "Self query"
+        ))
+        embedding_task = asyncio.create_task(
+            asyncio.to_thread(semantic_cache.embed, query.content) if settings.SEMANTIC_CACHE_ENABLED
+            else asyncio.sleep(0)
+        )
+
+        intent, action = await intent_task
         logger.info(f"Detected intent: {intent} {action}")
 
         if intent != QueryIntent.GENERAL:
-            results = execute_mongo_query(action)
+            # Expansion and self query are not needed for database lookups
+            for task in (expansion_task, self_query_task, embedding_task):
+                task.cancel()
+            await asyncio.gather(expansion_task, self_query_task, embedding_task, return_exceptions=True)
+
+            results = await aexecute_mongo_query(action)
             logger.info(f"Found {len(results)} documents matching intent query")
             return results
 
-        # Tag query
-        query_tags = tag_chunk(query.content)
-        logger.info(f"Query tags: {query_tags}")
-        filter_condition = None
-        
-        # Expand query
-        # Generate expanded queries
-        query_expander = QueryExpansion()
-        expanded_queries = query_expander.generate(query, expand_to_n=3)
-        logger.info(f"Generated {len(expanded_queries)} expanded queries")
-       
-        # Generate self queries
-        self_query = SelfQuery()
-        self_query = self_query.generate(query)
+        self_query, query_embedding = await asyncio.gather(self_query_task, embedding_task)
         logger.info(f"Generated self query: {self_query}")
-        
-        # Extract terms from self queries and add to query tags
-        tags = self_query.split(',')
-        query_tags.extend([tag.strip() for tag in tags if tag.strip() and not tag.startswith("none")])
-        logger.info(f"Query tags after self query: {query_tags}")
-
-        # Create filter condition if we have tags
-        if len(query_tags) > 0:
-            filter_condition = {
-                "must": [
-                    {
-                        "key": "tags",
-                        "match": { "any": query_tags }
-                    }
-                ]
-            }
-
-        # Combine expanded and self queries
-        if isinstance(self_query, LLMQuery):
-            expanded_queries.extend(self_query)
-        logger.info(f"Total queries after combining: {len(expanded_queries)}")
-        
-        # Search using all queries
-        all_results = []
-        seen = set()
-        
-        for idx, expanded_query in enumerate(expanded_queries):
-            logger.debug(f"Searching with query {idx + 1}: {expanded_query.content}")
-            
-            results = connection.search(
-                query_text=expanded_query.content,
-                limit=5,
-                filter_condition=filter_condition
-            )
-
-            if len(results) == 0:
-                logger.warning(f"Filter condition returned no results. Trying without filter condition.")
-                results = connection.search(
-                    query_text=expanded_query.content,
-                    limit=5,
-                    filter_condition=None
-                )
-            
-            # Convert results and remove duplicates
-            if len(results) > 0:    
-                for result in results:
-                    chunk = VectorSearchResult(
-                        text=result.get("content", ""),
-                        metadata=result.get("metadata", {}),
-                        score=result.get("score")
-                    )
-                    if chunk.text not in seen:
-                        seen.add(chunk.text)
-                        all_results.append(chunk)
-                    
-            logger.info(f"Found {len(results)} results for query {idx + 1}")
-        
-        if len(all_results) == 0:
-            logger.warning("No results found from vector search")
-            return []
-            
-        # Rerank combined results
-        reranker = Reranker()
-        reranked_results = reranker.generate(query, all_results, keep_top_k=top_k)
-        
-        logger.info(f"Retrieved and reranked {len(reranked_results)} final results")
-        return reranked_results
+        query_tags = _query_tags(query, self_query)
+
+        # Near-identical questions with the same filters reuse earlier results without expansion or search
+        if settings.SEMANTIC_CACHE_ENABLED:
+            cached = await asyncio.to_thread(semantic_cache.get, query.content, top_k, query_embedding, query_tags)
+            if cached is not None:
+                expansion_task.cancel()
+                await asyncio.gather(expansion_task, return_exceptions=True)
+                return cached
+
+        expanded_queries = await expansion_task
+        logger.info(f"Generated {len(expanded_queries)} expanded queries")
+
+        results = await _asearch_and_rerank(query, expanded_queries, query_tags, top_k)
+        if settings.SEMANTIC_CACHE_ENABLED:
+            await asyncio.to_thread(semantic_cache.put, query.content, results, top_k, query_embedding, query_tags)
+        return results
         
     except Exception as e:
         logger.error(f"Error in retrieval pipeline: {str(e)}")
         return []
+
+
+async def _with_timeout(awaitable: Awaitable[T], timeout: float, default: T, name: str) -> T:
+    """Await an LLM call, falling back to default when it exceeds its timeout."""
+    try:
+        return await asyncio.wait_for(awaitable, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"{name} timed out after {timeout}s, continuing without it")
+        return default
+
+
+def _query_tags(query: LLMQuery, self_query: Any) -> List[str]:
+    # Tag query
+    query_tags = tag_chunk(query.content)
+    logger.info(f"Query tags: {query_tags}")
+
+    # Extract terms from self queries and add to query tags
+    if isinstance(self_query, str):
+        tags = self_query.split(',')
+        query_tags.extend([tag.strip() for tag in tags if tag.strip() and not tag.startswith("none")])
+    logger.info(f"Query tags after self query: {query_tags}")
+    return query_tags
+
+
+async def _asearch_and_rerank(
+    query: LLMQuery,
+    expanded_queries: List[LLMQuery],
+    query_tags: List[str],
+    top_k: int
+) -> List[VectorSearchResult]:
+    filter_condition = None
+
+    # Create filter condition if we have tags
+    if len(query_tags) > 0:
+        filter_condition = {
+            "must": [
+                {
+                    "key": "tags",
+                    "match": { "any": query_tags }
+                }
+            ]
+        }
+
+    logger.info(f"Total queries after combining: {len(expanded_queries)}")
+    
+    # Embed the queries once: the search and the reranker share these vectors
+    query_texts = [expanded_query.content for expanded_query in expanded_queries]
+    query_vectors = await asyncio.to_thread(EmbeddingEngine().encode_queries, query_texts)
+
+    # Fused (ranked) candidates are not re-sorted by cosine, so stored vectors are only needed without BM25
+    lexical_index = BM25Index.for_collection()
+    with_vectors = lexical_index is None
+
+    # Search using all queries in a single batched request
+    vector_store = get_vector_store()
+    batch_results = await vector_store.asearch_batch(
+        query_texts=query_texts,
+        limit=5,
+        filter_condition=filter_condition,
+        query_vectors=query_vectors,
+        with_vectors=with_vectors
+    )
+    
+    # Ranked point IDs per query (text for results without one), fused below
+    candidates: Dict[str, VectorSearchResult] = {}
+    rankings: List[List[str]] = []
+    for idx, results in enumerate(batch_results):
+        ranking = []
+        for result in results:
+            chunk = _to_search_result(result)
+            key = chunk.id or chunk.text
+            candidates.setdefault(key, chunk)
+            ranking.append(key)
+        rankings.append(ranking)
+
+        logger.info(f"Found {len(results)} results for query {idx + 1}")
+
+    # Exact terms (fiscal year '24, ARR, dollar figures) from the BM25 index; it ignores the tag filter
+    if lexical_index is not None:
+        lexical_rankings = [[key for key, _ in lexical_index.search(text, settings.BM25_TOP_K)] for text in query_texts]
+        missing = list(dict.fromkeys(key for ranking in lexical_rankings for key in ranking if key not in candidates))
+        for result in await vector_store.aretrieve(missing):
+            candidates[result["id"]] = _to_search_result(result)
+        logger.info(f"Lexical search added {len(missing)} candidates")
+        rankings.extend(lexical_rankings)
+
+    # Reciprocal rank fusion, then remove duplicates
+    all_results = []
+    seen = set()
+    for key in reciprocal_rank_fusion(rankings, k=settings.RRF_K):
+        chunk = candidates.get(key)
+        if chunk is not None and chunk.text not in seen:
+            seen.add(chunk.text)
+            all_results.append(chunk)
+    
+    if len(all_results) == 0:
+        logger.warning("No results found from vector search")
+        return []
+
+    # Rerank combined results; with lexical hits they arrive ranked by fusion
+    reranker = get_reranker()
+    query_vector = query_vectors[query_texts.index(query.content)] if query.content in query_texts else None
+    reranked_results = await asyncio.to_thread(
+        reranker.generate, query, all_results, top_k, query_vector, lexical_index is not None
+    )
+    
+    logger.info(f"Retrieved and reranked {len(reranked_results)} final results")
+    return reranked_results
+
+
+def _to_search_result(result: Dict) -> VectorSearchResult:
+    return VectorSearchResult(
+        text=result.get("content", ""),
+        metadata=result.get("metadata", {}),
+        score=result.get("score"),
+        id=result.get("id"),
+        vector=result.get("vector")
+    )
@@ -11,21 +11,99 @@ class Settings(BaseSettings):
     # MongoDB settings
     MONGODB_CONNECTION_STRING: str = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017")
     MONGODB_COLLECTION_NAME: str = os.getenv("MONGODB_COLLECTION_NAME", "")
+    # Documents per cursor round trip when streaming a collection
+    MONGODB_CURSOR_BATCH_SIZE: int = int(os.getenv("MONGODB_CURSOR_BATCH_SIZE", "100"))
+    # Async client used by the API: connection pool size and per-operation timeout
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+    MONGODB_TIMEOUT_MS: int = int(os.getenv("MONGODB_TIMEOUT_MS", "10000"))
 
     # Qdrant settings
     VECTOR_COLLECTION_NAME: str = os.getenv("VECTOR_COLLECTION_NAME", "")
     USE_QDRANT_CLOUD: bool = True
     QDRANT_CLUSTER_URL: str = os.getenv("QDRANT_CLUSTER_URL", "")   
     QDRANT_APIKEY: str | None = os.getenv("QDRANT_APIKEY", None)
+    # Points per upsert request and how many requests may be in flight at once
+    QDRANT_UPSERT_BATCH_SIZE: int = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+    QDRANT_UPSERT_PARALLELISM: int = int(os.getenv("QDRANT_UPSERT_PARALLELISM", "4"))
+    # Async client used by the API: gRPC when available, request timeout in seconds, REST connection pool size
+    QDRANT_PREFER_GRPC: bool = os.getenv("QDRANT_PREFER_GRPC", "true").lower() == "true"
+    QDRANT_TIMEOUT: int = int(os.getenv("QDRANT_TIMEOUT", "10"))
+    QDRANT_MAX_CONNECTIONS: int = int(os.getenv("QDRANT_MAX_CONNECTIONS", "100"))
+    # "qdrant" (remote cluster) or "local" (in-process snapshot under VECTOR_STORE_DIR)
+    VECTOR_STORE_BACKEND: str = os.getenv("VECTOR_STORE_BACKEND", "qdrant")
+    VECTOR_STORE_DIR: str = os.getenv("VECTOR_STORE_DIR", ".cache/vector_store")
     
     # OpenAI settings
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     TEXT_EMBEDDING_MODEL: str = os.getenv("TEXT_EMBEDDING_MODEL", "")
+    # Persistent cache of temperature-0 LLM responses
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite")
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    # Per-call timeouts (seconds) for the concurrent retrieval LLM calls
+    INTENT_DETECTION_TIMEOUT: float = float(os.getenv("INTENT_DETECTION_TIMEOUT", "10"))
+    QUERY_EXPANSION_TIMEOUT: float = float(os.getenv("QUERY_EXPANSION_TIMEOUT", "10"))
+    SELF_QUERY_TIMEOUT: float = float(os.getenv("SELF_QUERY_TIMEOUT", "10"))
 
     # Vector Embedding Settings
     EMBEDDING_MODEL_NAME: str = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
     EMBEDDING_DIMENSION: int = int(os.getenv("EMBEDDING_DIMENSION", "384"))
+    # "torch" (full precision) or "onnx" (int8-quantized ONNX Runtime, falls back to torch)
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    ONNX_MODEL_DIR: str = os.getenv("ONNX_MODEL_DIR", ".cache/onnx")
+    ONNX_QUANTIZATION_CONFIG: str = os.getenv("ONNX_QUANTIZATION_CONFIG", "avx2")
+    # Chunk size in model tokens (0 = the model's maximum sequence length) and overlap between chunks
+    CHUNK_MAX_TOKENS: int = int(os.getenv("CHUNK_MAX_TOKENS", "0"))
+    CHUNK_OVERLAP_TOKENS: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+    # Near-duplicate chunk detection before embedding (MinHash/LSH over word shingles); 0 disables it
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+    DEDUP_NUM_PERM: int = int(os.getenv("DEDUP_NUM_PERM", "128"))
+    DEDUP_SHINGLE_SIZE: int = int(os.getenv("DEDUP_SHINGLE_SIZE", "5"))
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    # Set to an empty string to disable the on-disk embedding cache
+    EMBEDDING_CACHE_DIR: str = os.getenv("EMBEDDING_CACHE_DIR", ".cache/embeddings")
+    EMBEDDING_CACHE_DTYPE: str = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")
+    # Cross-request micro-batching of query embeddings in the API
+    QUERY_BATCHING_ENABLED: bool = os.getenv("QUERY_BATCHING_ENABLED", "true").lower() == "true"
+    QUERY_BATCH_WINDOW_MS: float = float(os.getenv("QUERY_BATCH_WINDOW_MS", "5"))
+    QUERY_BATCH_MAX_SIZE: int = int(os.getenv("QUERY_BATCH_MAX_SIZE", "32"))
+    # Semantic cache in front of the retrieval pipeline
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "512"))
+    SEMANTIC_CACHE_TTL_SECONDS: float = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+    SEMANTIC_CACHE_VERSION_CHECK_SECONDS: float = float(os.getenv("SEMANTIC_CACHE_VERSION_CHECK_SECONDS", "30"))
+    # Reranking: "cosine" (bi-encoder vectors from the search) or "cross-encoder" (CPU model over the top candidates).
+    # With the BM25 index enabled the candidates arrive ranked by fusion, which "cosine" keeps as is
+    RERANKER: str = os.getenv("RERANKER", "cosine")
+    RERANKER_MODEL_NAME: str = os.getenv("RERANKER_MODEL_NAME", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_TOP_N: int = int(os.getenv("RERANK_TOP_N", "20"))
+    RERANK_BATCH_SIZE: int = int(os.getenv("RERANK_BATCH_SIZE", "16"))
+    RERANK_CACHE_SIZE: int = int(os.getenv("RERANK_CACHE_SIZE", "4096"))
+    # Past this, the cross-encoder is abandoned and candidates keep vector order
+    RERANK_LATENCY_BUDGET_MS: float = float(os.getenv("RERANK_LATENCY_BUDGET_MS", "300"))
+    # Hybrid retrieval: a BM25 index written at ingestion (empty dir disables it), fused with dense hits by RRF
+    BM25_INDEX_DIR: str = os.getenv("BM25_INDEX_DIR", ".cache/bm25")
+    BM25_TOP_K: int = int(os.getenv("BM25_TOP_K", "5"))
+    RRF_K: int = int(os.getenv("RRF_K", "60"))
+    QUERY_EXPANSIONS: int = int(os.getenv("QUERY_EXPANSIONS", "3"))
+    # Worker processes for ingestion embedding; 0 encodes in-process
+    EMBEDDING_WORKERS: int = int(os.getenv("EMBEDDING_WORKERS", "0"))
+    # Torch threads per worker; 0 splits the available cores evenly
+    EMBEDDING_THREADS_PER_WORKER: int = int(os.getenv("EMBEDDING_THREADS_PER_WORKER", "0"))
+    # Items buffered between stages of the streaming ingestion engine
+    INGESTION_QUEUE_SIZE: int = int(os.getenv("INGESTION_QUEUE_SIZE", "8"))
+    # Worker processes for PDF text extraction in the ETL; 0 or 1 extracts in-process
+    PDF_EXTRACTION_WORKERS: int = int(os.getenv("PDF_EXTRACTION_WORKERS", "0"))
+    # Source archive download; an empty cache dir spools to a temporary file for each run
+    ARCHIVE_CACHE_DIR: str = os.getenv("ARCHIVE_CACHE_DIR", ".cache/downloads")
+    DOWNLOAD_CHUNK_SIZE: int = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))
+    DOWNLOAD_SPOOL_MAX_BYTES: int = int(os.getenv("DOWNLOAD_SPOOL_MAX_BYTES", str(16 * 1024 * 1024)))
+    DOWNLOAD_MAX_RETRIES: int = int(os.getenv("DOWNLOAD_MAX_RETRIES", "5"))
+    DOWNLOAD_TIMEOUT: float = float(os.getenv("DOWNLOAD_TIMEOUT", "60"))
+    # Only disable for hosts with self-signed certificates in testing
+    DOWNLOAD_VERIFY_TLS: bool = os.getenv("DOWNLOAD_VERIFY_TLS", "true").lower() == "true"
 
     # Salesforce ID and Name
     SALESFORCE_ID: str = '82365789-5342-3256-8071-655843261987'
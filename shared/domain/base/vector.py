@@ -4,10 +4,9 @@ from pydantic import BaseModel
 from qdrant_client.http.models import Distance, VectorParams
 from qdrant_client.models import PointStruct
 from loguru import logger
-from sentence_transformers import SentenceTransformer
 from settings import settings
 from shared.domain.types import DataCategory
-from infrastructure.db.qdrant import connection
+from infrastructure.embeddings.engine import EmbeddingEngine
 
 T = TypeVar("T", bound="VectorBaseDocument")
 
@@ -17,10 +16,9 @@ class VectorBaseDocument(BaseModel):
     
     @classmethod
     def _get_embeddings(cls, texts: List[str]) -> List[List[float]]:
-        """Get embeddings using SentenceTransformer."""
+        """Get embeddings from the shared embedding engine."""
         try:
-            model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
-            return model.encode(texts).tolist()
+            return EmbeddingEngine().encode(texts).tolist()
         except Exception as e:
             logger.error(f"Failed to generate embeddings: {e}")
             raise
@@ -28,6 +26,8 @@ class VectorBaseDocument(BaseModel):
     @classmethod
     def create_collection(cls) -> None:
         """Create a Qdrant collection if it doesn't exist."""
+        from infrastructure.db.qdrant import connection
+
         if not connection.collection_exists(cls.collection_name):
             connection.create_collection(
                 collection_name=cls.collection_name,
@@ -62,6 +62,7 @@ class VectorBaseDocument(BaseModel):
             logger.debug(f"Converting document {self.id} to vector format")
             
             # Save to Qdrant
+            from infrastructure.db.qdrant import connection
             connection.upsert(
                 collection_name=self.collection_name,
                 points=[point]
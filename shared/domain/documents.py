@@ -1,7 +1,7 @@
 from pydantic import UUID4, Field, BaseModel
 from shared.domain.base import NoSQLBaseDocument
 from shared.domain.types import DataCategory
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 
 class EarningsCallDocument(NoSQLBaseDocument):
@@ -16,6 +16,9 @@ class VectorSearchResult(BaseModel):
     text: str
     metadata: Dict[str, Any]
     score: float | None = None
+    id: Optional[str] = None
+    # Stored embedding, when the search asked for it; never serialized
+    vector: Optional[List[float]] = Field(default=None, exclude=True, repr=False)
 
     @property
     def content(self) -> str:
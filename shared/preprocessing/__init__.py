@@ -1,4 +1,4 @@
-from shared.preprocessing.operations import clean_text, create_chunks, tag_chunk
+from shared.preprocessing.operations import clean_text, create_chunks, create_token_chunks, deduplicate_chunks, tag_chunk, tag_batch
 from shared.preprocessing.cleaning_data_handlers import CleaningDataHandler
 from shared.preprocessing.chunking_data_handlers import ChunkingDataHandler
 from shared.preprocessing.embedding_data_handlers import EmbeddingDataHandler
@@ -11,7 +11,10 @@ from shared.preprocessing.dispatchers import (
 __all__ = [
     "clean_text",
     "create_chunks",
+    "create_token_chunks",
+    "deduplicate_chunks",
     "tag_chunk",
+    "tag_batch",
     "CleaningDataHandler",
     "ChunkingDataHandler",
     "EmbeddingDataHandler",
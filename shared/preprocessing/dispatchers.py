@@ -5,6 +5,7 @@ from shared.domain.types import DataCategory
 from .chunking_data_handlers import EarningsCallChunkingHandler
 from .embedding_data_handlers import EarningsCallEmbeddingHandler, QueriesEmbeddingHandler
 from .cleaning_data_handlers import EarningsCallCleaningHandler
+from infrastructure.embeddings.pool import EmbeddingProcessPool
 
 class CleaningDispatcher:
     @staticmethod
@@ -31,7 +32,8 @@ class ChunkingDispatcher:
 
 class EmbeddingDispatcher:
     @staticmethod
-    def dispatch(chunks: List[VectorBaseDocument]) -> List[VectorBaseDocument]:
+    def dispatch(chunks: List[VectorBaseDocument], workers: int = 0) -> List[VectorBaseDocument]:
+        """Embed chunks; with workers > 0, earnings call chunks are sharded across a process pool."""
         if not chunks:
             return []
             
@@ -47,7 +49,11 @@ class EmbeddingDispatcher:
             return embedded_chunks
         elif category == DataCategory.EARNINGS_CALLS.value:
             handler = EarningsCallEmbeddingHandler()
-            embedded_chunks = handler.embed_batch(chunks)
+            if workers > 0:
+                with EmbeddingProcessPool(workers=workers) as pool:
+                    embedded_chunks = handler.embed_batch(chunks, pool=pool)
+            else:
+                embedded_chunks = handler.embed_batch(chunks)
             logger.info(f"Earnings call chunks embedded successfully: {len(embedded_chunks)} embeddings created")
             return embedded_chunks
         else:
@@ -1,31 +1,41 @@
 from abc import ABC, abstractmethod
-from typing import List, TypeVar, Generic
-from sentence_transformers import SentenceTransformer
+from typing import List, Optional, TypeVar, Generic
 from loguru import logger
 from shared.domain.queries import EmbeddedLLMQuery, LLMQuery
 from shared.domain.chunks import EarningsCallChunk
 from shared.domain.embedded_chunks import EmbeddedECTChunk
 from shared.domain.base.vector import VectorBaseDocument
 from settings import settings
+from infrastructure.embeddings.engine import EmbeddingEngine
+from infrastructure.embeddings.cache import EmbeddingCache
+from infrastructure.embeddings.pool import EmbeddingProcessPool
 
 T = TypeVar('T')
 U = TypeVar('U')
 
 class EmbeddingDataHandler(ABC, Generic[T, U]):
+    # Only stable corpus content is worth persisting; queries are one-off
+    use_cache: bool = False
+
     def __init__(self):
-        self.model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+        self.model = EmbeddingEngine()
+        self.cache = EmbeddingCache.for_model(self.model.model_name, self.model.backend) if self.use_cache else None
 
     @abstractmethod
     def map_model(self, data_model: T, embedding: List[float]) -> U:
         pass
 
-    def embed_batch(self, data_models: List[T]) -> List[U]:
+    def embed_batch(self, data_models: List[T], pool: Optional[EmbeddingProcessPool] = None) -> List[U]:
         if not data_models:
             return []
             
         try:
             texts = [model.content for model in data_models]
-            embeddings = self.model.encode(texts).tolist()
+            encode = pool.encode if pool is not None else self.model.encode
+            if self.cache is not None:
+                embeddings = self.cache.encode(texts, encode).tolist()
+            else:
+                embeddings = encode(texts).tolist()
             
             return [
                 self.map_model(model, embedding)
@@ -36,6 +46,8 @@ class EmbeddingDataHandler(ABC, Generic[T, U]):
             raise
 
 class EarningsCallEmbeddingHandler(EmbeddingDataHandler[EarningsCallChunk, EmbeddedECTChunk]):
+    use_cache = True
+
     def map_model(self, data_model: EarningsCallChunk, embedding: List[float]) -> EmbeddedECTChunk:
         return EmbeddedECTChunk(
             id=data_model.id,
@@ -1,8 +1,14 @@
 from .cleaning import clean_text
-from .chunking import create_chunks
-from .chunk_tagging import tag_chunk
+from .chunking import create_chunks, create_token_chunks
+from .dedup import NearDuplicateDetector, ChunkDeduplicator, deduplicate_chunks
+from .chunk_tagging import tag_chunk, tag_batch
 __all__ = [
     "clean_text",
     "create_chunks",
-    "tag_chunk"
+    "create_token_chunks",
+    "NearDuplicateDetector",
+    "ChunkDeduplicator",
+    "deduplicate_chunks",
+    "tag_chunk",
+    "tag_batch"
 ]
\ No newline at end of file
@@ -1,4 +1,5 @@
 from typing import List, Dict
+from .keyword_matching import compile_keywords
 
 def get_keywords() -> List[str]:
     """Return list of keywords"""
@@ -83,12 +84,11 @@ def get_keywords() -> List[str]:
 
 
 def tag_chunk(text: str, keywords: List[str] = get_keywords()) -> List[str]:
-    """Tag chunk based on keyword presence"""
-    text = text.lower()
-    tags = []
-    
-    for keyword in keywords:
-        if keyword in text:
-            tags.append(keyword)
-            
-    return tags 
\ No newline at end of file
+    """Tag chunk based on whole-word keyword presence"""
+    return compile_keywords(tuple(keywords)).tag(text.lower())
+
+
+def tag_batch(texts: List[str], keywords: List[str] = get_keywords()) -> List[List[str]]:
+    """Tag several chunks with a single compiled keyword automaton"""
+    automaton = compile_keywords(tuple(keywords))
+    return [automaton.tag(text.lower()) for text in texts]
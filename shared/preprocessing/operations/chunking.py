@@ -1,7 +1,14 @@
-from typing import List
 import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
 from loguru import logger
 
+# Sentence ends followed by whitespace, or a paragraph break
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+|\n\n')
+
+
 def create_chunks(text: str, chunk_size: int = 1000, chunk_overlap: int = 100) -> List[str]:
     """Split text into chunks with overlap using sentence boundaries."""
     # First split by paragraphs to preserve structure
@@ -25,15 +32,8 @@ def create_chunks(text: str, chunk_size: int = 1000, chunk_overlap: int = 100) -
                 if current_chunk:
                     chunks.append(' '.join(current_chunk))
                     # Keep last few sentences for overlap
-                    overlap_size = 0
-                    overlap_chunk = []
-                    for s in reversed(current_chunk):
-                        if overlap_size + len(s) <= chunk_overlap:
-                            overlap_chunk.insert(0, s)
-                            overlap_size += len(s)
-                        else:
-                            break
-                    current_chunk = overlap_chunk
+                    start, overlap_size = _overlap_start([len(s) for s in current_chunk], chunk_overlap)
+                    current_chunk = current_chunk[start:]
                     current_size = overlap_size
                 else:
                     # Handle case where single sentence exceeds chunk_size
@@ -49,3 +49,160 @@ def create_chunks(text: str, chunk_size: int = 1000, chunk_overlap: int = 100) -
         chunks.append(' '.join(current_chunk))
     
     return chunks
+
+
+def _overlap_start(sizes: List[int], budget: int) -> Tuple[int, int]:
+    """Index from which the trailing items fit in budget, and their total size."""
+    start, total = len(sizes), 0
+    while start > 0 and total + sizes[start - 1] <= budget:
+        start -= 1
+        total += sizes[start]
+    return start, total
+
+
+@dataclass
+class TextChunk:
+    """A chunk with its position in the source text.
+
+    Character offsets span from the first to the last sentence in the original
+    text (the chunk joins sentences with single spaces). Token offsets count the
+    tokens of the preceding sentences, without special tokens.
+    """
+    text: str
+    char_start: int
+    char_end: int
+    token_start: int
+    token_end: int
+
+    @property
+    def token_count(self) -> int:
+        return self.token_end - self.token_start
+
+
+class TokenCounter:
+    """Counts tokens with a Hugging Face tokenizer, caching the count of each sentence."""
+
+    def __init__(self, tokenizer, max_tokens: int, cache_size: int = 65536) -> None:
+        self.tokenizer = tokenizer
+        # Room left once the model adds its special tokens ([CLS] ... [SEP])
+        self.max_tokens = max_tokens - tokenizer.num_special_tokens_to_add()
+        self._lock = threading.Lock()
+        self._cached_count = lru_cache(maxsize=cache_size)(self._count)
+
+    def _count(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def count(self, text: str) -> int:
+        with self._lock:
+            return self._cached_count(text)
+
+    def count_uncached(self, text: str) -> int:
+        with self._lock:
+            return self._count(text)
+
+    def split(self, text: str, max_tokens: int) -> List[Tuple[int, int]]:
+        """Character spans of consecutive pieces of text with at most max_tokens tokens each."""
+        with self._lock:
+            encoding = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = encoding["offset_mapping"]
+        return [
+            (offsets[i][0], offsets[min(i + max_tokens, len(offsets)) - 1][1])
+            for i in range(0, len(offsets), max_tokens)
+        ]
+
+    def cache_info(self):
+        return self._cached_count.cache_info()
+
+
+@lru_cache(maxsize=4)
+def get_token_counter(model_name: Optional[str] = None) -> TokenCounter:
+    """Token counter for an embedding model, sized to the model's maximum sequence length."""
+    from infrastructure.embeddings.engine import EmbeddingEngine
+
+    engine = EmbeddingEngine(model_name)
+    return TokenCounter(engine.new_tokenizer(), engine.max_seq_length)
+
+
+def _sentence_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """(start, end) of each non-empty sentence, with surrounding whitespace trimmed."""
+    start = 0
+    for match in [*_SENTENCE_BREAK.finditer(text), None]:
+        end = match.start() if match else len(text)
+        sentence = text[start:end]
+        stripped = sentence.strip()
+        if stripped:
+            offset = start + (len(sentence) - len(sentence.lstrip()))
+            yield offset, offset + len(stripped)
+        if match:
+            start = match.end()
+
+
+def create_token_chunks(
+    text: str,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: int = 32,
+    counter: Optional[TokenCounter] = None
+) -> List[TextChunk]:
+    """Split text on sentence boundaries into chunks that fit the embedding model's input.
+
+    Sizes are measured in model tokens, so no chunk is silently truncated at
+    embedding time. Chunks repeat up to overlap_tokens worth of trailing whole
+    sentences from the previous chunk. A sentence longer than the limit is split
+    at token boundaries. Runs in time linear in the number of sentences.
+    """
+    counter = counter or get_token_counter()
+    limit = min(max_tokens or counter.max_tokens, counter.max_tokens)
+
+    # (char_start, char_end, token_start, token_count) per sentence or sentence piece
+    sentences = []
+    position = 0
+    for start, end in _sentence_spans(text):
+        tokens = counter.count(text[start:end])
+        if tokens <= limit:
+            sentences.append((start, end, position, tokens))
+            position += tokens
+            continue
+        logger.debug(f"Splitting {tokens}-token sentence to fit {limit}-token chunks")
+        for piece_start, piece_end in counter.split(text[start:end], limit):
+            piece_tokens = counter.count(text[start + piece_start:start + piece_end])
+            sentences.append((start + piece_start, start + piece_end, position, piece_tokens))
+            position += piece_tokens
+
+    chunks: List[TextChunk] = []
+
+    def join(items: List[Tuple[int, int, int, int]]) -> str:
+        return ' '.join(text[s:e] for s, e, _, _ in items)
+
+    def flush(items: List[Tuple[int, int, int, int]]) -> Tuple[list, list]:
+        # Sentence counts add up exactly for WordPiece; other tokenizers can merge
+        # across the joining space, so the joined text is checked once per chunk
+        n = len(items)
+        while n > 1 and counter.count_uncached(join(items[:n])) > limit:
+            n -= 1
+        chunks.append(TextChunk(
+            text=join(items[:n]),
+            char_start=items[0][0],
+            char_end=items[n - 1][1],
+            token_start=items[0][2],
+            token_end=items[n - 1][2] + items[n - 1][3],
+        ))
+        return items[:n], items[n:]
+
+    current: List[Tuple[int, int, int, int]] = []
+    current_tokens = 0
+    for sentence in sentences:
+        tokens = sentence[3]
+        while current and current_tokens + tokens > limit:
+            emitted, rest = flush(current)
+            rest_tokens = sum(item[3] for item in rest)
+            # Trailing sentences for overlap, trimmed so the next sentence still fits
+            start, overlap = _overlap_start([item[3] for item in emitted], min(overlap_tokens, limit - tokens - rest_tokens))
+            current = emitted[start:] + rest
+            current_tokens = overlap + rest_tokens
+        current.append(sentence)
+        current_tokens += tokens
+
+    while current:
+        _, current = flush(current)
+
+    return chunks
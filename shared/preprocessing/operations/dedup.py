@@ -0,0 +1,167 @@
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+_WORD = re.compile(r"\w+")
+# Mersenne prime for the universal hash family; shingle hashes and coefficients stay below 2**32
+_PRIME = np.uint64((1 << 61) - 1)
+
+
+def _lsh_shape(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Bands and rows whose LSH S-curve rises closest below the similarity threshold.
+
+    Erring low favours recall; false candidates are dropped by the exact check.
+    """
+    shapes = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    below = [shape for shape in shapes if (1 / shape[0]) ** (1 / shape[1]) <= threshold] or shapes[:1]
+    return max(below, key=lambda shape: (1 / shape[0]) ** (1 / shape[1]))
+
+
+class NearDuplicateDetector:
+    """MinHash + LSH detector of chunks whose word shingles overlap above a Jaccard threshold.
+
+    Chunks are checked in the order they are added; the first of a group is kept as
+    the representative and later near-copies are reported against it. LSH candidates
+    are confirmed with the exact Jaccard similarity of their shingle sets.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1
+    ) -> None:
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _lsh_shape(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(self.bands)]
+        self._shingles: List[FrozenSet[int]] = []
+
+    def shingles(self, text: str) -> FrozenSet[int]:
+        words = _WORD.findall(text.lower())
+        if len(words) <= self.shingle_size:
+            return frozenset([zlib.crc32(" ".join(words).encode("utf-8"))])
+        return frozenset(
+            zlib.crc32(" ".join(words[i:i + self.shingle_size]).encode("utf-8"))
+            for i in range(len(words) - self.shingle_size + 1)
+        )
+
+    def signature(self, shingles: FrozenSet[int]) -> np.ndarray:
+        values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        hashed = (values[:, None] * self._a[None, :] + self._b[None, :]) % _PRIME
+        return hashed.min(axis=0)
+
+    def add(self, text: str) -> Optional[int]:
+        """Register text; return the index of the earlier text it duplicates, or None if it is new."""
+        shingles = self.shingles(text)
+        signature = self.signature(shingles)
+        keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+        candidates = {index for band, key in enumerate(keys) for index in self._buckets[band].get(key, ())}
+        for index in sorted(candidates):
+            other = self._shingles[index]
+            if len(shingles & other) / len(shingles | other) >= self.threshold:
+                return index
+
+        index = len(self._shingles)
+        self._shingles.append(shingles)
+        for band, key in enumerate(keys):
+            self._buckets[band][key].append(index)
+        return None
+
+
+class ChunkDeduplicator:
+    """Collapses near-duplicate chunk records into the first chunk of each group.
+
+    The kept chunk lists every collapsed copy under metadata['duplicate_sources'].
+    State carries across calls, so a stream of chunk batches is deduplicated as a whole.
+    With annotate=False kept chunks are left untouched, for streams that hand them
+    to other threads; the references are read back with duplicate_sources() instead.
+    """
+
+    def __init__(self, detector: Optional[NearDuplicateDetector] = None, annotate: bool = True) -> None:
+        self.detector = detector or NearDuplicateDetector()
+        self.annotate = annotate
+        self._representatives: List[Dict] = []
+        self._sources: Dict[int, List[Dict]] = {}
+        self.input_chunks = 0
+        self.removed_chunks = 0
+        self.removed_bytes = 0
+
+    @staticmethod
+    def _reference(chunk: Dict) -> Dict:
+        metadata = chunk.get('metadata', {})
+        return {
+            'original_id': metadata.get('original_id'),
+            'source': metadata.get('source'),
+            'section': metadata.get('section'),
+            'chunk_index': metadata.get('chunk_index'),
+        }
+
+    def collapse(self, chunks: List[Dict]) -> List[Dict]:
+        """Chunks not seen before; duplicates are recorded against their representative and dropped."""
+        kept = []
+        for chunk in chunks:
+            self.input_chunks += 1
+            duplicate_of = self.detector.add(chunk['text'])
+            if duplicate_of is None:
+                if self.annotate:
+                    self._representatives.append(chunk)
+                else:
+                    # Enough to address the representative's point later, without holding the chunk;
+                    # the text is only needed when the point ID falls back to it
+                    reference = self._reference(chunk)
+                    keyed = reference['original_id'] is not None and reference['chunk_index'] is not None
+                    self._representatives.append({'text': '' if keyed else chunk['text'], 'metadata': reference})
+                kept.append(chunk)
+                continue
+
+            sources = self._sources.setdefault(duplicate_of, [])
+            sources.append(self._reference(chunk))
+            if self.annotate:
+                representative = self._representatives[duplicate_of].setdefault('metadata', {})
+                representative['duplicate_sources'] = sources
+                representative['duplicate_count'] = len(sources)
+            self.removed_chunks += 1
+            self.removed_bytes += len(chunk['text'].encode('utf-8'))
+        return kept
+
+    def duplicate_sources(self) -> List[Tuple[Dict, List[Dict]]]:
+        """(representative, collapsed references) for each kept chunk that absorbed duplicates.
+
+        Representatives are chunk records ({'text', 'metadata'}) that identify the kept
+        chunk; with annotate=False they carry only the fields its point ID is built from.
+        """
+        return [(self._representatives[index], sources) for index, sources in self._sources.items()]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "input_chunks": self.input_chunks,
+            "kept_chunks": self.input_chunks - self.removed_chunks,
+            "removed_chunks": self.removed_chunks,
+            "removed_bytes": self.removed_bytes,
+        }
+
+    def log_stats(self) -> None:
+        logger.info(f"Near-duplicate detection removed {self.removed_chunks} of {self.input_chunks} chunks "
+                    f"({self.removed_bytes} bytes, Jaccard threshold {self.detector.threshold})")
+
+
+def deduplicate_chunks(
+    chunks: List[Dict],
+    threshold: float = 0.85,
+    num_perm: int = 128,
+    shingle_size: int = 5
+) -> Tuple[List[Dict], Dict[str, int]]:
+    """Drop near-duplicate chunks, keeping the first of each group; returns kept chunks and counts."""
+    deduplicator = ChunkDeduplicator(NearDuplicateDetector(threshold, num_perm, shingle_size))
+    kept = deduplicator.collapse(chunks)
+    deduplicator.log_stats()
+    return kept, deduplicator.stats()
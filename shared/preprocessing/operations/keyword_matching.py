@@ -0,0 +1,70 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Pattern, Sequence, Set, Tuple
+
+
+def _trie_pattern(keywords: Sequence[str]) -> str:
+    """Compile keywords into a character-trie regex, e.g. 'revenue(?: g(?:rowth|uidance))?'."""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # A keyword ends here, so everything below is optional
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(trie)
+
+
+class KeywordAutomaton:
+    """Keyword matcher compiled once into a trie-shaped regex and run in one pass.
+
+    At every word boundary the automaton reports the longest keyword starting
+    there that also ends on a word boundary ("roi" no longer matches "heroic").
+    Shorter keywords that are whole-word prefixes of a match ("revenue" for
+    "revenue growth") are implied from a table built at compile time.
+    """
+
+    def __init__(self, keywords: Sequence[str]) -> None:
+        self.keywords = list(keywords)
+        self._positions: Dict[str, List[int]] = {}
+        for position, keyword in enumerate(self.keywords):
+            if keyword:
+                self._positions.setdefault(keyword, []).append(position)
+
+        unique = list(self._positions)
+        self._pattern: Pattern = re.compile(rf"\b(?=({_trie_pattern(unique)})\b)")
+        self._implied: Dict[str, Tuple[str, ...]] = {
+            keyword: tuple(
+                prefix for prefix in unique
+                if prefix != keyword and re.match(re.escape(prefix) + r"\b", keyword)
+            )
+            for keyword in unique
+        }
+
+    def find(self, text: str) -> Set[str]:
+        """Return the distinct keywords occurring in text as whole words."""
+        found = set()
+        for keyword in self._pattern.findall(text):
+            found.add(keyword)
+            found.update(self._implied[keyword])
+        return found
+
+    def tag(self, text: str) -> List[str]:
+        """Matched keywords in keyword-list order (repeated entries are repeated)."""
+        found = self.find(text)
+        positions = sorted(position for keyword in found for position in self._positions[keyword])
+        return [self.keywords[position] for position in positions]
+
+
+@lru_cache(maxsize=16)
+def compile_keywords(keywords: Tuple[str, ...]) -> KeywordAutomaton:
+    """Build (once per keyword list) the automaton used for tagging."""
+    return KeywordAutomaton(keywords)
@@ -0,0 +1,32 @@
+import re
+from typing import Dict, Mapping
+from .keyword_matching import _trie_pattern
+
+
+class FusedSubstitution:
+    """Replaces whole-word phrases from a dispatch table in a single regex pass.
+
+    The phrases are compiled into one trie-shaped alternation and each match looks
+    up its replacement by lowercased text. This gives the same result as running
+    one case-insensitive ``re.sub(r'\\bphrase\\b', ...)`` per entry only when no
+    replacement forms another entry and no entry is a whole-word prefix of
+    another - callers are responsible for fusing only such groups.
+    """
+
+    def __init__(self, replacements: Mapping[str, str]) -> None:
+        self.replacements: Dict[str, str] = {phrase.lower(): value for phrase, value in replacements.items()}
+        self.pattern = re.compile(rf"\b(?:{_trie_pattern(list(self.replacements))})\b", re.IGNORECASE)
+
+    def _replace(self, match: re.Match) -> str:
+        phrase = match.group(0)
+        replacement = self.replacements.get(phrase.lower())
+        if replacement is None:
+            # Case-insensitive regex also folds characters like "ſ" or "İ" that lower() keeps
+            replacement = next(
+                value for key, value in self.replacements.items()
+                if re.fullmatch(re.escape(key), phrase, re.IGNORECASE)
+            )
+        return replacement
+
+    def sub(self, text: str) -> str:
+        return self.pattern.sub(self._replace, text)
@@ -1,6 +1,7 @@
 from loguru import logger
 
 from typing import List, Dict
+from shared.preprocessing.operations.keyword_matching import compile_keywords
 
 
 def get_keywords_ect() -> List[str]:
@@ -94,12 +95,11 @@ def get_keywords_ect() -> List[str]:
 
 
 def tag_chunk(text: str, keywords: List[str] = get_keywords_ect()) -> List[str]:
-    """Tag chunk based on keyword presence"""
-    text = text.lower()
-    tags = []
-   
-    for keyword in keywords:
-        if keyword in text:
-            tags.append(keyword)
-            
-    return tags 
+    """Tag chunk based on whole-word keyword presence"""
+    return compile_keywords(tuple(keywords)).tag(text.lower())
+
+
+def tag_batch(texts: List[str], keywords: List[str] = get_keywords_ect()) -> List[List[str]]:
+    """Tag several chunks with a single compiled keyword automaton"""
+    automaton = compile_keywords(tuple(keywords))
+    return [automaton.tag(text.lower()) for text in texts]
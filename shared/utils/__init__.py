@@ -1,3 +1,5 @@
 from . import misc
+from . import metrics
+from . import streaming
 
-__all__ = ["misc"]
+__all__ = ["misc", "metrics", "streaming"]
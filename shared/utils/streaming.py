@@ -0,0 +1,193 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# Marks the end of a stage's output stream
+_DONE = object()
+
+
+class _Cancelled(BaseException):
+    """Raised into a stage's input once the pipeline stops, so the stage does not
+    mistake the cut-off stream for its end and flush partial work downstream.
+
+    A BaseException, so a stage's own ``except Exception`` does not swallow it.
+    """
+
+
+class StageMetrics:
+    """Thread-safe counters for one stage and the queue feeding it."""
+
+    def __init__(self) -> None:
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._depth_samples = 0
+        self._depth_total = 0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+
+    def sample_depth(self, depth: int) -> None:
+        with self._lock:
+            self._depth_samples += 1
+            self._depth_total += depth
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            end = self.finished_at or time.perf_counter()
+            elapsed = end - self.started_at if self.started_at else 0.0
+            return {
+                "items_in": self.items_in,
+                "items_out": self.items_out,
+                "elapsed_seconds": elapsed,
+                "busy_seconds": self.busy_seconds,
+                "wait_seconds": self.wait_seconds,
+                "throughput_per_sec": self.items_out / elapsed if elapsed else 0.0,
+                "mean_queue_depth": self._depth_total / self._depth_samples if self._depth_samples else 0.0,
+                "max_queue_depth": self.max_queue_depth,
+            }
+
+
+class Stage:
+    """One step of a StreamingPipeline: a function from an input iterator to an output iterator.
+
+    Stages receive the whole stream, so they can batch (consume several items
+    before yielding) or fan out (yield several items per input) as needed.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Iterator], Iterable], queue_size: int = 8) -> None:
+        self.name = name
+        self.fn = fn
+        self.queue_size = queue_size
+        self.metrics = StageMetrics()
+
+
+class StreamingPipeline:
+    """Runs a source and a chain of stages concurrently, one thread per stage.
+
+    Stages are connected by bounded queues, so a slow stage blocks its upstream
+    (backpressure) instead of letting work pile up in memory. The first error
+    in any stage stops the whole pipeline and is re-raised from run(); stages
+    still running are cancelled rather than shown the end of their input.
+    """
+
+    def __init__(self, source: Iterable, stages: List[Stage], source_name: str = "source") -> None:
+        self.source = source
+        self.stages = stages
+        self.source_metrics = StageMetrics()
+        self.source_name = source_name
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+    def _fail(self, error: BaseException) -> None:
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _put(self, out: "queue.Queue", item) -> bool:
+        # Block while the downstream queue is full, but give up once the pipeline stops
+        while not self._stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _consume(self, inbox: "queue.Queue", metrics: StageMetrics) -> Iterator:
+        while True:
+            if self._stop.is_set():
+                raise _Cancelled()
+            metrics.sample_depth(inbox.qsize())
+            start = time.perf_counter()
+            try:
+                item = inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            finally:
+                metrics.wait_seconds += time.perf_counter() - start
+            if item is _DONE:
+                return
+            metrics.items_in += 1
+            yield item
+
+    def _run_source(self, out: "queue.Queue") -> None:
+        metrics = self.source_metrics
+        metrics.started_at = time.perf_counter()
+        try:
+            iterator = iter(self.source)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                metrics.busy_seconds += time.perf_counter() - start
+                metrics.items_out += 1
+                if not self._put(out, item):
+                    return
+            self._put(out, _DONE)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            metrics.finished_at = time.perf_counter()
+
+    def _run_stage(self, stage: Stage, inbox: "queue.Queue", out: Optional["queue.Queue"]) -> None:
+        metrics = stage.metrics
+        metrics.started_at = time.perf_counter()
+        try:
+            outputs = iter(stage.fn(self._consume(inbox, metrics)))
+            while True:
+                # Time spent waiting on the inbox is tracked separately from work
+                start, waited = time.perf_counter(), metrics.wait_seconds
+                try:
+                    item = next(outputs)
+                except StopIteration:
+                    break
+                metrics.busy_seconds += time.perf_counter() - start - (metrics.wait_seconds - waited)
+                metrics.items_out += 1
+                if out is not None and not self._put(out, item):
+                    return
+            if out is not None:
+                self._put(out, _DONE)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            metrics.finished_at = time.perf_counter()
+
+    def run(self) -> Dict[str, Dict]:
+        """Run to completion and return per-stage metrics; the last stage's outputs are discarded."""
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        threads = [threading.Thread(target=self._run_source, args=(queues[0],), name=self.source_name, daemon=True)]
+        for i, stage in enumerate(self.stages):
+            out = queues[i + 1] if i + 1 < len(self.stages) else None
+            threads.append(threading.Thread(target=self._run_stage, args=(stage, queues[i], out), name=stage.name, daemon=True))
+
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt as e:
+            self._fail(e)
+            for thread in threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+        return self.metrics()
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {
+            self.source_name: self.source_metrics.snapshot(),
+            **{stage.name: stage.metrics.snapshot() for stage in self.stages},
+        }
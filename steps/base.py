@@ -1,9 +1,12 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Dict
 
 from langchain.prompts import PromptTemplate
 from pydantic import BaseModel
 
+from settings import settings
+from infrastructure.db.llm_cache import LLMResponseCache
 from shared.domain.queries import LLMQuery
 
 
@@ -14,9 +17,53 @@ class PromptTemplateFactory(ABC, BaseModel):
 
 
 class RAGStep(ABC):
-    def __init__(self, mock: bool = False) -> None:
+    def __init__(self, mock: bool = False, use_cache: bool = True) -> None:
         self._mock = mock
+        self._use_cache = use_cache and settings.LLM_CACHE_ENABLED
 
     @abstractmethod
     def generate(self, query: LLMQuery, *args, **kwargs) -> Any:
         pass
+
+    async def agenerate(self, query: LLMQuery, *args, **kwargs) -> Any:
+        """Async variant of generate; steps with native async clients override this."""
+        return await asyncio.to_thread(self.generate, query, *args, **kwargs)
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """LLM response cache hits and misses for this step type."""
+        return LLMResponseCache().stats(type(self).__name__)
+
+    def _invoke(self, template: PromptTemplateFactory, prompt: PromptTemplate, model, inputs: Dict[str, Any]) -> str:
+        """Run prompt | model and return the response text, served from cache when possible."""
+        cache_key = self._cache_key(template, prompt, model, inputs)
+        if cache_key is not None and (cached := LLMResponseCache().get(type(self).__name__, cache_key)) is not None:
+            return cached
+
+        response = (prompt | model).invoke(inputs)
+        if cache_key is not None:
+            LLMResponseCache().put(type(self).__name__, cache_key, response.content)
+        return response.content
+
+    async def _ainvoke(self, template: PromptTemplateFactory, prompt: PromptTemplate, model, inputs: Dict[str, Any]) -> str:
+        """Async variant of _invoke; the SQLite cache is read and written off the event loop."""
+        cache_key = self._cache_key(template, prompt, model, inputs)
+        if cache_key is not None:
+            cached = await asyncio.to_thread(LLMResponseCache().get, type(self).__name__, cache_key)
+            if cached is not None:
+                return cached
+
+        response = await (prompt | model).ainvoke(inputs)
+        if cache_key is not None:
+            await asyncio.to_thread(LLMResponseCache().put, type(self).__name__, cache_key, response.content)
+        return response.content
+
+    def _cache_key(self, template: PromptTemplateFactory, prompt: PromptTemplate, model, inputs: Dict[str, Any]) -> str | None:
+        # Only deterministic (temperature 0) calls are safe to replay
+        if not self._use_cache or getattr(model, "temperature", None) != 0:
+            return None
+        return LLMResponseCache.key(
+            type(template).__name__,
+            getattr(model, "model_name", settings.OPENAI_MODEL),
+            prompt.format(**inputs)
+        )
@@ -2,57 +2,101 @@ from typing import List, Dict, Any
 from zenml import step
 from loguru import logger
 import re
+from shared.preprocessing.operations.substitution import FusedSubstitution
+
+# Compiled once at import; each group mirrors one cleaning stage below
+_TIMESTAMP_PATTERNS = [
+    re.compile(r'\[\d{1,2}:\d{2}(:\d{2})?\]'),  # [00:02:15]
+    re.compile(r'\b\d{1,2}:\d{2}(:\d{2})?\s?(AM|PM|am|pm)?\b'),  # 0:02:15 PM
+    re.compile(r'\b\d{1,2}:\d{2}\b'),  # 00:02
+]
+
+_METADATA_PATTERNS = [
+    re.compile(pattern, flags=re.IGNORECASE | re.MULTILINE)
+    for pattern in [
+        r'(Refinitiv|Disclaimer|Confidential):.*?\n',
+        r'Page \d+ of \d+',
+        r'Copyright © \d{4}.*?\n',
+        r'All rights reserved.*?\n',
+        r'\(technical difficulty\)',
+        r'(?i)operator instructions',
+        r'\.{3,}',  # Sequences of dots for table of contents
+    ]
+]
+
+_QA_MARKERS = [
+    re.compile(marker, flags=re.IGNORECASE)
+    for marker in [
+        r'\bQ&A\b',
+        r'\bQuestions and Answers\b',
+        r'\bQuestion-and-Answer Session\b'
+    ]
+]
+
+_PRESENTATION_MARKERS = [
+    re.compile(marker, flags=re.IGNORECASE)
+    for marker in [
+        r'\bPresentation\b',
+        r'\bPrepared Remarks\b',
+        r'\bOpening Remarks\b'
+    ]
+]
+
+# Fillers are whole words that never overlap, so one pass matches the ten sequential ones
+_FILLERS = FusedSubstitution({
+    filler: ''
+    for filler in [
+        'um', 'uh', 'er', 'ah', 'like',
+        'you know',
+        'I mean',
+        'so',
+        'basically',
+        'actually',
+        'kind of',
+        'sort of',
+        'right',
+        'okay'
+    ]
+})
+
+_WHITESPACE = re.compile(r'\s+')
+_PUNCTUATION_SPACING = re.compile(r'\s*([.,?!:;])\s*')
+_REPEATED_PUNCTUATION = re.compile(r'([.,?!:;]){2,}')
+
+_SPECIAL_CHARACTERS = re.compile(r'[\^*#]')
+_EMPTY_PARENTHESES = re.compile(r'\(\s*\)')
+_TECHNICAL_INDICATORS = re.compile(r'\((technical difficulty|laughter|applause|audio unavailable)\)', flags=re.IGNORECASE)
+_BRACKETS = re.compile(r'[\[\](){}]')
+
 
 class TranscriptCleaner:
     @staticmethod
     def remove_timestamps(text: str) -> str:
         """Remove various timestamp formats from text."""
-        text = re.sub(r'\[\d{1,2}:\d{2}(:\d{2})?\]', '', text)  # [00:02:15]
-        text = re.sub(r'\b\d{1,2}:\d{2}(:\d{2})?\s?(AM|PM|am|pm)?\b', '', text)  # 0:02:15 PM
-        text = re.sub(r'\b\d{1,2}:\d{2}\b', '', text)  # 00:02
+        for pattern in _TIMESTAMP_PATTERNS:
+            text = pattern.sub('', text)
         return text
 
     @staticmethod
     def remove_metadata(text: str) -> str:
         """Remove headers, footers, disclaimers, and other metadata."""
-        patterns = [
-            r'(Refinitiv|Disclaimer|Confidential):.*?\n',
-            r'Page \d+ of \d+',
-            r'Copyright © \d{4}.*?\n',
-            r'All rights reserved.*?\n',
-            r'\(technical difficulty\)',
-            r'(?i)operator instructions',
-            r'\.{3,}',  # Sequences of dots for table of contents
-        ]
-        for pattern in patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
+        for pattern in _METADATA_PATTERNS:
+            text = pattern.sub('', text)
         return text.strip()
 
     @staticmethod
     def split_sections(text: str) -> Dict[str, str]:
         """Split transcript into presentation and Q&A sections."""
-        qa_markers = [
-            r'\bQ&A\b',
-            r'\bQuestions and Answers\b',
-            r'\bQuestion-and-Answer Session\b'
-        ]
-        
-        presentation_markers = [
-            r'\bPresentation\b',
-            r'\bPrepared Remarks\b',
-            r'\bOpening Remarks\b'
-        ]
-        
         qa_text, presentation_text = "", text
-        for marker in qa_markers:
-            if re.search(marker, text, re.IGNORECASE):
-                parts = re.split(marker, text, flags=re.IGNORECASE)
+        for marker in _QA_MARKERS:
+            if marker.search(text):
+                parts = marker.split(text)
                 presentation_text, qa_text = parts[0].strip(), parts[1].strip()
                 break
         
         # Remove presentation section markers
-        for marker in presentation_markers:
-            presentation_text = re.sub(marker, '', presentation_text, flags=re.IGNORECASE)
+        for marker in _PRESENTATION_MARKERS:
+            presentation_text = marker.sub('', presentation_text)
         
         return {
             "presentation": presentation_text.strip(),
@@ -62,25 +106,12 @@ class TranscriptCleaner:
     @staticmethod
     def clean_filler_words(text: str) -> str:
         """Remove filler words and standardize punctuation."""
-        fillers = [
-            r'\b(um|uh|er|ah|like)\b',
-            r'\byou know\b',
-            r'\bI mean\b',
-            r'\bso\b',
-            r'\bbasically\b',
-            r'\bactually\b',
-            r'\bkind of\b',
-            r'\bsort of\b',
-            r'\bright\b',
-            r'\bokay\b'
-        ]
-        for filler in fillers:
-            text = re.sub(filler, '', text, flags=re.IGNORECASE)
+        text = _FILLERS.sub(text)
         
         # Normalize whitespace and punctuation
-        text = re.sub(r'\s+', ' ', text)  # Multiple spaces to single space
-        text = re.sub(r'\s*([.,?!:;])\s*', r'\1 ', text)  # Standardize punctuation spacing
-        text = re.sub(r'([.,?!:;]){2,}', r'\1', text)  # Remove multiple punctuation
+        text = _WHITESPACE.sub(' ', text)  # Multiple spaces to single space
+        text = _PUNCTUATION_SPACING.sub(r'\1 ', text)  # Standardize punctuation spacing
+        text = _REPEATED_PUNCTUATION.sub(r'\1', text)  # Remove multiple punctuation
         
         return text.strip()
     
@@ -88,16 +119,16 @@ class TranscriptCleaner:
     def remove_special_characters(text: str) -> str:
         """Remove or standardize unnecessary special characters in the text."""
         # Remove caret symbols, asterisks, and other unnecessary symbols
-        text = re.sub(r'[\^*#]', '', text)
+        text = _SPECIAL_CHARACTERS.sub('', text)
 
         # Remove empty parentheses and content-less tags, e.g., ( )
-        text = re.sub(r'\(\s*\)', '', text)
+        text = _EMPTY_PARENTHESES.sub('', text)
         
         # Remove unnecessary technical indicators like (technical difficulty)
-        text = re.sub(r'\((technical difficulty|laughter|applause|audio unavailable)\)', '', text, flags=re.IGNORECASE)
+        text = _TECHNICAL_INDICATORS.sub('', text)
         
         # Remove standalone parentheses and brackets often used for notes
-        text = re.sub(r'[\[\](){}]', '', text)
+        text = _BRACKETS.sub('', text)
 
         return text.strip()
 
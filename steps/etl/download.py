@@ -1,10 +1,186 @@
+import hashlib
 import io
+import itertools
+import json
+import multiprocessing
+import os
+import tempfile
+import time
 import zipfile
-from typing import List, Dict, Any
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Callable, Deque, Iterable, Iterator, List, Dict, Any, Optional, Tuple
 import requests
 from loguru import logger
 from urllib.parse import parse_qs, urlparse
 import fitz  # PyMuPDF
+from settings import settings
+
+# Transient failures after which a download is resumed rather than abandoned
+RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+class IncompleteDownloadError(requests.ConnectionError):
+    """The server closed the connection before sending the announced number of bytes."""
+
+def _validators(response: requests.Response) -> Dict[str, Optional[str]]:
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+def _if_range(validators: Dict[str, Optional[str]]) -> Optional[str]:
+    # If-Range only accepts strong ETags; fall back to the modification date
+    etag = validators.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return validators.get("last_modified")
+
+def stream_download(
+    url: str,
+    target: BinaryIO,
+    validators: Optional[Dict[str, Optional[str]]] = None,
+    conditional: Optional[Dict[str, str]] = None,
+    on_start: Optional[Callable[[Dict[str, Optional[str]]], None]] = None,
+) -> Optional[Dict[str, Optional[str]]]:
+    """Stream url onto the end of target in chunks, resuming with HTTP Range after interruptions.
+
+    Bytes already in target are kept when the server honours the range (206) and
+    discarded when it sends the whole file again. Returns the response validators,
+    or None when a conditional request is answered with 304 Not Modified.
+    """
+    validators = dict(validators or {})
+    attempts = 0
+    
+    while True:
+        offset = target.seek(0, io.SEEK_END)
+        headers = dict(conditional or {}) if not offset else {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if _if_range(validators):
+                headers["If-Range"] = _if_range(validators)
+        
+        try:
+            with requests.get(
+                url, headers=headers, stream=True, timeout=settings.DOWNLOAD_TIMEOUT, verify=settings.DOWNLOAD_VERIFY_TLS
+            ) as response:
+                if response.status_code == 304 and not offset:
+                    return None
+                if response.status_code == 416:
+                    # Our partial copy no longer lines up with the remote file
+                    logger.warning("Server rejected the resume range, restarting download")
+                    target.seek(0)
+                    target.truncate()
+                    continue
+                response.raise_for_status()
+                
+                if offset and response.status_code != 206:
+                    logger.warning(f"Server did not resume at byte {offset}, restarting download")
+                    target.seek(0)
+                    target.truncate()
+                    offset = 0
+                if response.status_code != 206:
+                    validators = _validators(response)
+                    if on_start:
+                        on_start(validators)
+                
+                remaining = response.headers.get("Content-Length")
+                total = offset + int(remaining) if remaining is not None else None
+                written = offset
+                next_report = written + max((total or 0) // 10, 50 * 1024 * 1024)
+                
+                for chunk in response.iter_content(chunk_size=settings.DOWNLOAD_CHUNK_SIZE):
+                    target.write(chunk)
+                    written += len(chunk)
+                    if written >= next_report:
+                        progress = f" of {total} ({written / total:.0%})" if total else ""
+                        logger.info(f"Downloaded {written} bytes{progress}")
+                        next_report = written + max((total or 0) // 10, 50 * 1024 * 1024)
+                
+                if total is not None and written < total:
+                    raise IncompleteDownloadError(f"received {written} of {total} bytes")
+                
+                target.flush()
+                logger.info(f"Downloaded {written} bytes")
+                return validators
+        
+        except RETRYABLE_ERRORS as e:
+            attempts += 1
+            if attempts > settings.DOWNLOAD_MAX_RETRIES:
+                raise
+            logger.warning(f"Download interrupted after {target.tell()} bytes ({str(e)}), "
+                           f"resuming (attempt {attempts}/{settings.DOWNLOAD_MAX_RETRIES})")
+            time.sleep(min(2 ** (attempts - 1), 30))
+
+def cached_download(url: str, cache_dir: Path) -> Path:
+    """Download url into cache_dir, skipping the transfer when the server reports it unchanged.
+
+    The archive is written to a .part file next to a JSON sidecar holding its ETag and
+    Last-Modified, so an interrupted run resumes where it stopped. Complete archives
+    are revalidated with If-None-Match / If-Modified-Since.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    path = cache_dir / f"{key}.zip"
+    partial = cache_dir / f"{key}.zip.part"
+    meta_path = cache_dir / f"{key}.json"
+    partial_meta_path = cache_dir / f"{key}.part.json"
+    
+    def read_meta(meta: Path) -> Dict[str, Optional[str]]:
+        return json.loads(meta.read_text()) if meta.exists() else {}
+    
+    def write_meta(meta: Path, validators: Dict[str, Optional[str]]) -> None:
+        meta.write_text(json.dumps({"url": url, **validators}))
+    
+    conditional = {}
+    if path.exists() and not partial.exists():
+        cached = read_meta(meta_path)
+        if cached.get("etag"):
+            conditional["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            conditional["If-Modified-Since"] = cached["last_modified"]
+    
+    if partial.exists():
+        logger.info(f"Resuming download of {url} from {partial.stat().st_size} bytes")
+    
+    with open(partial, "ab") as target:
+        validators = stream_download(
+            url,
+            target,
+            validators=read_meta(partial_meta_path),
+            conditional=conditional,
+            on_start=lambda validators: write_meta(partial_meta_path, validators),
+        )
+    
+    if validators is None:
+        logger.info(f"Archive unchanged since last download, reusing {path}")
+        partial.unlink(missing_ok=True)
+        return path
+    
+    os.replace(partial, path)
+    write_meta(meta_path, validators)
+    partial_meta_path.unlink(missing_ok=True)
+    return path
+
+@contextmanager
+def open_archive(zip_url: str, cache_dir: Optional[str] = None) -> Iterator[BinaryIO]:
+    """Yield the downloaded archive as a seekable file without holding it in memory."""
+    cache_dir = settings.ARCHIVE_CACHE_DIR if cache_dir is None else cache_dir
+    if cache_dir:
+        with open(cached_download(zip_url, Path(cache_dir)), "rb") as archive:
+            yield archive
+    else:
+        # Small archives stay in memory; larger ones roll over to a temporary file
+        with tempfile.SpooledTemporaryFile(max_size=settings.DOWNLOAD_SPOOL_MAX_BYTES) as archive:
+            stream_download(zip_url, archive)
+            archive.seek(0)
+            yield archive
 
 def extract_text_from_pdf(pdf_content: bytes) -> Dict[str, Any]:
     """Extract text content from PDF bytes."""
@@ -63,8 +239,97 @@ def extract_text_from_pdf(pdf_content: bytes) -> Dict[str, Any]:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         raise
 
-def download_zip(zip_url: str) -> List[Dict[str, Any]]:
-    """Download and extract documents from zip file."""
+def extract_document(file_name: str, pdf_content: bytes) -> Optional[Dict[str, Any]]:
+    """Extract one archive member into a document, or None if it is unreadable or empty."""
+    try:
+        # Extract text from PDF
+        doc = extract_text_from_pdf(pdf_content)
+        
+        # Add source information
+        doc["source"] = file_name
+        doc["type"] = "earnings_call"
+        
+        if doc["content"].strip():
+            logger.info(f"Successfully extracted text from {file_name}: "
+                      f"{len(doc['content'])} chars, "
+                      f"{len(doc['pages'])} pages")
+            return doc
+
+        logger.warning(f"No text content found in {file_name}")
+        return None
+            
+    except Exception as e:
+        logger.error(f"Error processing PDF {file_name}: {str(e)}")
+        return None
+
+def _extraction_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn keeps workers independent of any MuPDF state in the parent
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+def _extract_isolated(file_name: str, pdf_content: bytes) -> Optional[Dict[str, Any]]:
+    """Extract one PDF in a worker of its own, so a crash is attributed to this file."""
+    with _extraction_pool(1) as executor:
+        try:
+            return executor.submit(extract_document, file_name, pdf_content).result()
+        except BrokenProcessPool:
+            logger.error(f"Error processing PDF {file_name}: extraction worker crashed")
+            return None
+
+def extract_documents_parallel(pdfs: Iterable[Tuple[str, bytes]], workers: int) -> Iterator[Optional[Dict[str, Any]]]:
+    """Extract PDFs in worker processes, yielding results in input order.
+
+    At most ``workers * 2`` PDFs are read ahead of the results, so the archive is
+    never held in memory at once. Exceptions are handled per PDF inside the workers.
+    If a PDF crashes its worker outright, the pool breaks; the PDFs in flight are
+    then retried one at a time so the offending file can be identified and skipped
+    without losing the rest.
+    """
+    pdfs = iter(pdfs)
+    in_flight: Deque[Tuple[Tuple[str, bytes], Future]] = deque()
+    executor = _extraction_pool(workers)
+    try:
+        while True:
+            for pdf in itertools.islice(pdfs, workers * 2 - len(in_flight)):
+                in_flight.append((pdf, executor.submit(extract_document, *pdf)))
+            if not in_flight:
+                return
+
+            pdf, future = in_flight.popleft()
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                unfinished = [(pdf, future), *in_flight]
+                in_flight.clear()
+                executor.shutdown(cancel_futures=True)
+                logger.warning(f"Extraction worker crashed, retrying {len(unfinished)} PDFs one at a time")
+                for pdf, future in unfinished:
+                    if future.done() and not future.cancelled() and future.exception() is None:
+                        yield future.result()
+                    else:
+                        yield _extract_isolated(*pdf)
+                executor = _extraction_pool(workers)
+            else:
+                yield result
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def source_key(file_name: str) -> str:
+    """Stable key of an archive member, as stored in metadata.source."""
+    return file_name.split("/")[-1]
+
+def download_zip(
+    zip_url: str,
+    workers: Optional[int] = None,
+    known_hashes: Optional[Dict[str, str]] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """Download and extract documents from zip file, optionally across worker processes.
+
+    Returns the extracted documents and the archive manifest ({source: sha256 of the PDF}).
+    PDFs whose hash matches known_hashes are left out of the extraction.
+    """
+    workers = settings.PDF_EXTRACTION_WORKERS if workers is None else workers
+    known_hashes = known_hashes or {}
+    manifest: Dict[str, str] = {}
     try:
         # Handle Google redirect URLs
         if "google.com/url" in zip_url:
@@ -74,64 +339,68 @@ def download_zip(zip_url: str) -> List[Dict[str, Any]]:
                 zip_url = query_params['q'][0]
                 logger.info(f"Extracted actual URL from Google redirect: {zip_url}")
 
-        # Download the file
+        # Stream the file to disk (cache dir or spooled temp file)
         logger.info(f"Downloading zip file from: {zip_url}")
-        response = requests.get(zip_url, verify=False)  # Added verify=False for testing
-        response.raise_for_status()
-        
-        logger.info(f"Downloaded {len(response.content)} bytes")
-
         documents = []
-        try:
-            with zipfile.ZipFile(io.BytesIO(response.content)) as zip_ref:
-                # Filter out macOS metadata and non-PDF files
-                pdf_files = [
-                    f for f in zip_ref.namelist() 
-                    if f.lower().endswith('.pdf') 
-                    and not f.startswith('__MACOSX') 
-                    and not f.startswith('.')
-                    and not f.endswith('/')
-                ]
+        with open_archive(zip_url) as archive:
+            archive_size = archive.seek(0, io.SEEK_END)
+            archive.seek(0)
+            logger.info(f"Archive is {archive_size} bytes")
+            
+            try:
+                with zipfile.ZipFile(archive) as zip_ref:
+                    # Filter out macOS metadata and non-PDF files
+                    pdf_files = [
+                        f for f in zip_ref.namelist() 
+                        if f.lower().endswith('.pdf') 
+                        and not f.startswith('__MACOSX') 
+                        and not f.startswith('.')
+                        and not f.endswith('/')
+                    ]
                 
-                logger.info(f"Found {len(pdf_files)} PDF files in zip")
+                    logger.info(f"Found {len(pdf_files)} PDF files in zip")
                 
-                for file_name in pdf_files:
-                    logger.info(f"Processing PDF: {file_name}")
-                    
-                    # Extract PDF content
-                    with zip_ref.open(file_name) as pdf_file:
-                        pdf_content = pdf_file.read()
-                        logger.info(f"Read {len(pdf_content)} bytes from {file_name}")
-                        
-                        try:
-                            # Extract text from PDF
-                            doc = extract_text_from_pdf(pdf_content)
-                            
-                            # Add source information
-                            doc["source"] = file_name
-                            doc["type"] = "earnings_call"
+                    def read_pdfs():
+                        # Members are read in archive order, one at a time; unchanged ones are skipped
+                        for file_name in pdf_files:
+                            with zip_ref.open(file_name) as pdf_file:
+                                pdf_content = pdf_file.read()
                             
-                            if doc["content"].strip():
-                                documents.append(doc)
-                                logger.info(f"Successfully extracted text from {file_name}: "
-                                          f"{len(doc['content'])} chars, "
-                                          f"{len(doc['pages'])} pages")
-                            else:
-                                logger.warning(f"No text content found in {file_name}")
-                                
-                        except Exception as e:
-                            logger.error(f"Error processing PDF {file_name}: {str(e)}")
-                            continue
+                            source = source_key(file_name)
+                            if source in manifest:
+                                logger.warning(f"Duplicate source {source} in zip, keeping the last one")
+                            manifest[source] = hashlib.sha256(pdf_content).hexdigest()
+                            if known_hashes.get(source) == manifest[source]:
+                                continue
                             
-                logger.info(f"Successfully processed {len(documents)} documents from zip file")
+                            logger.info(f"Read {len(pdf_content)} bytes from {file_name}")
+                            yield file_name, pdf_content
+                
+                    pdfs = read_pdfs()
+                    if workers > 1 and len(pdf_files) > 1:
+                        logger.info(f"Extracting PDFs with {workers} worker processes")
+                        extracted = extract_documents_parallel(pdfs, workers)
+                    else:
+                        extracted = []
+                        for file_name, pdf_content in pdfs:
+                            logger.info(f"Processing PDF: {file_name}")
+                            extracted.append(extract_document(file_name, pdf_content))
+                
+                    documents = [doc for doc in extracted if doc is not None]
+                    for doc in documents:
+                        doc["metadata"]["content_hash"] = manifest[source_key(doc["source"])]
+                    
+                    unchanged = sum(1 for source, content_hash in manifest.items() if known_hashes.get(source) == content_hash)
+                    if unchanged:
+                        logger.info(f"Skipped {unchanged} unchanged PDFs")
+                    logger.info(f"Successfully processed {len(documents)} documents from zip file")
                 
-        except zipfile.BadZipFile as e:
-            logger.error(f"Error extracting zip file: {str(e)}")
-            logger.error(f"Response content type: {response.headers.get('content-type')}")
-            logger.error(f"Response status code: {response.status_code}")
-            raise
+            except zipfile.BadZipFile as e:
+                logger.error(f"Error extracting zip file: {str(e)}")
+                logger.error(f"Downloaded archive is {archive_size} bytes and not a valid zip file")
+                raise
 
-        return documents
+        return documents, manifest
 
     except Exception as e:
         logger.error(f"Error downloading/extracting zip file: {str(e)}")
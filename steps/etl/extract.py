@@ -1,12 +1,26 @@
-from typing import List, Dict, Any
+from typing import Annotated, List, Dict, Any, Optional, Tuple
 from zenml import step
 from steps.etl.download import download_zip
+from steps.etl.load import get_manifest
 
-@step
+# Never cached: the archive and the collection it is diffed against change between runs
+@step(enable_cache=False)
 def extract_data(
     zip_url: str,
-) -> List[Dict[str, Any]]:
-    """Extract digital data from zip file."""
+    collection_name: Optional[str] = None,
+    mongodb_connection_string: Optional[str] = None,
+    incremental: bool = True,
+    workers: Optional[int] = None,
+) -> Tuple[
+    Annotated[List[Dict[str, Any]], "raw_documents"],
+    Annotated[Dict[str, str], "archive_manifest"],
+]:
+    """Extract new or changed documents from zip file, along with the archive manifest."""
+    # Hashes of the PDFs already loaded; matching archive members are not re-extracted
+    known_hashes = {}
+    if incremental and collection_name:
+        known_hashes = get_manifest(collection_name, mongodb_connection_string)
+    
     # Download and extract documents from zip file
-    documents = download_zip(zip_url=zip_url)
-    return documents
\ No newline at end of file
+    documents, manifest = download_zip(zip_url=zip_url, workers=workers, known_hashes=known_hashes)
+    return documents, manifest
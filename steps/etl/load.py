@@ -1,54 +1,96 @@
 from infrastructure.db.mongo import MongoDBClient
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
+from pymongo import ReplaceOne
 from zenml import step
 from loguru import logger
 
+def get_manifest(collection_name: str, mongodb_connection_string: Optional[str] = None) -> Dict[str, str]:
+    """Content hashes of the documents already stored, keyed by metadata.source."""
+    collection = MongoDBClient(mongodb_connection_string).db.get_collection(collection_name)
+    return {
+        doc["metadata"]["source"]: doc["metadata"].get("content_hash", "")
+        for doc in collection.find({}, {"metadata.source": 1, "metadata.content_hash": 1})
+        if doc.get("metadata", {}).get("source")
+    }
+
 @step
 def load_data(
     documents: List[Dict],
     collection_name: str,
-    mongodb_connection_string: str
+    mongodb_connection_string: str,
+    manifest: Optional[Dict[str, str]] = None,
+    incremental: bool = True
 ) -> str:
-    """Store documents in MongoDB."""
+    """Upsert documents into MongoDB by source and drop sources no longer in the archive."""
     # Initialize MongoDB client with provided connection string
     mongo_client = MongoDBClient(mongodb_connection_string)
     collection = mongo_client.db.get_collection(collection_name)
-    
-    # Add metadata to documents
+    collection.create_index("metadata.source")
+
+    # What is stored now, to classify each document and keep first ingestion times
+    existing = {
+        doc["metadata"]["source"]: doc["metadata"]
+        for doc in collection.find(
+            {},
+            {"metadata.source": 1, "metadata.content_hash": 1, "metadata.ingestion_timestamp": 1}
+        )
+        if doc.get("metadata", {}).get("source")
+    }
+
     timestamp = datetime.utcnow()
-    processed_docs = []
-    
+    operations = []
+    added, changed = 0, 0
+    loaded_sources, written_sources = set(), set()
+
     for doc in documents:
+        metadata = doc.get("metadata", {})
+        source = metadata.get("source", "")
+        loaded_sources.add(source)
+        stored = existing.get(source)
+
+        # A full run rewrites everything, e.g. after the cleaning rules change
+        if incremental and stored and stored.get("content_hash") == metadata.get("content_hash"):
+            continue
+        if stored:
+            changed += 1
+        else:
+            added += 1
+
         processed_doc = {
             "content": doc.get("content", ""),
             "metadata": {
-                **doc.get("metadata", {}),
-                "ingestion_timestamp": timestamp,
+                **metadata,
+                "ingestion_timestamp": (stored or {}).get("ingestion_timestamp", timestamp),
                 "last_updated": timestamp,
             }
         }
-        processed_docs.append(processed_doc)
-    
+        written_sources.add(source)
+        operations.append(ReplaceOne({"metadata.source": source}, processed_doc, upsert=True))
+
+    # Without a manifest (full reload) every source missing from this batch is stale
+    current_sources = set(manifest) if manifest is not None else loaded_sources
+    removed_sources = [source for source in existing if source not in current_sources]
+    unchanged = len((current_sources & set(existing)) - written_sources)
+
     try:
-        # First, clear existing documents (optional)
-        collection.delete_many({})
-        logger.info(f"Cleared existing documents from {collection_name}")
-        
-        # Insert documents
-        if processed_docs:
-            result = collection.insert_many(processed_docs)
-            logger.info(f"Successfully inserted {len(result.inserted_ids)} documents into {collection_name}")
-            
-            # Verify insertion
-            count = collection.count_documents({})
-            logger.info(f"Total documents in collection after insertion: {count}")
-            
-            return f"Inserted {len(result.inserted_ids)} documents"
-        else:
-            logger.warning("No documents to insert")
-            return "No documents to insert"
-            
+        if operations:
+            result = collection.bulk_write(operations, ordered=False)
+            logger.info(f"Upserted {result.upserted_count + result.modified_count} documents into {collection_name}")
+
+        if removed_sources:
+            result = collection.delete_many({"metadata.source": {"$in": removed_sources}})
+            logger.info(f"Removed {result.deleted_count} documents no longer in the archive")
+
+        summary = f"Added {added}, changed {changed}, unchanged {unchanged}, removed {len(removed_sources)} documents"
+        logger.info(f"{summary} in {collection_name}")
+
+        # Verify load
+        count = collection.count_documents({})
+        logger.info(f"Total documents in collection after load: {count}")
+
+        return summary
+
     except Exception as e:
-        logger.error(f"Failed to insert documents: {e}")
-        raise
\ No newline at end of file
+        logger.error(f"Failed to load documents: {e}")
+        raise
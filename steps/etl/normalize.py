@@ -2,6 +2,85 @@ from typing import List, Dict, Any
 from zenml import step
 from loguru import logger
 import re
+from shared.preprocessing.operations.substitution import FusedSubstitution
+
+# Compiled once at import; each group mirrors one normalization stage below
+_WHITESPACE = re.compile(r'\s+')
+_PUNCTUATION_SPACING = re.compile(r'\s*([.,?!:;])\s*')
+
+_DECIMAL_MILLION = re.compile(r'\b(\d+)\.(\d+)\s*million\b', flags=re.IGNORECASE)
+_DECIMAL_BILLION = re.compile(r'\b(\d+)\.(\d+)\s*billion\b', flags=re.IGNORECASE)
+_WHOLE_MILLION = re.compile(r'\b(\d+)\s*million\b', flags=re.IGNORECASE)
+_WHOLE_BILLION = re.compile(r'\b(\d+)\s*billion\b', flags=re.IGNORECASE)
+
+# Titles, roles and abbreviations are whole-word literals whose replacements never
+# match another entry of the same group, so each group is applied in a single pass.
+_TITLES = FusedSubstitution({
+    'chief executive officer': 'CEO',
+    'chief financial officer': 'CFO',
+    'chief operating officer': 'COO',
+    'chief technology officer': 'CTO',
+    'executive vice president': 'EVP',
+    'senior vice president': 'SVP',
+    'vice president': 'VP',
+    'managing director': 'MD'
+})
+
+_ROLES = FusedSubstitution({
+    'operator': 'Operator:',
+    'analyst': 'Analyst:',
+    'moderator': 'Moderator:',
+    'presenter': 'Presenter:',
+    'ceo': 'CEO:',
+    'cfo': 'CFO:'
+})
+_OPERATOR_INSTRUCTIONS = re.compile(r'\bOperator Instructions\b', flags=re.IGNORECASE)
+
+_FISCAL_YEAR_SHORT = re.compile(r'\bfy(\d{2,4})\b', flags=re.IGNORECASE)
+_FISCAL_YEAR_TWO_DIGIT = re.compile(r'fiscal year (\d{2})(?!\d{2})\b')
+_FISCAL_YEAR_FOUR_DIGIT = re.compile(r'fiscal year (\d{4})\b')
+
+# Quarter abbreviations and the other financial abbreviations share one table
+_ABBREVIATIONS = FusedSubstitution({
+    'q1': 'first quarter',
+    'q2': 'second quarter',
+    'q3': 'third quarter',
+    'q4': 'fourth quarter',
+    '1q': 'first quarter',
+    '2q': 'second quarter',
+    '3q': 'third quarter',
+    '4q': 'fourth quarter',
+    'fq1': 'first fiscal quarter',
+    'fq2': 'second fiscal quarter',
+    'fq3': 'third fiscal quarter',
+    'fq4': 'fourth fiscal quarter',
+    'f1q': 'first fiscal quarter',
+    'f2q': 'second fiscal quarter',
+    'f3q': 'third fiscal quarter',
+    'f4q': 'fourth fiscal quarter',
+    'fy': 'fiscal year',
+    'yoy': 'year-over-year',
+    'qoq': 'quarter-over-quarter',
+    'ebitda': 'EBITDA',
+    'gaap': 'GAAP',
+    'mrr': 'monthly recurring revenue',
+    'acv': 'annual contract value'
+})
+_COMBINED_QUARTER = re.compile(
+    r'(\w+)\s+(?:fiscal\s+)?quarter\s+(?:of\s+)?fiscal year\s+(\d{2,4})',
+    flags=re.IGNORECASE
+)
+
+_DECIMAL_CURRENCY_K = re.compile(r'\$(\d+)\.(\d+)[Kk]\b')
+_DECIMAL_CURRENCY_M = re.compile(r'\$(\d+)\.(\d+)[Mm]\b')
+_DECIMAL_CURRENCY_B = re.compile(r'\$(\d+)\.(\d+)[Bb]\b')
+_WHOLE_CURRENCY_K = re.compile(r'\$(\d+)[Kk]\b')
+_WHOLE_CURRENCY_M = re.compile(r'\$(\d+)[Mm]\b')
+_WHOLE_CURRENCY_B = re.compile(r'\$(\d+)[Bb]\b')
+
+_DOT_SEQUENCES = re.compile(r'\.{2,}')
+_TABLE_OF_CONTENTS = re.compile(r'\bTable of Contents\b', flags=re.IGNORECASE)
+
 
 class TranscriptNormalizer:
     @staticmethod
@@ -12,8 +91,8 @@ class TranscriptNormalizer:
     @staticmethod
     def normalize_punctuation(text: str) -> str:
         """Standardize punctuation and whitespace."""
-        text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-        text = re.sub(r'\s*([.,?!:;])\s*', r'\1 ', text)  # Ensure single space after punctuation
+        text = _WHITESPACE.sub(' ', text)  # Normalize whitespace
+        text = _PUNCTUATION_SPACING.sub(r'\1 ', text)  # Ensure single space after punctuation
         return text.strip()
 
     @staticmethod
@@ -24,69 +103,38 @@ class TranscriptNormalizer:
             return text
             
         # Handle decimal numbers with million/billion
-        text = re.sub(
-            r'\b(\d+)\.(\d+)\s*million\b',
+        text = _DECIMAL_MILLION.sub(
             lambda m: f'{float(f"{m.group(1)}.{m.group(2)}") * 1000000:,.0f}',
-            text,
-            flags=re.IGNORECASE
+            text
         )
-        text = re.sub(
-            r'\b(\d+)\.(\d+)\s*billion\b',
+        text = _DECIMAL_BILLION.sub(
             lambda m: f'{float(f"{m.group(1)}.{m.group(2)}") * 1000000000:,.0f}',
-            text,
-            flags=re.IGNORECASE
+            text
         )
         
         # Handle whole numbers
-        text = re.sub(
-            r'\b(\d+)\s*million\b',
+        text = _WHOLE_MILLION.sub(
             lambda m: f'{int(m.group(1)) * 1000000:,d}',
-            text,
-            flags=re.IGNORECASE
+            text
         )
-        text = re.sub(
-            r'\b(\d+)\s*billion\b',
+        text = _WHOLE_BILLION.sub(
             lambda m: f'{int(m.group(1)) * 1000000000:,d}',
-            text,
-            flags=re.IGNORECASE
+            text
         )
         return text
 
     @staticmethod
     def normalize_titles(text: str) -> str:
         """Replace job titles with common abbreviations."""
-        title_mappings = {
-            r'\bchief executive officer\b': 'CEO',
-            r'\bchief financial officer\b': 'CFO',
-            r'\bchief operating officer\b': 'COO',
-            r'\bchief technology officer\b': 'CTO',
-            r'\bexecutive vice president\b': 'EVP',
-            r'\bsenior vice president\b': 'SVP',
-            r'\bvice president\b': 'VP',
-            r'\bmanaging director\b': 'MD'
-        }
-        
-        for full_title, abbrev in title_mappings.items():
-            text = re.sub(full_title, abbrev, text, flags=re.IGNORECASE)
-        return text
+        return _TITLES.sub(text)
     
     @staticmethod
     def normalize_roles(text: str) -> str:
         """Standardize and format roles like 'Operator', 'Analyst', and 'Moderator'."""
-        role_mappings = {
-            r'\boperator\b': 'Operator:',
-            r'\banalyst\b': 'Analyst:',
-            r'\bmoderator\b': 'Moderator:',
-            r'\bpresenter\b': 'Presenter:',
-            r'\bceo\b': 'CEO:',
-            r'\bcfo\b': 'CFO:'
-        }
-        
-        for role, standardized_role in role_mappings.items():
-            text = re.sub(role, standardized_role, text, flags=re.IGNORECASE)
+        text = _ROLES.sub(text)
         
         # Remove operator instructions (e.g., "Operator Instructions")
-        text = re.sub(r'\bOperator Instructions\b', '', text, flags=re.IGNORECASE)
+        text = _OPERATOR_INSTRUCTIONS.sub('', text)
         
         return text
 
@@ -95,57 +143,18 @@ class TranscriptNormalizer:
     def normalize_abbreviations(text: str) -> str:
         """Standardize common financial abbreviations and quarter abbreviations."""
         # First handle fiscal year patterns with numbers
-        text = re.sub(r'\bfy(\d{2,4})\b', r'fiscal year \1', text, flags=re.IGNORECASE)
-        text = re.sub(r'fiscal year (\d{2})(?!\d{2})\b', r"fiscal year '\1", text)
-        text = re.sub(r'fiscal year (\d{4})\b', r"fiscal year '\1", text)
-        
-        # Handle quarter abbreviations first (before other abbreviations)
-        quarter_mappings = {
-            r'\bq1\b': 'first quarter',
-            r'\bq2\b': 'second quarter',
-            r'\bq3\b': 'third quarter',
-            r'\bq4\b': 'fourth quarter',
-            r'\b1q\b': 'first quarter',
-            r'\b2q\b': 'second quarter',
-            r'\b3q\b': 'third quarter',
-            r'\b4q\b': 'fourth quarter',
-            r'\bfq1\b': 'first fiscal quarter',
-            r'\bfq2\b': 'second fiscal quarter',
-            r'\bfq3\b': 'third fiscal quarter',
-            r'\bfq4\b': 'fourth fiscal quarter',
-            r'\bf1q\b': 'first fiscal quarter',
-            r'\bf2q\b': 'second fiscal quarter',
-            r'\bf3q\b': 'third fiscal quarter',
-            r'\bf4q\b': 'fourth fiscal quarter'
-        }
-        
-        for abbrev, full_term in quarter_mappings.items():
-            text = re.sub(abbrev, full_term, text, flags=re.IGNORECASE)
+        text = _FISCAL_YEAR_SHORT.sub(r'fiscal year \1', text)
+        text = _FISCAL_YEAR_TWO_DIGIT.sub(r"fiscal year '\1", text)
+        text = _FISCAL_YEAR_FOUR_DIGIT.sub(r"fiscal year '\1", text)
         
-        # Then handle other abbreviations
-        abbreviation_mappings = {
-            r'\bfy\b': 'fiscal year',
-            r'\byoy\b': 'year-over-year',
-            r'\bqoq\b': 'quarter-over-quarter',
-            r'\bebitda\b': 'EBITDA',
-            r'\bgaap\b': 'GAAP',
-            r'\bmrr\b': 'monthly recurring revenue',
-            r'\bacv\b': 'annual contract value'
-        }
-        
-        for abbrev, full_term in abbreviation_mappings.items():
-            text = re.sub(abbrev, full_term, text, flags=re.IGNORECASE)
+        # Quarter abbreviations, then other abbreviations, in one pass
+        text = _ABBREVIATIONS.sub(text)
         
         # Handle combined patterns (e.g., "fourth quarter fy23")
-        text = re.sub(
-            r'(\w+)\s+(?:fiscal\s+)?quarter\s+(?:of\s+)?fiscal year\s+(\d{2,4})',
-            r'\1 fiscal quarter of fiscal year \'\2',
-            text,
-            flags=re.IGNORECASE
-        )
+        text = _COMBINED_QUARTER.sub(r'\1 fiscal quarter of fiscal year \'\2', text)
         
         # Clean up any double spaces
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE.sub(' ', text)
         
         return text.strip()
 
@@ -153,35 +162,29 @@ class TranscriptNormalizer:
     def normalize_currency(text: str) -> str:
         """Standardize currency formats (e.g., $1M to $1,000,000)."""
         # Handle decimal numbers with K/M/B
-        text = re.sub(
-            r'\$(\d+)\.(\d+)[Kk]\b',
+        text = _DECIMAL_CURRENCY_K.sub(
             lambda m: f'${float(f"{m.group(1)}.{m.group(2)}") * 1000:,.0f}',
             text
         )
-        text = re.sub(
-            r'\$(\d+)\.(\d+)[Mm]\b',
+        text = _DECIMAL_CURRENCY_M.sub(
             lambda m: f'${float(f"{m.group(1)}.{m.group(2)}") * 1000000:,.0f}',
             text
         )
-        text = re.sub(
-            r'\$(\d+)\.(\d+)[Bb]\b',
+        text = _DECIMAL_CURRENCY_B.sub(
             lambda m: f'${float(f"{m.group(1)}.{m.group(2)}") * 1000000000:,.0f}',
             text
         )
         
         # Handle whole numbers with K/M/B
-        text = re.sub(
-            r'\$(\d+)[Kk]\b',
+        text = _WHOLE_CURRENCY_K.sub(
             lambda m: f'${int(m.group(1)) * 1000:,d}',
             text
         )
-        text = re.sub(
-            r'\$(\d+)[Mm]\b',
+        text = _WHOLE_CURRENCY_M.sub(
             lambda m: f'${int(m.group(1)) * 1000000:,d}',
             text
         )
-        text = re.sub(
-            r'\$(\d+)[Bb]\b',
+        text = _WHOLE_CURRENCY_B.sub(
             lambda m: f'${int(m.group(1)) * 1000000000:,d}',
             text
         )
@@ -190,8 +193,8 @@ class TranscriptNormalizer:
     @staticmethod
     def remove_table_of_contents(text: str) -> str:
         """Remove table of contents or repetitive dot patterns."""
-        text = re.sub(r'\.{2,}', '', text)  # Remove sequences of dots
-        text = re.sub(r'\bTable of Contents\b', '', text, flags=re.IGNORECASE)
+        text = _DOT_SEQUENCES.sub('', text)  # Remove sequences of dots
+        text = _TABLE_OF_CONTENTS.sub('', text)
         return text.strip()
 
     @staticmethod
@@ -42,7 +42,8 @@ def transform_transcript(
                 "pdf_title": doc.get("title", ""),
                 "pdf_author": metadata.get("author", ""),
                 "pdf_creation_date": creation_date,
-                "pdf_modification_date": modification_date
+                "pdf_modification_date": modification_date,
+                "content_hash": metadata.get("content_hash", "")
             }
         }
         
@@ -1,9 +1,39 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from pipelines.inference import inference_pipeline
+from pipelines.retrieval import aretrieval_pipeline
+from steps.inference.context import prepare_context
+from steps.inference.llm import generate_answer
+from infrastructure.embeddings.engine import EmbeddingEngine
+from steps.retrieval.semantic_cache import semantic_cache
+from steps.retrieval.reranking import CrossEncoderReranker
+from infrastructure.db.vector_store import get_vector_store
+from infrastructure.db.mongo import AsyncMongoDBClient
+from infrastructure.db.llm_cache import LLMResponseCache
+from settings import settings
 from loguru import logger
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the embedding model once, before the first request arrives
+    engine = EmbeddingEngine().warmup()
+    if settings.VECTOR_STORE_BACKEND == "local":
+        # Map the snapshot now rather than on the first search
+        get_vector_store().load()
+    if settings.RERANKER == "cross-encoder":
+        CrossEncoderReranker().warmup()
+    if settings.QUERY_BATCHING_ENABLED:
+        engine.start_query_batching()
+    yield
+    engine.stop_query_batching()
+    # Close the pooled async connections opened on this loop
+    await get_vector_store().aclose()
+    await AsyncMongoDBClient.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 class QueryRequest(BaseModel):
@@ -14,17 +44,39 @@ class QueryResponse(BaseModel):
     answer: str
 
 
+@app.get("/metrics/embeddings")
+async def embedding_metrics():
+    """Queue-wait and batch-size histograms of the query embedding batcher"""
+    batcher = EmbeddingEngine().query_batcher
+    if batcher is None:
+        return {"batching": False}
+    return {"batching": batcher.running, **batcher.metrics()}
+
+
+@app.get("/metrics/semantic-cache")
+async def semantic_cache_metrics():
+    """Hit ratio and size of the retrieval semantic cache"""
+    return semantic_cache.stats()
+
+
+@app.get("/metrics/llm-cache")
+async def llm_cache_metrics():
+    """LLM response cache hits and misses per retrieval step"""
+    return LLMResponseCache().stats()
+
+
 @app.post("/rag", response_model=QueryResponse)
 async def rag_endpoint(request: QueryRequest):
     """RAG endpoint that processes queries and returns answers"""
     try:
         logger.info(f"Processing query: {request.query}")
         
-        # Run inference pipeline
-        pipeline_response = inference_pipeline(request.query)
+        # Retrieve on the server's loop so concurrent requests share the async clients
+        documents = await aretrieval_pipeline(request.query)
+        context = prepare_context.entrypoint(documents=documents)
         
-        # Extract answer from pipeline response
-        answer = pipeline_response.steps["generate_answer"].output.load()
+        # The LLM client is blocking: run it on a worker thread
+        answer = await asyncio.to_thread(generate_answer.entrypoint, query=request.query, context=context)
         
         if not answer:
             raise ValueError("No answer generated")
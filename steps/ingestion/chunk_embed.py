@@ -1,71 +1,162 @@
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
+import numpy as np
 from zenml import step
 from loguru import logger
-from sentence_transformers import SentenceTransformer
-from shared.preprocessing.operations.chunking import create_chunks
+from infrastructure.embeddings.engine import EmbeddingEngine, length_sorted_batches
+from infrastructure.embeddings.cache import EmbeddingCache
+from infrastructure.embeddings.pool import EmbeddingProcessPool
+from shared.preprocessing.operations.chunking import create_token_chunks
 from shared.preprocessing.operations.chunk_tagging import tag_chunk
+from shared.preprocessing.operations.dedup import deduplicate_chunks
 from settings import settings
 
+
+def chunk_document(
+    doc: Dict,
+    position: int,
+    max_tokens: int = settings.CHUNK_MAX_TOKENS,
+    overlap_tokens: int = settings.CHUNK_OVERLAP_TOKENS
+) -> List[Dict]:
+    """Split one document into chunk records (without embeddings) that fit the embedding model."""
+    # Get document content and metadata
+    content = doc.get('content', '')
+    presentation = str(content.get('presentation', ''))
+    qa = str(content.get('qa', ''))
+    metadata = doc.get('metadata', {})
+    doc_id = str(doc.get('_id', f'doc_{position}'))
+
+    logger.debug(f"Processing document with ID: {doc_id}")
+
+    if doc_id == f'doc_{position}':
+        logger.warning(f"Using fallback ID for document {position} - original _id not found")
+
+    chunk_docs = []
+    # Process each section using chunk_text
+    for text_type, text in [("presentation", presentation), ("qa", qa)]:
+        if not text.strip():
+            continue
+
+        chunks = create_token_chunks(text, max_tokens=max_tokens or None, overlap_tokens=overlap_tokens)
+
+        for chunk_index, chunk in enumerate(chunks):
+            chunk_docs.append({
+                'text': chunk.text,
+                'metadata': {
+                    **metadata,  # Spread the original document metadata
+                    'tags': tag_chunk(chunk.text),
+                    'chunk_index': chunk_index,
+                    'original_id': doc_id,
+                    'section': text_type,
+                    'total_chunks': len(chunks),
+                    'char_start': chunk.char_start,
+                    'char_end': chunk.char_end,
+                    'token_start': chunk.token_start,
+                    'token_end': chunk.token_end
+                }
+            })
+
+        logger.info(f"Processed {text_type} section of document {position}: created {len(chunks)} chunks")
+
+    return chunk_docs
+
+
+def embedding_cache(model: EmbeddingEngine, pool: Optional[EmbeddingProcessPool] = None) -> Optional[EmbeddingCache]:
+    """Cache for the backend the vectors come from, with its counters reset, or None when caching is disabled.
+
+    With a pool the workers report their backend, so the model is not loaded in this process.
+    """
+    if not settings.EMBEDDING_CACHE_DIR:
+        return None
+    if pool is not None:
+        cache = EmbeddingCache.for_model(pool.model_name, pool.backend)
+    else:
+        cache = EmbeddingCache.for_model(model.model_name, model.backend)
+    cache.reset_stats()
+    return cache
+
+
+def embed_texts(
+    texts: List[str],
+    model: EmbeddingEngine,
+    cache: Optional[EmbeddingCache] = None,
+    batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+    pool: Optional[EmbeddingProcessPool] = None
+) -> np.ndarray:
+    """Embed texts in length-sorted batches and return vectors in input order."""
+    if cache is not None:
+        vectors, missing = cache.get_many(texts)
+    else:
+        vectors, missing = [None] * len(texts), list(range(len(texts)))
+
+    missing_texts = [texts[i] for i in missing]
+    batches = [[missing[j] for j in indices] for indices in length_sorted_batches(missing_texts, batch_size)]
+    batch_texts = ([texts[i] for i in indices] for indices in batches)
+    if pool is not None:
+        encoded = pool.imap(batch_texts, batch_size)
+    else:
+        encoded = (model.encode(batch, batch_size=batch_size) for batch in batch_texts)
+
+    for indices, batch_vectors in zip(batches, encoded):
+        for i, vector in zip(indices, batch_vectors):
+            vectors[i] = vector
+        if cache is not None:
+            cache.put_many([texts[i] for i in indices], batch_vectors)
+
+    return np.vstack(vectors).astype(np.float32, copy=False)
+
+
 @step
-def chunk_and_embed(documents: List[Dict]) -> List[Dict]:
-    """Chunk and embed documents."""
+def chunk_and_embed(
+    documents: List[Dict],
+    batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+    workers: int = settings.EMBEDDING_WORKERS,
+    dedup_threshold: float = settings.DEDUP_THRESHOLD
+) -> List[Dict]:
+    """Chunk, collapse near-duplicates and embed documents, optionally across a pool of worker processes."""
     if not documents:
         logger.warning("No documents to process")
         return []
     
-    # Initialize the embedding model
-    model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
-    chunk_size = 1000
-    overlap = 200
-    
+    # Shared embedding engine - loaded on first use, so not at all when worker processes embed
+    model = EmbeddingEngine()
+    # Chunk every document first so embedding can batch across documents
     processed_chunks = []
-    
     for i, doc in enumerate(documents, 1):
         try:
-            # Get document content and metadata
-            content = doc.get('content', '')
-            presentation = str(content.get('presentation', ''))
-            qa = str(content.get('qa', ''))
-            metadata = doc.get('metadata', {})
-            doc_id = str(doc.get('_id', f'doc_{i}'))
-            
-            logger.debug(f"Processing document with ID: {doc_id}")
-            
-            if doc_id == f'doc_{i}':
-                logger.warning(f"Using fallback ID for document {i} - original _id not found")
-            
-            # Process each section using chunk_text
-            for text_type, text in [("presentation", presentation), ("qa", qa)]:
-                if not text.strip():
-                    continue
-                    
-                # Use chunk_text function
-                chunks = create_chunks(text, chunk_size=chunk_size, chunk_overlap=overlap)
-                
-                for chunk_index, chunk in enumerate(chunks):
-                    # Create embedding
-                    embedding = model.encode(chunk).tolist()
-                    
-                    # Create chunk document
-                    chunk_doc = {
-                        'text': chunk,
-                        'embedding': embedding,
-                        'metadata': {
-                            **metadata,  # Spread the original document metadata
-                            'tags': tag_chunk(chunk),
-                            'chunk_index': chunk_index,
-                            'original_id': doc_id,
-                            'section': text_type,
-                            'total_chunks': len(chunks)
-                        }
-                    }
-                    processed_chunks.append(chunk_doc)
-                
-                logger.info(f"Processed {text_type} section of document {i}: created {len(chunks)} chunks")
-            
+            processed_chunks.extend(chunk_document(doc, i))
         except Exception as e:
             logger.error(f"Failed to process document {i}: {e}")
             continue
     
     logger.info(f"Total chunks created: {len(processed_chunks)}")
-    return processed_chunks
\ No newline at end of file
+    if not processed_chunks:
+        return []
+
+    # Boilerplate (safe harbor, operator scripts) repeats across calls; embed it once
+    if dedup_threshold > 0:
+        processed_chunks, _ = deduplicate_chunks(
+            processed_chunks, dedup_threshold, settings.DEDUP_NUM_PERM, settings.DEDUP_SHINGLE_SIZE
+        )
+
+    start = time.perf_counter()
+    texts = [chunk['text'] for chunk in processed_chunks]
+    if workers > 0:
+        with EmbeddingProcessPool(workers=workers) as pool:
+            cache = embedding_cache(model, pool)
+            embeddings = embed_texts(texts, model, cache, batch_size, pool=pool)
+    else:
+        cache = embedding_cache(model)
+        embeddings = embed_texts(texts, model, cache, batch_size)
+    for chunk_doc, embedding in zip(processed_chunks, embeddings):
+        chunk_doc['embedding'] = embedding.tolist()
+    elapsed = time.perf_counter() - start
+
+    logger.info(f"Embedded {len(processed_chunks)} chunks in {elapsed:.1f}s "
+                f"({len(processed_chunks) / max(elapsed, 1e-9):.1f} chunks/sec, batch size {batch_size}, "
+                f"{workers or 'no'} worker processes)")
+    if cache is not None:
+        stats = cache.stats()
+        logger.info(f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+                    f"({stats['hit_ratio']:.1%} hit ratio, {stats['size']} vectors stored)")
+    return processed_chunks
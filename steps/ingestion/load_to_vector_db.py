@@ -1,12 +1,33 @@
-from typing import List, Dict
+from typing import Iterable, List, Dict, Set
 from zenml import step
-from infrastructure.db.qdrant import QdrantClient
+from infrastructure.db.vector_store import get_vector_store, point_id
+from infrastructure.db.bm25 import BM25IndexBuilder, index_path
 from settings import settings
 from loguru import logger
 
+
+def index_chunks(builder: BM25IndexBuilder, documents: List[Dict]) -> None:
+    """Add the chunks that get upserted to a BM25 index, under their Qdrant point IDs."""
+    for doc in documents:
+        if doc.get('embedding'):
+            builder.add(point_id(doc['metadata'], doc['text']), doc['text'])
+
+
+def source_ids(documents: Iterable[Dict]) -> Set[str]:
+    """Source documents ('original_id') behind chunk records, including collapsed duplicates."""
+    ids = set()
+    for doc in documents:
+        metadata = doc.get('metadata', {})
+        if metadata.get('original_id') is not None:
+            ids.add(metadata['original_id'])
+        ids.update(source['original_id'] for source in metadata.get('duplicate_sources', [])
+                   if source.get('original_id') is not None)
+    return ids
+
+
 @step
 def load_to_vector_db(documents: List[Dict], collection_name: str = settings.VECTOR_COLLECTION_NAME) -> None:
-    """Load documents into Qdrant vector database."""
+    """Load documents into Qdrant vector database and rebuild the BM25 index over them."""
     logger.info(f"Attempting to load {len(documents)} documents to vector database")
     
     if not documents:
@@ -14,16 +35,23 @@ def load_to_vector_db(documents: List[Dict], collection_name: str = settings.VEC
         return
     
     try:
-        # Initialize Qdrant client
-        qdrant_client = QdrantClient()
+        # Qdrant or the local snapshot, per settings
+        vector_store = get_vector_store()
         
-        # Add documents using simplified API
-        qdrant_client.add_documents(
+        # Replace each document's points, so chunks it no longer produces are removed
+        vector_store.delete_documents(source_ids(documents), collection_name=collection_name)
+        vector_store.add_documents(
             documents=documents,
             collection_name=collection_name
         )
+        vector_store.flush(collection_name)
         
         logger.info(f"Successfully loaded {len(documents)} documents to vector database")
+
+        if settings.BM25_INDEX_DIR:
+            builder = BM25IndexBuilder()
+            index_chunks(builder, documents)
+            builder.write(index_path(collection_name))
         
     except Exception as e:
         logger.error(f"Failed to load documents to vector database: {e}")
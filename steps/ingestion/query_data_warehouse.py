@@ -1,23 +1,87 @@
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
 from pymongo import DESCENDING
 from settings import settings
 from loguru import logger
 from zenml import step
 import os
 
-from infrastructure.db.mongo import MongoDBClient
+from infrastructure.db.mongo import AsyncMongoDBClient, MongoDBClient
 from shared.domain.documents import VectorSearchResult
 
 
-def fetch_all_data(collection) -> List[Dict]:
-    """Fetch all documents from MongoDB collection."""
+# Only what ingestion embeds and stores; full page text stays in MongoDB
+INGESTION_PROJECTION = {'_id': 1, 'content.presentation': 1, 'content.qa': 1, 'metadata': 1}
+
+
+def stream_documents(
+    collection,
+    batch_size: int = settings.MONGODB_CURSOR_BATCH_SIZE,
+    projection: Optional[Dict[str, int]] = None
+) -> Iterator[Dict]:
+    """Lazily yield documents from a MongoDB collection, batch_size documents per round trip."""
+    projection = projection or INGESTION_PROJECTION
+    total = collection.count_documents({})
+    fetched = 0
     try:
-        documents = list(collection.find({}, {'_id': 1, 'content': 1, 'metadata': 1}))
-        logger.info(f"Fetched {len(documents)} documents from MongoDB")
-        return documents
+        with collection.find({}, projection, batch_size=batch_size) as cursor:
+            for doc in cursor:
+                doc['_id'] = str(doc['_id'])  # Convert ObjectId to string
+                doc.setdefault("metadata", {})
+                doc["metadata"]["collection_name"] = collection.name
+                doc["metadata"]["collection_total_docs"] = str(total)
+                fetched += 1
+                yield doc
     except Exception as e:
         logger.error(f"Error fetching documents: {e}")
         raise
+    logger.info(f"Streamed {fetched} documents from {collection.name}")
+
+
+def fetch_all_data(collection) -> List[Dict]:
+    """Fetch all documents from MongoDB collection."""
+    documents = list(stream_documents(collection))
+    logger.info(f"Fetched {len(documents)} documents from MongoDB")
+    return documents
+
+
+def _intent_cursor(collection, mongo_query: Dict[str, Any]):
+    """Cursor for a query from the IntentDetector, with its $sort, $limit and projection applied."""
+    # Extract special operators from query
+    sort_spec = mongo_query.pop('$sort', None)
+    limit = mongo_query.pop('$limit', None)
+    projection = mongo_query.pop('projection', None)
+
+    # Basic find query
+    cursor = collection.find(mongo_query, projection)
+
+    # Apply sort if specified
+    if sort_spec:
+        cursor = cursor.sort(list(sort_spec.items()))
+
+    # Apply limit if specified
+    if limit:
+        cursor = cursor.limit(limit)
+    return cursor
+
+
+def _to_intent_result(doc: Dict) -> VectorSearchResult:
+    """Convert a matched document to VectorSearchResult format."""
+    # Extract metadata fields
+    metadata = {}
+    if 'metadata' in doc:
+        metadata.update(doc['metadata'])
+    else:
+        # If fields are at top level, include them in metadata
+        metadata.update({
+            k: v for k, v in doc.items()
+            if k not in ['_id', 'content', 'metadata']
+        })
+
+    return VectorSearchResult(
+        text=f"Database query results: {str(metadata)}",
+        metadata=metadata,
+        score=1.0
+    )
 
 
 def execute_mongo_query(mongo_query: Dict[str, Any], collection_name: str = settings.MONGODB_COLLECTION_NAME, limit: int = None) -> List[VectorSearchResult]:
@@ -26,47 +90,22 @@ def execute_mongo_query(mongo_query: Dict[str, Any], collection_name: str = sett
         mongo_client = MongoDBClient(settings.MONGODB_CONNECTION_STRING)
         collection = mongo_client.db.get_collection(collection_name)
 
-        # Parse the query to separate filtering, sorting, and projection
-        filter_query = {}
-        sort_fields = []
-        projection = None
+        results = [_to_intent_result(doc) for doc in _intent_cursor(collection, mongo_query)]
 
-        # Extract special operators from query
-        sort_spec = mongo_query.pop('$sort', None)
-        limit = mongo_query.pop('$limit', None)
-        projection = mongo_query.pop('projection', None)
-        
-        # Basic find query
-        cursor = collection.find(mongo_query, projection)
-        
-        # Apply sort if specified
-        if sort_spec:
-            cursor = cursor.sort(list(sort_spec.items()))
-            
-        # Apply limit if specified
-        if limit:
-            cursor = cursor.limit(limit)
-
-        # Convert results to VectorSearchResult format
-        results = []
-        for doc in cursor:
-            # Extract metadata fields
-            metadata = {}
-            if 'metadata' in doc:
-                metadata.update(doc['metadata'])
-            else:
-                # If fields are at top level, include them in metadata
-                metadata.update({
-                    k: v for k, v in doc.items()
-                    if k not in ['_id', 'content', 'metadata']
-                })
-
-            result = VectorSearchResult(
-                text=f"Database query results: {str(metadata)}",
-                metadata=metadata,
-                score=1.0
-            )
-            results.append(result)
+        logger.info(f"Found {len(results)} documents matching intent query")
+        return results
+
+    except Exception as e:
+        logger.error(f"Error executing MongoDB query: {e}", exc_info=True)
+        return []
+
+
+async def aexecute_mongo_query(mongo_query: Dict[str, Any], collection_name: str = settings.MONGODB_COLLECTION_NAME) -> List[VectorSearchResult]:
+    """Async execute_mongo_query over the pooled client, for the API."""
+    try:
+        collection = AsyncMongoDBClient(settings.MONGODB_CONNECTION_STRING).db.get_collection(collection_name)
+
+        results = [_to_intent_result(doc) async for doc in _intent_cursor(collection, mongo_query)]
 
         logger.info(f"Found {len(results)} documents matching intent query")
         return results
@@ -86,16 +125,10 @@ def query_data_warehouse(collections: List[str]) -> List[Dict]:
         logger.info(f"Querying data warehouse for collection: {collection_name}")
         collection = mongo_client.db.get_collection(collection_name)
         
-        # Fetch documents
-        documents = fetch_all_data(collection)
-        logger.info(f"Found {len(documents)} documents in collection {collection_name}")
-        
-        # Add collection metadata
-        for doc in documents:
-            doc["metadata"]["collection_name"] = collection_name
-            doc["metadata"]["collection_total_docs"] = str(len(documents))
-            doc['_id'] = str(doc['_id'])  # Convert ObjectId to string
-            all_documents.append(doc)
+        # Stream documents; the step output is still materialized for ZenML
+        count = len(all_documents)
+        all_documents.extend(stream_documents(collection))
+        logger.info(f"Found {len(all_documents) - count} documents in collection {collection_name}")
     
     logger.info(f"Total documents processed: {len(all_documents)}")
     
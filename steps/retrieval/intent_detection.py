@@ -13,14 +13,15 @@ from steps.prompt_templates import IntentDetectionTemplate
 
 
 class IntentDetector(RAGStep):
-    def __init__(self, mock: bool = False):
-        super().__init__(mock=mock)
+    def __init__(self, mock: bool = False, use_cache: bool = True):
+        super().__init__(mock=mock, use_cache=use_cache)
         self.model = ChatOpenAI(
             model=settings.OPENAI_MODEL,
             api_key=settings.OPENAI_API_KEY,
             temperature=0
         )
-        self.prompt = IntentDetectionTemplate().create_template()
+        self.template = IntentDetectionTemplate()
+        self.prompt = self.template.create_template()
 
     def generate(self, query: LLMQuery) -> Tuple[QueryIntent, Optional[Dict[str, Any]]]:
         """Required implementation of RAGStep's generate method"""
@@ -32,11 +33,8 @@ class IntentDetector(RAGStep):
             return QueryIntent.GENERAL, None
 
         try:
-            # Create chain with prompt template
-            chain = self.prompt | self.model
-            
-            # Get response from LLM
-            response = chain.invoke({"question": query.content})
+            # Get response from LLM (or the response cache)
+            response = self._invoke(self.template, self.prompt, self.model, {"question": query.content})
             
             # Parse LLM response
             intent_data = self._parse_intent_response(response)
@@ -48,10 +46,29 @@ class IntentDetector(RAGStep):
             logger.error(f"Error detecting intent: {e}", exc_info=True)
             return QueryIntent.GENERAL, None
 
+    async def agenerate(self, query: LLMQuery) -> Tuple[QueryIntent, Optional[Dict[str, Any]]]:
+        return await self.adetect(query)
+
+    async def adetect(self, query: LLMQuery) -> Tuple[QueryIntent, Optional[Dict[str, Any]]]:
+        """Async variant of detect using the model's native ainvoke"""
+        if self._mock:
+            return QueryIntent.GENERAL, None
+
+        try:
+            response = await self._ainvoke(self.template, self.prompt, self.model, {"question": query.content})
+
+            intent_data = self._parse_intent_response(response)
+            logger.info(f"Detected intent: {intent_data}")
+
+            return intent_data["intent"], intent_data.get("mongo_query")
+
+        except Exception as e:
+            logger.error(f"Error detecting intent: {e}", exc_info=True)
+            return QueryIntent.GENERAL, None
 
-    def _parse_intent_response(self, response) -> Dict[str, Any]:
+    def _parse_intent_response(self, response: str) -> Dict[str, Any]:
         try:
-            content = response.content.strip()
+            content = response.strip()
             # Remove markdown code block formatting
             content = content.replace('```json', '').replace('```', '').strip()
             # Parse the JSON
@@ -15,16 +15,32 @@ class QueryExpansion(RAGStep):
         if self._mock:
             return [query for _ in range(expand_to_n)]
 
+        template, prompt, model = self._create_chain(expand_to_n)
+        result = self._invoke(template, prompt, model, {"question": query})
+
+        return self._parse_queries(query, result, template.separator)
+
+    async def agenerate(self, query: LLMQuery, expand_to_n: int) -> list[LLMQuery]:
+        assert expand_to_n > 0, f"'expand_to_n' should be greater than 0. Got {expand_to_n}."
+
+        if self._mock:
+            return [query for _ in range(expand_to_n)]
+
+        template, prompt, model = self._create_chain(expand_to_n)
+        result = await self._ainvoke(template, prompt, model, {"question": query})
+
+        return self._parse_queries(query, result, template.separator)
+
+    def _create_chain(self, expand_to_n: int):
         query_expansion_template = QueryExpansionTemplateECT()
         prompt = query_expansion_template.create_template(expand_to_n)
         model = ChatOpenAI(model=settings.OPENAI_MODEL, api_key=settings.OPENAI_API_KEY, temperature=0)
 
-        chain = prompt | model
-
-        response = chain.invoke({"question": query})
-        result = response.content
+        return query_expansion_template, prompt, model
 
-        queries_content = result.strip().split(query_expansion_template.separator)
+    @staticmethod
+    def _parse_queries(query: LLMQuery, result: str, separator: str) -> list[LLMQuery]:
+        queries_content = result.strip().split(separator)
 
         queries = [query]
         queries += [
@@ -1,46 +1,238 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from loguru import logger
 from zenml import step
-from sentence_transformers import SentenceTransformer, util
 
-from settings import settings
+from infrastructure.embeddings.engine import EmbeddingEngine
 from shared.domain.queries import LLMQuery, VectorQuery
 from shared.domain.documents import VectorSearchResult
 from steps.base import RAGStep
+from settings import settings
 
 
 class Reranker(RAGStep):
     def __init__(self, mock: bool = False) -> None:
         super().__init__(mock=mock)
-        self._model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+        self._model = EmbeddingEngine()
+
+    def generate(
+        self,
+        query: LLMQuery | VectorQuery,
+        chunks: list[VectorSearchResult],
+        keep_top_k: int,
+        query_vector: Optional[np.ndarray] = None,
+        ranked: bool = False
+    ) -> list[VectorSearchResult]:
+        """Rerank chunks by cosine similarity to the query.
 
-    def generate(self, query: LLMQuery | VectorQuery, chunks: list[VectorSearchResult], keep_top_k: int) -> list[VectorSearchResult]:
-        """Rerank chunks based on cosine similarity using the same embedding model"""
+        Uses the query embedding and the stored chunk vectors from the search when
+        given; only what is missing is encoded with the embedding model. Chunks that
+        are already ranked (fused with lexical hits) keep their order, since sorting
+        by dense similarity alone would undo the fusion.
+        """
         if self._mock or not chunks:
             return chunks[:keep_top_k] if chunks else []
+        if ranked:
+            logger.info(f"Kept top {keep_top_k} of {len(chunks)} ranked chunks")
+            return chunks[:keep_top_k]
 
         try:
-            # Get query embedding
-            query_embedding = self._model.encode(query.content, convert_to_tensor=True)
-            
-            # Get chunk embeddings
-            chunk_texts = [chunk.text for chunk in chunks]
-            chunk_embeddings = self._model.encode(chunk_texts, convert_to_tensor=True)
-            
-            # Calculate cosine similarities
-            cos_scores = util.pytorch_cos_sim(query_embedding, chunk_embeddings)[0]
-            cos_scores = cos_scores.cpu().numpy()
-
-            # Sort chunks by similarity
-            chunk_score_pairs = list(zip(cos_scores, chunks))
-            chunk_score_pairs.sort(key=lambda x: x[0], reverse=True)
-
-            # Take top k chunks
-            reranked_documents = chunk_score_pairs[:keep_top_k]
-            reranked_documents = [doc for _, doc in reranked_documents]
-            
+            if query_vector is None:
+                query_vector = self._model.encode_queries([query.content])[0]
+
+            vectors = [chunk.vector for chunk in chunks]
+            missing = [i for i, vector in enumerate(vectors) if vector is None]
+            if missing:
+                logger.debug(f"Encoding {len(missing)} chunks without stored vectors")
+                for i, vector in zip(missing, self._model.encode([chunks[i].text for i in missing])):
+                    vectors[i] = vector
+            matrix = np.asarray(vectors, dtype=np.float32)
+
+            # Cosine similarity of every chunk in one matrix-vector product
+            query_vector = np.asarray(query_vector, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query_vector) or 1.0)
+            cos_scores = (matrix @ query_vector) / np.where(norms > 0, norms, 1.0)
+
+            # Stable, so ties keep search order
+            order = np.argsort(-cos_scores, kind="stable")[:keep_top_k]
+            reranked_documents = [chunks[i] for i in order]
+
             logger.info(f"Reranked {len(chunks)} chunks to top {keep_top_k}")
             return reranked_documents
-            
+
         except Exception as e:
             logger.error(f"Error during reranking: {str(e)}")
             return chunks[:keep_top_k] if chunks else []
+
+
+class RerankScoreCache:
+    """LRU cache of cross-encoder scores keyed by (query hash, chunk text hash)."""
+
+    def __init__(self, max_entries: int = settings.RERANK_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def query_key(query: str) -> str:
+        return hashlib.sha1(query.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def chunk_key(chunk: VectorSearchResult) -> str:
+        # The score depends only on the text: point IDs survive re-chunking, and database lookups have none
+        return hashlib.sha1(chunk.text.encode("utf-8")).hexdigest()
+
+    def get(self, key: Tuple[str, str]) -> Optional[float]:
+        with self._lock:
+            score = self._scores.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._scores.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scores.clear()
+        self.hits = self.misses = 0
+
+    def put(self, key: Tuple[str, str], score: float) -> None:
+        with self._lock:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+
+
+class CrossEncoderReranker(RAGStep):
+    """Reranks the top candidates with a small cross-encoder on CPU.
+
+    Candidates are first ordered by bi-encoder cosine (cheap, from stored vectors),
+    unless they arrive already ranked by fusion; only the first top_n are scored by
+    the cross-encoder, in batches, with scores cached per (query, chunk text). When
+    scoring would exceed the latency budget the candidates are returned in that
+    cheap order instead.
+    """
+    _models: Dict[str, object] = {}
+    _models_lock = threading.Lock()
+    # Fast tokenizers are not safe to share between threads
+    _predict_lock = threading.Lock()
+    _cache = RerankScoreCache()
+
+    def __init__(
+        self,
+        mock: bool = False,
+        model_name: str = settings.RERANKER_MODEL_NAME,
+        top_n: int = settings.RERANK_TOP_N,
+        batch_size: int = settings.RERANK_BATCH_SIZE,
+        latency_budget_ms: float = settings.RERANK_LATENCY_BUDGET_MS
+    ) -> None:
+        super().__init__(mock=mock)
+        self.model_name = model_name
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.latency_budget_ms = latency_budget_ms
+        self._vector_reranker = Reranker(mock=mock)
+
+    @property
+    def model(self):
+        """Load the cross-encoder on first use, once per process."""
+        with self._models_lock:
+            model = self._models.get(self.model_name)
+            if model is None:
+                from sentence_transformers import CrossEncoder
+
+                logger.info(f"Loading cross-encoder: {self.model_name}")
+                model = CrossEncoder(self.model_name, device="cpu")
+                self._models[self.model_name] = model
+        return model
+
+    @property
+    def cache(self) -> RerankScoreCache:
+        return self._cache
+
+    def warmup(self) -> "CrossEncoderReranker":
+        with self._predict_lock:
+            self.model.predict([("warmup", "warmup")], show_progress_bar=False)
+        return self
+
+    def generate(
+        self,
+        query: LLMQuery | VectorQuery,
+        chunks: list[VectorSearchResult],
+        keep_top_k: int,
+        query_vector: Optional[np.ndarray] = None,
+        ranked: bool = False
+    ) -> list[VectorSearchResult]:
+        """Rerank chunks with the cross-encoder, falling back to the cheap order past the latency budget.
+
+        Ranked chunks (fused with lexical hits) are cut to top_n as given; others are
+        ordered by cosine first.
+        """
+        if self._mock or not chunks:
+            return chunks[:keep_top_k] if chunks else []
+
+        start = time.perf_counter()
+        if not ranked:
+            chunks = self._vector_reranker.generate(query, chunks, max(self.top_n, keep_top_k), query_vector)
+        candidates = chunks[:max(self.top_n, 1)]
+
+        try:
+            scores = self._scores(query.content, candidates, start)
+        except Exception as e:
+            logger.error(f"Error during cross-encoder reranking: {str(e)}")
+            scores = None
+        if scores is None:
+            return candidates[:keep_top_k]
+
+        order = np.argsort(-scores, kind="stable")[:keep_top_k]
+        logger.info(f"Cross-encoder reranked {len(candidates)} of {len(chunks)} chunks to top {keep_top_k} "
+                    f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return [candidates[i] for i in order]
+
+    def _scores(self, query: str, candidates: List[VectorSearchResult], start: float) -> Optional[np.ndarray]:
+        """Cross-encoder score per candidate, or None when the latency budget runs out."""
+        query_key = self._cache.query_key(query)
+        keys = [(query_key, self._cache.chunk_key(chunk)) for chunk in candidates]
+        scores = np.array([self._cache.get(key) for key in keys], dtype=np.float64)
+        missing = [i for i, score in enumerate(scores) if np.isnan(score)]
+
+        budget = self.latency_budget_ms / 1000
+        batch_seconds = 0.0
+        for offset in range(0, len(missing), self.batch_size):
+            # Stop before a batch that would likely overrun the budget
+            elapsed = time.perf_counter() - start
+            if elapsed + batch_seconds > budget:
+                logger.warning(f"Cross-encoder reranking exceeded its {self.latency_budget_ms:.0f}ms budget "
+                               f"with {len(missing) - offset} candidates unscored, keeping the cheap order")
+                return None
+
+            batch = missing[offset:offset + self.batch_size]
+            batch_start = time.perf_counter()
+            with self._predict_lock:
+                batch_scores = self.model.predict(
+                    [(query, candidates[i].text) for i in batch],
+                    batch_size=self.batch_size,
+                    show_progress_bar=False
+                )
+            batch_seconds = time.perf_counter() - batch_start
+            for i, score in zip(batch, batch_scores):
+                scores[i] = float(score)
+                self._cache.put(keys[i], float(score))
+        return scores
+
+
+def get_reranker(name: str = settings.RERANKER, mock: bool = False) -> RAGStep:
+    """The reranking stage selected by name ("cosine" or "cross-encoder")."""
+    if name == "cross-encoder":
+        return CrossEncoderReranker(mock=mock)
+    if name != "cosine":
+        logger.warning(f"Unknown reranker {name!r}, using cosine")
+    return Reranker(mock=mock)
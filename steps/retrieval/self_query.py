@@ -13,29 +13,48 @@ class SelfQuery(RAGStep):
             return query
 
         try:
-            # Create prompt and model
-            prompt = SelfQueryTemplateECT().create_template()
-            model = ChatOpenAI(
-                model=settings.OPENAI_MODEL,
-                api_key=settings.OPENAI_API_KEY,
-                temperature=0
-            )
-
             # Get metadata from LLM
-            chain = prompt | model
-            response = chain.invoke({"question": query.content})
-            metadata = response.content.strip("\n ")
-            
-            # Add metadata to query
-            query.metadata = {"extracted_terms": metadata}
-            logger.info(f"Extracted metadata: {metadata}")
-            
-            return metadata
+            result = self._invoke(*self._create_chain(), {"question": query.content})
+            return self._apply_metadata(query, result)
             
         except Exception as e:
             logger.error(f"Error in self-query: {e}")
             return query
 
+    async def agenerate(self, query: LLMQuery) -> LLMQuery:
+        """Async variant of generate using the model's native ainvoke"""
+        if self._mock:
+            return query
+
+        try:
+            result = await self._ainvoke(*self._create_chain(), {"question": query.content})
+            return self._apply_metadata(query, result)
+
+        except Exception as e:
+            logger.error(f"Error in self-query: {e}")
+            return query
+
+    def _create_chain(self):
+        # Create prompt and model
+        template = SelfQueryTemplateECT()
+        prompt = template.create_template()
+        model = ChatOpenAI(
+            model=settings.OPENAI_MODEL,
+            api_key=settings.OPENAI_API_KEY,
+            temperature=0
+        )
+        return template, prompt, model
+
+    @staticmethod
+    def _apply_metadata(query: LLMQuery, content: str) -> str:
+        metadata = content.strip("\n ")
+        
+        # Add metadata to query
+        query.metadata = {"extracted_terms": metadata}
+        logger.info(f"Extracted metadata: {metadata}")
+        
+        return metadata
+
 
 if __name__ == "__main__":
     query = LLMQuery.from_str("I am Paul Iusztin. Write an article about the best types of advanced RAG methods.")
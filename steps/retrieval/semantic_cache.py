@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional
+import numpy as np
+from loguru import logger
+
+from settings import settings
+from infrastructure.db.bm25 import index_path
+from infrastructure.db.snapshots import current_version
+from infrastructure.db.vector_store import get_vector_store
+from infrastructure.embeddings.engine import EmbeddingEngine
+from shared.domain.documents import VectorSearchResult
+
+
+@dataclass
+class _CacheEntry:
+    query: str
+    embedding: np.ndarray
+    results: List[VectorSearchResult]
+    top_k: int
+    filters: FrozenSet[str]
+    created_at: float
+
+
+class SemanticQueryCache:
+    """Returns cached retrieval results for queries that embed close to a recent one.
+
+    A hit also needs the same search filters (query tags, including the years and
+    quarters from self query): "revenue in 2023" and "revenue in 2024" embed
+    almost identically but must not share results.
+    Entries are evicted least-recently-used beyond ``max_entries`` and after ``ttl``
+    seconds, and the whole cache is dropped when the vector collection changes.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        collection_name: str = settings.VECTOR_COLLECTION_NAME
+    ) -> None:
+        self.threshold = threshold if threshold is not None else settings.SEMANTIC_CACHE_THRESHOLD
+        self.max_entries = max_entries or settings.SEMANTIC_CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else settings.SEMANTIC_CACHE_TTL_SECONDS
+        self.collection_name = collection_name
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[Hashable] = None
+        self._version_checked_at = 0.0
+
+    def embed(self, query: str) -> np.ndarray:
+        vector = EmbeddingEngine().encode_queries([query])[0]
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def get(
+        self,
+        query: str,
+        top_k: int,
+        embedding: Optional[np.ndarray] = None,
+        filters: Iterable[str] = ()
+    ) -> Optional[List[VectorSearchResult]]:
+        """Return cached results for a semantically equivalent query with the same filters, or None."""
+        self._check_version()
+        embedding = self.embed(query) if embedding is None else embedding
+        filters = frozenset(filters)
+
+        with self._lock:
+            self._evict_expired()
+            candidates = [
+                (key, entry) for key, entry in self._entries.items()
+                if entry.top_k >= top_k and entry.filters == filters
+            ]
+            if candidates:
+                scores = np.stack([entry.embedding for _, entry in candidates]) @ embedding
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    key, entry = candidates[best]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    logger.info(f"Semantic cache hit ({scores[best]:.3f}) for query '{query}' "
+                                f"matching '{entry.query}' - hit ratio {self.hit_ratio:.1%}")
+                    return entry.results[:top_k]
+
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        query: str,
+        results: List[VectorSearchResult],
+        top_k: int,
+        embedding: Optional[np.ndarray] = None,
+        filters: Iterable[str] = ()
+    ) -> None:
+        if not results:
+            return
+        embedding = self.embed(query) if embedding is None else embedding
+
+        with self._lock:
+            self._entries[query] = _CacheEntry(query, embedding, results, top_k, frozenset(filters), time.monotonic())
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        logger.info("Semantic cache invalidated")
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hit_ratio,
+            "entries": len(self._entries)
+        }
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if now - entry.created_at > self.ttl]
+        for key in expired:
+            del self._entries[key]
+
+    def _check_version(self) -> None:
+        """Drop all entries when ingestion writes the collection or its BM25 index, or the model changes."""
+        now = time.monotonic()
+        if now - self._version_checked_at < settings.SEMANTIC_CACHE_VERSION_CHECK_SECONDS:
+            return
+        self._version_checked_at = now
+
+        try:
+            version = (
+                get_vector_store().version(self.collection_name),
+                current_version(index_path(self.collection_name)) if settings.BM25_INDEX_DIR else None,
+                settings.EMBEDDING_MODEL_NAME
+            )
+        except Exception as e:
+            logger.warning(f"Could not read collection version for semantic cache: {e}")
+            return
+
+        if self._version is not None and version != self._version:
+            logger.info(f"Vector collection changed {self._version} -> {version}")
+            self.invalidate()
+        self._version = version
+
+
+semantic_cache = SemanticQueryCache()
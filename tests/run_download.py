@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+import click
+from loguru import logger
+from steps.etl.download import cached_download, open_archive
+
+
+class ArchiveServer:
+    """Local stand-in for the archive host: ETag/Last-Modified, Range requests and dropped connections."""
+
+    def __init__(self) -> None:
+        self.body = b""
+        self.etag = ""
+        self.last_modified = ""
+        self.drop_after: Optional[int] = None
+        self.requests: List[Dict[str, str]] = []
+        self.sent = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                server.requests.append(dict(self.headers))
+                if self.headers.get("If-None-Match") == server.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                start = 0
+                range_header = self.headers.get("Range")
+                if_range = self.headers.get("If-Range")
+                if range_header and if_range in (None, server.etag, server.last_modified):
+                    start = int(range_header.split("=")[1].rstrip("-"))
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{len(server.body) - 1}/{len(server.body)}")
+                else:
+                    self.send_response(200)
+                payload = server.body[start:]
+                self.send_header("Content-Length", str(len(payload)))
+                self.send_header("ETag", server.etag)
+                self.send_header("Last-Modified", server.last_modified)
+                self.end_headers()
+
+                if server.drop_after is not None:
+                    # Drop the connection part-way through, once
+                    payload, server.drop_after = payload[:server.drop_after], None
+                    self.close_connection = True
+                self.wfile.write(payload)
+                server.sent += len(payload)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/archive.zip"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def publish(self, size: int) -> None:
+        self.body = os.urandom(size)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:16]}"'
+        self.last_modified = formatdate(usegmt=True)
+
+    def reset_counters(self) -> None:
+        self.requests, self.sent = [], 0
+
+    def shutdown(self) -> None:
+        self._httpd.shutdown()
+
+
+def check(name: str, condition: bool) -> bool:
+    (logger.info if condition else logger.error)(f"{'PASS' if condition else 'FAIL'}: {name}")
+    return condition
+
+
+@click.command()
+@click.option("--size", default=3 * 1024 * 1024, show_default=True, help="Archive size in bytes.")
+def main(size: int) -> None:
+    """Exercise streaming download, Range resume and conditional re-download against a local server."""
+    server = ArchiveServer()
+    results = []
+    try:
+        server.publish(size)
+
+        # Spooled download, interrupted half-way
+        server.drop_after = size // 2
+        with open_archive(server.url, cache_dir="") as archive:
+            results.append(check("spooled download resumes after a dropped connection", archive.read() == server.body))
+        results.append(check("resume used a Range request", any("Range" in headers for headers in server.requests)))
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # Cached download, interrupted, then resumed
+            server.reset_counters()
+            server.drop_after = size // 3
+            path = cached_download(server.url, Path(cache_dir))
+            results.append(check("cached download matches the archive", path.read_bytes() == server.body))
+            results.append(check("cached download sent each byte once", server.sent == size))
+
+            # Unchanged archive is not transferred again
+            server.reset_counters()
+            path = cached_download(server.url, Path(cache_dir))
+            results.append(check("unchanged archive is revalidated with If-None-Match",
+                                 server.requests[0].get("If-None-Match") == server.etag))
+            results.append(check("unchanged archive skips the transfer", server.sent == 0 and path.exists()))
+
+            # A partial file left by a killed run is resumed on the next run
+            server.publish(size)
+            server.reset_counters()
+            path.with_suffix(".zip.part").write_bytes(server.body[:size // 4])
+            (path.parent / f"{path.stem}.part.json").write_text(
+                json.dumps({"etag": server.etag, "last_modified": server.last_modified})
+            )
+            path = cached_download(server.url, Path(cache_dir))
+            results.append(check("leftover partial file is resumed", path.read_bytes() == server.body))
+            results.append(check("resume fetched only the missing bytes", server.sent == size - size // 4))
+    finally:
+        server.shutdown()
+
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
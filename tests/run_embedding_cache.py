@@ -0,0 +1,55 @@
+import tempfile
+from types import SimpleNamespace
+import click
+import numpy as np
+from loguru import logger
+from settings import settings
+from infrastructure.embeddings.cache import EmbeddingCache
+from shared.preprocessing import embedding_data_handlers
+from shared.preprocessing.embedding_data_handlers import EarningsCallEmbeddingHandler
+
+
+def check(name: str, condition: bool) -> bool:
+    (logger.info if condition else logger.error)(f"{'PASS' if condition else 'FAIL'}: {name}")
+    return condition
+
+
+def handler_cache(backend: str) -> EmbeddingCache:
+    """Cache of a handler whose model loaded on the given backend, without loading a real model."""
+    engine = embedding_data_handlers.EmbeddingEngine
+    embedding_data_handlers.EmbeddingEngine = lambda: SimpleNamespace(model_name="test-model", backend=backend)
+    try:
+        return EarningsCallEmbeddingHandler().cache
+    finally:
+        embedding_data_handlers.EmbeddingEngine = engine
+
+
+@click.command()
+def main() -> None:
+    """Check embedding cache keying and recovery from a torn write, offline."""
+    results = []
+    cache_dir = settings.EMBEDDING_CACHE_DIR
+    with tempfile.TemporaryDirectory() as path:
+        settings.EMBEDDING_CACHE_DIR = path
+        try:
+            results.append(check("torch vectors use the plain model key", handler_cache("torch").model_name == "test-model"))
+            results.append(check("other backends get a suffixed key", handler_cache("onnx").model_name == "test-model-onnx"))
+
+            cache = EmbeddingCache(path, "torn", "float32")
+            cache.put_many(["a", "b"], np.eye(2, 4))
+            # A crash between the two appends leaves a vector row without its key
+            with open(cache._vectors_path, "ab") as f:
+                f.write(np.full(4, 9, dtype=np.float32).tobytes())
+            EmbeddingCache(path, "torn", "float32").put_many(["x"], np.full((1, 4), 7.0))
+            vectors, missing = EmbeddingCache(path, "torn", "float32").get_many(["a", "b", "x"])
+            results.append(check("rows without keys are dropped on load",
+                                 not missing and np.allclose(vectors[2], 7.0) and np.allclose(vectors[0], np.eye(4)[0])))
+        finally:
+            settings.EMBEDDING_CACHE_DIR = cache_dir
+
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+import click
+from loguru import logger
+from steps.etl.clean import TranscriptCleaner
+from steps.etl.normalize import TranscriptNormalizer
+
+FIXTURES = Path(__file__).parent / "fixtures" / "etl"
+PAGE_BREAK = "Page 2 of 12"
+
+
+def render(text: str) -> dict:
+    """Run a transcript through the cleaning and normalization passes used by the ETL steps."""
+    cleaned = TranscriptCleaner.clean_transcript(text)
+    return {
+        "cleaned": cleaned,
+        "normalized": {section: TranscriptNormalizer.normalize_text(value) for section, value in cleaned.items()},
+        "pages": [
+            TranscriptNormalizer.normalize_text(TranscriptCleaner.clean_transcript(page)["presentation"])
+            for page in text.split(PAGE_BREAK)
+        ],
+    }
+
+
+def diff(expected, actual, path: str = "") -> list:
+    """List the paths at which two rendered outputs differ."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        return [mismatch for key in expected for mismatch in diff(expected[key], actual.get(key), f"{path}.{key}")]
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        return [mismatch for i, (e, a) in enumerate(zip(expected, actual)) for mismatch in diff(e, a, f"{path}[{i}]")]
+    return [] if expected == actual else [path or "."]
+
+
+@click.command()
+@click.option("--update", is_flag=True, help="Rewrite the golden files from the current output.")
+def main(update: bool) -> None:
+    """Check cleaning and normalization output against the golden transcripts."""
+    failures = 0
+    for transcript in sorted(FIXTURES.glob("*.txt")):
+        golden_path = transcript.with_suffix(".golden.json")
+        actual = render(transcript.read_text())
+
+        if update:
+            golden_path.write_text(json.dumps(actual, indent=2) + "\n")
+            logger.info(f"Updated {golden_path.name}")
+            continue
+
+        mismatches = diff(json.loads(golden_path.read_text()), actual)
+        if mismatches:
+            failures += 1
+            logger.error(f"{transcript.name}: output differs at {', '.join(mismatches)}")
+        else:
+            logger.info(f"{transcript.name}: matches golden output")
+
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
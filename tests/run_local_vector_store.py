@@ -0,0 +1,102 @@
+import tempfile
+import time
+import uuid
+import click
+import numpy as np
+from loguru import logger
+from infrastructure.db.local_vector_store import LocalVectorStore
+from infrastructure.db.vector_store import point_id
+
+TAGS = ["revenue", "guidance", "margin", "bookings", "cloud", "risk"]
+
+
+def check(name: str, condition: bool) -> bool:
+    (logger.info if condition else logger.error)(f"{'PASS' if condition else 'FAIL'}: {name}")
+    return condition
+
+
+def make_documents(count: int, dimension: int, rng: np.random.Generator):
+    vectors = rng.standard_normal((count, dimension)).astype(np.float32)
+    documents = [
+        {
+            "id": str(uuid.UUID(int=int(rng.integers(0, 2 ** 63)))),
+            "text": f"chunk {i}",
+            "metadata": {"tags": list(rng.choice(TAGS, size=int(rng.integers(0, 3)), replace=False)), "chunk_index": i},
+            "embedding": vector.tolist(),
+        }
+        for i, vector in enumerate(vectors)
+    ]
+    return documents, vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@click.command()
+@click.option("--points", default=20000, show_default=True)
+@click.option("--dimension", default=384, show_default=True)
+@click.option("--queries", default=50, show_default=True)
+def main(points: int, dimension: int, queries: int) -> None:
+    """Check the local vector store against brute-force search, offline."""
+    rng = np.random.default_rng(0)
+    documents, unit = make_documents(points, dimension, rng)
+    results = []
+
+    with tempfile.TemporaryDirectory() as path:
+        store = LocalVectorStore(path)
+        store.add_documents(documents[:points // 2], "test")
+        store.flush("test")
+        store.add_documents(documents[points // 2:], "test")
+        store.flush("test")
+        results.append(check("snapshot holds every point", store.count("test") == points))
+
+        query_vectors = rng.standard_normal((queries, dimension)).astype(np.float32)
+        start = time.perf_counter()
+        found = store.search_batch(["q"] * queries, limit=5, collection_name="test", query_vectors=query_vectors)
+        per_query = (time.perf_counter() - start) / queries * 1000
+        expected = np.argsort(-(unit @ query_vectors.T), axis=0)[:5].T
+        results.append(check("search matches brute force", all(
+            [r["metadata"]["chunk_index"] for r in hits] == list(rows) for hits, rows in zip(found, expected)
+        )))
+        logger.info(f"{per_query:.3f}ms per query over {points} points")
+
+        tag_filter = {"must": [{"key": "tags", "match": {"any": ["risk"]}}]}
+        filtered = store.search_batch(["q"], limit=5, filter_condition=tag_filter, collection_name="test",
+                                      query_vectors=query_vectors[:1])
+        results.append(check("tag filter returns only tagged points",
+                             bool(filtered[0]) and all("risk" in r["metadata"]["tags"] for r in filtered[0])))
+
+        no_match = {"must": [{"key": "tags", "match": {"any": ["no-such-tag"]}}]}
+        fallback = store.search_batch(["q"], limit=5, filter_condition=no_match, collection_name="test",
+                                      query_vectors=query_vectors[:1])
+        results.append(check("empty filter result falls back to unfiltered",
+                             [r["id"] for r in fallback[0]] == [r["id"] for r in found[0]]))
+
+        ids = [documents[3]["id"], "00000000-0000-0000-0000-000000000000", documents[1]["id"]]
+        retrieved = store.retrieve(ids, "test", with_vectors=True)
+        results.append(check("retrieve keeps order and skips unknown IDs",
+                             [r["id"] for r in retrieved] == [documents[3]["id"], documents[1]["id"]]))
+        results.append(check("retrieve returns unit vectors", np.allclose(retrieved[0]["vector"], unit[3], atol=1e-6)))
+
+        store.add_documents([{**documents[0], "text": "replaced"}], "test")
+        store.flush("test")
+        results.append(check("re-added point replaces the old one",
+                             store.count("test") == points and store.retrieve([documents[0]["id"]], "test")[0]["content"] == "replaced"))
+
+        # Document "a" re-chunks from three chunks to one; document "b" is no longer produced at all
+        chunks = [{"text": f"{doc_id} {i}", "embedding": documents[i]["embedding"],
+                   "metadata": {"original_id": doc_id, "section": "qa", "chunk_index": i}}
+                  for doc_id, i in [("a", 0), ("a", 1), ("a", 2), ("b", 3)]]
+        store.add_documents(chunks, "test")
+        store.flush("test")
+        store.add_documents(chunks[:1], "test")
+        store.delete_documents(["b"], "test")
+        store.flush("test")
+        chunk_ids = [point_id(chunk["metadata"], chunk["text"]) for chunk in chunks]
+        results.append(check("re-added document drops chunks it no longer produces",
+                             store.count("test") == points + 1
+                             and [r["id"] for r in store.retrieve(chunk_ids, "test")] == chunk_ids[:1]))
+
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import itertools
+import time
+from typing import Iterator, List
+import click
+from loguru import logger
+from shared.utils.streaming import Stage, StreamingPipeline
+
+
+class SourceFailed(Exception):
+    pass
+
+
+def check(name: str, condition: bool) -> bool:
+    (logger.info if condition else logger.error)(f"{'PASS' if condition else 'FAIL'}: {name}")
+    return condition
+
+
+class Store:
+    """Records writes, like a vector store's add_documents."""
+
+    def __init__(self) -> None:
+        self.received = 0
+        self.writes: List[List[int]] = []
+
+
+def documents(store: Store, count: int, fail_after: int = -1) -> Iterator[int]:
+    for i in range(count):
+        if i == fail_after:
+            # Fail only once the upsert stage holds everything sent so far, so it has a partial buffer
+            while store.received < i:
+                time.sleep(0.01)
+            raise SourceFailed(f"source failed at document {i}")
+        yield i
+
+
+def upsert(store: Store, batch_size: int):
+    # Like the ingestion upsert stage: buffer inputs, write full batches, flush the remainder at the end
+    def stage(items: Iterator[int]) -> Iterator[int]:
+        pending = []
+        for item in itertools.chain(items, [None]):
+            if item is not None:
+                store.received += 1
+                pending.append(item)
+                if len(pending) < batch_size:
+                    continue
+            if not pending:
+                continue
+            store.writes.append(pending)
+            yield len(pending)
+            pending = []
+    return stage
+
+
+def run(count: int, batch_size: int, fail_after: int = -1):
+    store = Store()
+    pipeline = StreamingPipeline(documents(store, count, fail_after), [Stage("upsert", upsert(store, batch_size))])
+    try:
+        pipeline.run()
+    except SourceFailed as e:
+        return store.writes, e
+    return store.writes, None
+
+
+@click.command()
+@click.option("--documents", "count", default=45, show_default=True)
+@click.option("--batch-size", default=10, show_default=True)
+def main(count: int, batch_size: int) -> None:
+    """Check that a failed streaming run stops its stages without flushing partial work, offline."""
+    results = []
+
+    writes, error = run(count, batch_size)
+    results.append(check("completed run flushes the partial last batch",
+                         error is None and [item for batch in writes for item in batch] == list(range(count))))
+
+    # Fail before the first batch fills: nothing may reach the store
+    writes, error = run(count, batch_size, fail_after=batch_size // 2)
+    results.append(check("source error is re-raised from run()", error is not None))
+    results.append(check("no store write after the source fails", writes == []))
+
+    # Fail after some full batches: only the batches completed before the error are written
+    fail_after = batch_size * 2 + batch_size // 2
+    writes, error = run(count, batch_size, fail_after=fail_after)
+    full = [list(range(start, start + batch_size)) for start in range(0, fail_after - batch_size + 1, batch_size)]
+    results.append(check("only full batches from before the error are written", error is not None and writes == full))
+
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+import click
+import numpy as np
+from loguru import logger
+from sentence_transformers import SentenceTransformer
+from infrastructure.embeddings.backends import SUPPORTED_BACKENDS, load_model, load_quantized_onnx_model
+from settings import settings
+
+# Used when no corpus file is given; representative of earnings call chunks and questions
+SAMPLE_TEXTS = [
+    "What was Salesforce's revenue guidance for next quarter?",
+    "What are the risks that Salesforce has faced?",
+    "Can you summarize Salesforce's strategy at the beginning of 2023?",
+    "Total revenue was 8,720,000,000, up 11% year-over-year, and current remaining performance obligation grew 12%.",
+    "We are raising our fiscal year '24 operating margin guidance to 27%, reflecting our focus on profitable growth.",
+    "Operator: our next question comes from the line of Keith Weiss with Morgan Stanley. Please go ahead.",
+    "Data Cloud and AI are now part of every conversation we have with customers, and the pipeline continues to build.",
+    "Free cash flow for the quarter was 1,200,000,000 and we returned capital to shareholders through share buyback.",
+    "Macroeconomic factors continue to lengthen sales cycles, particularly for large multi-cloud deals in Europe.",
+    "Attrition remained at historical lows and subscription renewals were in line with our expectations.",
+]
+
+
+def load_corpus(path: Optional[str]) -> List[str]:
+    """Read one text per non-empty line, or fall back to the built-in sample."""
+    if not path:
+        return SAMPLE_TEXTS
+    return [line.strip() for line in Path(path).read_text().splitlines() if line.strip()]
+
+
+def load_backend(backend: str) -> SentenceTransformer:
+    """The model on exactly this backend; unlike load_model, a broken ONNX setup exits instead of using torch."""
+    if backend != "onnx":
+        return load_model(settings.EMBEDDING_MODEL_NAME, backend=backend)
+    try:
+        return load_quantized_onnx_model(settings.EMBEDDING_MODEL_NAME)
+    except Exception as e:
+        logger.error(f"Cannot load the int8 ONNX model for {settings.EMBEDDING_MODEL_NAME}: {e}")
+        sys.exit(1)
+
+
+@click.group()
+def cli() -> None:
+    """Compare the torch and int8 ONNX embedding backends."""
+
+
+@cli.command()
+@click.option("--corpus", default=None, help="Text file with one sample per line.")
+@click.option("--threshold", default=0.99, show_default=True, help="Minimum mean cosine agreement.")
+def parity(corpus: Optional[str], threshold: float) -> None:
+    """Check that ONNX embeddings agree with the torch model."""
+    texts = load_corpus(corpus)
+    reference = load_backend("torch").encode(texts, normalize_embeddings=True)
+    candidate = load_backend("onnx").encode(texts, normalize_embeddings=True)
+
+    cosines = np.sum(reference * candidate, axis=1)
+    logger.info(f"Cosine agreement over {len(texts)} texts: "
+                f"mean={cosines.mean():.5f} min={cosines.min():.5f} p05={np.percentile(cosines, 5):.5f}")
+
+    if cosines.mean() < threshold:
+        logger.error(f"Mean cosine {cosines.mean():.5f} is below threshold {threshold}")
+        sys.exit(1)
+    logger.info("Parity check passed")
+
+
+@cli.command()
+@click.option("--corpus", default=None, help="Text file with one sample per line.")
+@click.option("--queries", default=200, show_default=True, help="Single-query encodes to time.")
+@click.option("--batch-size", default=settings.EMBEDDING_BATCH_SIZE, show_default=True)
+@click.option("--repeat", default=20, show_default=True, help="Times the corpus is repeated for throughput.")
+def benchmark(corpus: Optional[str], queries: int, batch_size: int, repeat: int) -> None:
+    """Measure query-embedding latency and ingestion throughput per backend."""
+    texts = load_corpus(corpus)
+    ingestion_texts = texts * repeat
+
+    for backend in SUPPORTED_BACKENDS:
+        model = load_backend(backend)
+        model.encode(texts[:1])  # warm up
+
+        latencies = []
+        for i in range(queries):
+            start = time.perf_counter()
+            model.encode([texts[i % len(texts)]])
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+
+        start = time.perf_counter()
+        model.encode(ingestion_texts, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+
+        logger.info(f"[{backend}] query latency p50={statistics.median(latencies):.2f}ms "
+                    f"p95={latencies[int(len(latencies) * 0.95) - 1]:.2f}ms | "
+                    f"ingestion {len(ingestion_texts) / elapsed:.1f} texts/sec (batch size {batch_size})")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,50 @@
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+import click
+from loguru import logger
+from steps.etl.clean import TranscriptCleaner
+from steps.etl.normalize import TranscriptNormalizer
+
+SAMPLE = Path(__file__).parent.parent / "tests" / "fixtures" / "etl" / "sample_transcript.txt"
+
+
+def load_texts(corpus: Optional[str], repeat: int) -> List[str]:
+    """Load transcript .txt files, or repeat the bundled sample transcript."""
+    if corpus:
+        return [path.read_text() for path in sorted(Path(corpus).glob("*.txt"))]
+    return [SAMPLE.read_text()] * repeat
+
+
+def throughput(name: str, fn: Callable[[str], object], texts: List[str], rounds: int) -> None:
+    size = sum(len(text.encode("utf-8")) for text in texts)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    elapsed = (time.perf_counter() - start) / rounds
+    logger.info(f"{name}: {size / elapsed / 1e6:.2f} MB/s ({elapsed * 1000:.1f}ms per round)")
+
+
+@click.command()
+@click.option("--corpus", default=None, help="Directory of transcript .txt files (defaults to the bundled sample).")
+@click.option("--repeat", default=200, show_default=True, help="Copies of the sample when no corpus is given.")
+@click.option("--rounds", default=3, show_default=True)
+def main(corpus: Optional[str], repeat: int, rounds: int) -> None:
+    """Measure cleaning and normalization throughput in MB/s of input text."""
+    texts = load_texts(corpus, repeat)
+    logger.info(f"Benchmarking {len(texts)} transcripts, {rounds} rounds")
+
+    throughput("clean", TranscriptCleaner.clean_transcript, texts, rounds)
+    throughput("normalize", TranscriptNormalizer.normalize_text, texts, rounds)
+    throughput(
+        "clean + normalize",
+        lambda text: [TranscriptNormalizer.normalize_text(section)
+                      for section in TranscriptCleaner.clean_transcript(text).values()],
+        texts,
+        rounds,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+import click
+from loguru import logger
+from infrastructure.embeddings.engine import EmbeddingEngine
+from shared.domain.documents import VectorSearchResult
+from shared.domain.queries import LLMQuery
+from steps.retrieval.reranking import CrossEncoderReranker, Reranker
+from tools.bench_embeddings import SAMPLE_TEXTS
+from settings import settings
+
+SAMPLE = Path(__file__).parent.parent / "tests" / "fixtures" / "etl" / "sample_transcript.txt"
+
+QUERIES = [
+    "What was the revenue growth this quarter?",
+    "What guidance did management give for next year?",
+    "What did the CFO say about bookings?",
+    "Were there any one-time charges?",
+    "How are margins trending?",
+]
+
+
+def load_candidates(corpus: Optional[str]) -> List[VectorSearchResult]:
+    """Passages (one per non-empty line) with stored vectors, as the search would return them."""
+    if corpus:
+        texts = Path(corpus).read_text().splitlines()
+    else:
+        texts = SAMPLE.read_text().splitlines() + SAMPLE_TEXTS[3:]
+    texts = [text.strip() for text in texts if len(text.strip()) > 20]
+    vectors = EmbeddingEngine().encode(texts)
+    return [
+        VectorSearchResult(text=text, metadata={}, id=f"passage-{i}", vector=vector.tolist())
+        for i, (text, vector) in enumerate(zip(texts, vectors))
+    ]
+
+
+def time_calls(fn: Callable[[], List[VectorSearchResult]], rounds: int) -> List[float]:
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+
+def describe(name: str, latencies: List[float]) -> None:
+    logger.info(f"{name}: p50={statistics.median(latencies):.2f}ms "
+                f"p95={latencies[int(len(latencies) * 0.95) - 1]:.2f}ms max={latencies[-1]:.2f}ms")
+
+
+@click.command()
+@click.option("--corpus", default=None, help="Text file with one candidate passage per line.")
+@click.option("--top-k", default=3, show_default=True)
+@click.option("--top-n", default=settings.RERANK_TOP_N, show_default=True, help="Candidates sent to the cross-encoder.")
+@click.option("--budget-ms", default=settings.RERANK_LATENCY_BUDGET_MS, show_default=True)
+@click.option("--rounds", default=20, show_default=True)
+def main(corpus: Optional[str], top_k: int, top_n: int, budget_ms: float, rounds: int) -> None:
+    """Compare latency and top-k agreement of the cosine and cross-encoder rerankers."""
+    candidates = load_candidates(corpus)
+    cosine = Reranker()
+    cross = CrossEncoderReranker(top_n=top_n, latency_budget_ms=budget_ms).warmup()
+    logger.info(f"{len(candidates)} candidates, {len(QUERIES)} queries, top_n={top_n}, top_k={top_k}")
+
+    overlaps = []
+    for text in QUERIES:
+        query = LLMQuery.from_str(text)
+        query_vector = EmbeddingEngine().encode_queries([text])[0]
+        logger.info(f"Query: {text}")
+
+        describe("  cosine", time_calls(lambda: cosine.generate(query, candidates, top_k, query_vector), rounds))
+        cold = []
+        for _ in range(rounds):
+            cross.cache.clear()
+            cold.extend(time_calls(lambda: cross.generate(query, candidates, top_k, query_vector), 1))
+        describe("  cross-encoder (cold cache)", sorted(cold))
+        describe("  cross-encoder (warm cache)", time_calls(lambda: cross.generate(query, candidates, top_k, query_vector), rounds))
+
+        by_cosine = [chunk.id for chunk in cosine.generate(query, candidates, top_k, query_vector)]
+        by_cross = [chunk.id for chunk in cross.generate(query, candidates, top_k, query_vector)]
+        overlaps.append(len(set(by_cosine) & set(by_cross)) / max(len(by_cosine), 1))
+        for rank, (a, b) in enumerate(zip(by_cosine, by_cross), 1):
+            logger.info(f"  #{rank} cosine: {candidates[int(a.split('-')[1])].text[:60]!r}")
+            logger.info(f"  #{rank} cross:  {candidates[int(b.split('-')[1])].text[:60]!r}")
+
+    logger.info(f"Mean top-{top_k} overlap between rerankers: {statistics.mean(overlaps):.0%}; "
+                f"score cache hit ratio {cross.cache.hits / max(cross.cache.hits + cross.cache.misses, 1):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import time
+from pathlib import Path
+from typing import List, Optional
+import click
+from loguru import logger
+from shared.preprocessing.operations.chunking import create_chunks
+from shared.preprocessing.operations.chunk_tagging import get_keywords, tag_batch
+
+
+def substring_tag(text: str, keywords: List[str]) -> List[str]:
+    """The previous tagger: one substring scan per keyword."""
+    text = text.lower()
+    return [keyword for keyword in keywords if keyword in text]
+
+
+def load_chunks(corpus: Optional[str], limit: int) -> List[str]:
+    """Chunk transcripts from text files, or from the MongoDB collection in settings."""
+    if corpus:
+        texts = [path.read_text() for path in sorted(Path(corpus).glob("*.txt"))]
+    else:
+        from infrastructure.db.mongo import MongoDBClient
+        from settings import settings
+
+        collection = MongoDBClient().db.get_collection(settings.MONGODB_COLLECTION_NAME)
+        texts = [
+            section
+            for doc in collection.find({}, {"content.presentation": 1, "content.qa": 1})
+            for section in (doc["content"].get("presentation", ""), doc["content"].get("qa", ""))
+        ]
+    chunks = [chunk for text in texts for chunk in create_chunks(text)]
+    return chunks[:limit] if limit else chunks
+
+
+@click.command()
+@click.option("--corpus", default=None, help="Directory of transcript .txt files (defaults to MongoDB).")
+@click.option("--limit", default=0, help="Maximum number of chunks to tag (0 = all).")
+@click.option("--rounds", default=5, show_default=True)
+def main(corpus: Optional[str], limit: int, rounds: int) -> None:
+    """Compare the keyword automaton against the per-keyword substring scan."""
+    chunks = load_chunks(corpus, limit)
+    keywords = get_keywords()
+    logger.info(f"Tagging {len(chunks)} chunks against {len(keywords)} keywords, {rounds} rounds")
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        legacy = [substring_tag(chunk, keywords) for chunk in chunks]
+    legacy_time = (time.perf_counter() - start) / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        current = tag_batch(chunks, keywords)
+    current_time = (time.perf_counter() - start) / rounds
+
+    changed = sum(1 for old, new in zip(legacy, current) if old != new)
+    dropped = sum(len(set(old) - set(new)) for old, new in zip(legacy, current))
+    logger.info(f"substring scan: {legacy_time / len(chunks) * 1e6:.1f}us/chunk | "
+                f"automaton: {current_time / len(chunks) * 1e6:.1f}us/chunk | "
+                f"speedup {legacy_time / current_time:.1f}x")
+    logger.info(f"{changed} chunks tagged differently; {dropped} substring-only (non word-boundary) tags dropped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import time
+import click
+from loguru import logger
+from infrastructure.db.local_vector_store import LocalVectorStore
+from infrastructure.db.qdrant import QdrantClient
+from settings import settings
+
+
+@click.command()
+@click.option("--collection", default=settings.VECTOR_COLLECTION_NAME, show_default=True)
+@click.option("--target", default=settings.VECTOR_STORE_DIR, show_default=True, help="Local vector store directory.")
+@click.option("--batch-size", default=1024, show_default=True, help="Points per Qdrant scroll page.")
+def main(collection: str, target: str, batch_size: int) -> None:
+    """Snapshot a Qdrant collection into the local vector store (VECTOR_STORE_BACKEND=local)."""
+    start = time.perf_counter()
+    local = LocalVectorStore(target)
+    exported = 0
+    for documents in QdrantClient().scroll_documents(collection, batch_size):
+        local.add_documents(documents, collection)
+        exported += len(documents)
+    local.flush(collection)
+    logger.info(f"Exported {exported} points from {collection} to {target} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
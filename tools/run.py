@@ -5,7 +5,7 @@ import click
 from dotenv import load_dotenv
 from zenml.client import Client
 from pipelines.etl import data_etl_pipeline
-from pipelines.ingestion import data_ingestion_pipeline
+from pipelines.ingestion import data_ingestion_pipeline, streaming_ingestion
 from loguru import logger
 from settings import settings
 
@@ -43,16 +43,30 @@ def check_env_vars():
     default=False,
     help="Whether to run the ETL pipeline.",
 )
+@click.option(
+    "--full-etl",
+    is_flag=True,
+    default=False,
+    help="Reprocess every PDF instead of only new or changed ones.",
+)
 @click.option(
     "--run-ingestion",
     is_flag=True,
     default=False,
     help="Whether to run the ingestion pipeline.",
 )
+@click.option(
+    "--streaming",
+    is_flag=True,
+    default=False,
+    help="Run ingestion with the concurrent streaming engine instead of ZenML steps.",
+)
 def main(
     no_cache: bool = False,
     run_etl: bool = False,
+    full_etl: bool = False,
     run_ingestion: bool = False,
+    streaming: bool = False,
 ) -> None:
     # Check environment variables
     env_vars = check_env_vars()
@@ -70,11 +84,16 @@ def main(
         data_etl_pipeline.with_options(**pipeline_args)(
             zip_url=settings.ZIP_URL,
             collection_name=settings.MONGODB_COLLECTION_NAME,
-            mongodb_connection_string=settings.MONGODB_CONNECTION_STRING
+            mongodb_connection_string=settings.MONGODB_CONNECTION_STRING,
+            incremental=not full_etl
         )
         logger.info("ETL pipeline completed")
     
-    if run_ingestion:
+    if run_ingestion and streaming:
+        logger.info("Running streaming ingestion")
+        streaming_ingestion(collections=[settings.MONGODB_COLLECTION_NAME])
+        logger.info("Streaming ingestion completed")
+    elif run_ingestion:
         logger.info("Running ingestion pipeline")
         pipeline_args = {}
         if no_cache: